@@ -3,309 +3,657 @@ import time
 import numpy as np
 import subprocess
 import json
+import os
+import queue
+import threading
+import native
+import objective as objectives
+from progress import StopConditions, STOP_REASONS, record
+from history import History, HistoryPolicy
+from checkpoint import AppendLog, atomicSave, encodeState, decodeState
+from profiling import NULL_PROFILER, Profiler, nativeReport, writeTrace
 
 class Cube:
 
-  stdfactor = 1
+  lineTables = {}
 
-  def __init__(self, dimension):
+  def __init__(self, dimension, array = None, rng = None, objective = "std"):
     self.dimension = dimension
-    self.cube = [[[0 for k in range(dimension)] for j in range(dimension)] for i in range(dimension)]
+    # Sumber acak: random.Random milik run ini, atau modul random global
+    self.rng = rng or random
+    # getH dan deltaHForSwap memakai objektif ini (lihat objective.py)
+    self.objective = objectives.get(objective)
+    # version naik setiap kubus berubah; nilai objektif di-cache per (nama objektif, version)
+    self.version = 0
+    self.scores = {}
+    # Disimpan sebagai array int kontigu [z][y][x], dipakai bersama visualizer dan GA
+    if array is None :
+      self.cube = np.zeros((dimension, dimension, dimension), dtype=np.int64)
+    else :
+      self.cube = np.ascontiguousarray(array, dtype=np.int64).reshape((dimension, dimension, dimension))
+    self.updateSums()
+
+  def fromArray(array, objective = "std") :
+    array = np.asarray(array)
+    return Cube(array.shape[0], array, objective=objective)
 
   def __str__(self):
     string = ""
     for i in range(self.dimension):
       for j in range(self.dimension):
         for k in range(self.dimension):
-          string += f"[{i}][{j}][{k}] = {self.cube[i][j][k]}\n"
+          string += f"[{i}][{j}][{k}] = {self.cube[i, j, k]}\n"
     return string
   
-  def initialize(self):
+  def initialize(self, initializer = "random"):
+    # Strategi selain random ada di initializer.py, diacak dari rng kubus ini
+    if initializer != "random" :
+      # Diimpor di sini karena initializer.py bergantung pada modul ini
+      import initializer as initializers
+      self.cube.reshape(-1)[:] = initializers.get(initializer)(self.dimension, np.random.default_rng(self.rng.getrandbits(64)))
+      self.updateSums()
+      return
     numbers = list(range(1, self.dimension**3+1))
+    flat = self.cube.reshape(-1)
     for i in range(self.dimension**3):
-      index = random.randint(0, self.dimension**3 - 1 - i)
-      self.cube[i // (self.dimension**2)][(i % (self.dimension**2)) // self.dimension][i % self.dimension] = numbers[index]
+      index = self.rng.randint(0, self.dimension**3 - 1 - i)
+      flat[i] = numbers[index]
       numbers[index], numbers[self.dimension**3 - 1 - i] = numbers[self.dimension**3 - 1 - i], numbers[index]
+    self.updateSums()
 
   def copyCube(other) :
-    new_cube = Cube(other.dimension)
+    new_cube = Cube.__new__(Cube)
+    new_cube.dimension = other.dimension
+    new_cube.rng = other.rng
+    new_cube.cube = other.cube.copy()
+    new_cube.sums = other.sums.copy()
+    new_cube.magicCount = other.magicCount
+    new_cube.sumTotal = other.sumTotal
+    new_cube.sumSquares = other.sumSquares
+    new_cube.absError = other.absError
+    new_cube.objective = other.objective
+    new_cube.version = other.version
+    new_cube.scores = dict(other.scores)
+    return new_cube
 
-    for z in range(other.dimension) :
-      for y in range(other.dimension) :
-        for x in range(other.dimension) :
-          new_cube.cube[z][y][x] = other.cube[z][y][x]
+  def lineTable(dimension) :
+    # Indeks flat tiap garis (L x n, urutan sama dengan allSums) dan indeks garis per sel
+    if dimension in Cube.lineTables :
+      return Cube.lineTables[dimension]
+
+    n = dimension
+    index = np.arange(n**3).reshape((n, n, n))
+    i = np.arange(n)
+    r = n - 1 - i
+    lines = [
+      index.reshape(n*n, n),
+      index.transpose(0, 2, 1).reshape(n*n, n),
+      index.transpose(1, 2, 0).reshape(n*n, n),
+      np.stack([index[i, i, i], index[i, r, i], index[i, i, r], index[i, r, r]]),
+      np.stack([index[:, i, i], index[:, i, r]], axis=1).reshape(2*n, n),
+      np.stack([index[i, :, i].T, index[i, :, r].T], axis=1).reshape(2*n, n),
+      np.stack([index[i, i, :].T, index[i, r, :].T], axis=1).reshape(2*n, n),
+    ]
+    lineIndex = np.concatenate(lines)
+
+    cellLines = [[] for _ in range(n**3)]
+    for line, cells in enumerate(lineIndex.tolist()) :
+      for cell in cells :
+        cellLines[cell].append(line)
+    cellLines = [frozenset(lines) for lines in cellLines]
+
+    Cube.lineTables[dimension] = (lineIndex, cellLines)
+    return Cube.lineTables[dimension]
+
+  def target(self) :
+    return self.dimension * (self.dimension**3 + 1) // 2
+
+  def errorScale(dimension) :
+    # Jumlah garis dikali simpangan terbesar yang mungkin per garis (32700 untuk n = 5)
+    lineIndex, _ = Cube.lineTable(dimension)
+    maxLineSum = dimension * dimension**3 - dimension * (dimension - 1) // 2
+    return len(lineIndex) * (maxLineSum - dimension * (dimension**3 + 1) // 2)
 
-    return new_cube
-  
   def rowSums(self):
-    results = []
-    for z in range(self.dimension) :
-      for y in range(self.dimension) :
-        sum = 0
-        for x in range(self.dimension) :
-          sum += self.cube[z][y][x]
-        results.append(sum)
-    return results
+    return self.cube.sum(axis=2).ravel().tolist()
   
   def columnSums(self):
-    results = []
-    for z in range(self.dimension) :
-      for x in range(self.dimension) :
-        sum = 0
-        for y in range(self.dimension) :
-          sum += self.cube[z][y][x]
-        results.append(sum)
-    return results
+    return self.cube.sum(axis=1).ravel().tolist()
   
   def pillarSums(self):
-    results = []
-    for y in range(self.dimension) :
-      for x in range(self.dimension) :
-        sum = 0
-        for z in range(self.dimension) :
-          sum += self.cube[z][y][x]
-        results.append(sum)
-    return results
+    return self.cube.sum(axis=0).ravel().tolist()
+
+  def _lineSlice(self, start, count) :
+    lineIndex, _ = Cube.lineTable(self.dimension)
+    return self.cube.reshape(-1)[lineIndex[start:start + count]].sum(axis=1).tolist()
   
   def spatialDiagonalSums(self):
-    diagonal_sums = [0, 0, 0, 0]
-    for i in range(self.dimension):
-      diagonal_sums[0] += self.cube[i][i][i]
-      diagonal_sums[1] += self.cube[i][self.dimension - 1 - i][i]
-      diagonal_sums[2] += self.cube[i][i][self.dimension-1 - i]
-      diagonal_sums[3] += self.cube[i][self.dimension-1 - i][self.dimension-1 - i]
-    return diagonal_sums
+    return self._lineSlice(3 * self.dimension**2, 4)
   
   def xyIntersectionDiagonalSums(self):
-    diagonal_sums = []
-    for z in range(self.dimension) :
-      diagon1 = 0
-      diagon2 = 0
-      for i in range(self.dimension) :
-        diagon1 += self.cube[z][i][i]
-        diagon2 += self.cube[z][i][self.dimension-1-i]
-      diagonal_sums.append(diagon1)
-      diagonal_sums.append(diagon2)
-    return diagonal_sums
+    return self._lineSlice(3 * self.dimension**2 + 4, 2 * self.dimension)
   
   def xzIntersectionDiagonalSums(self):
-    diagonal_sums = []
-    for y in range(self.dimension) :
-      diagon1 = 0
-      diagon2 = 0
-      for i in range(self.dimension) :
-        diagon1 += self.cube[i][y][i]
-        diagon2 += self.cube[i][y][self.dimension-1-i]
-      diagonal_sums.append(diagon1)
-      diagonal_sums.append(diagon2)
-    return diagonal_sums
+    return self._lineSlice(3 * self.dimension**2 + 4 + 2 * self.dimension, 2 * self.dimension)
   
   def yzIntersectionDiagonalSums(self):
-    diagonal_sums = []
-    for x in range(self.dimension) :
-      diagon1 = 0
-      diagon2 = 0
-      for i in range(self.dimension) :
-        diagon1 += self.cube[i][i][x]
-        diagon2 += self.cube[i][self.dimension-1-i][x]
-      diagonal_sums.append(diagon1)
-      diagonal_sums.append(diagon2)
-    return diagonal_sums
+    return self._lineSlice(3 * self.dimension**2 + 4 + 4 * self.dimension, 2 * self.dimension)
   
   def allSums(self) :
-    sums = []
-    sums += self.rowSums()
-    sums += self.columnSums()
-    sums += self.pillarSums()
-    sums += self.spatialDiagonalSums()
-    sums += self.xyIntersectionDiagonalSums()
-    sums += self.xzIntersectionDiagonalSums()
-    sums += self.yzIntersectionDiagonalSums()
-    return sums
+    lineIndex, _ = Cube.lineTable(self.dimension)
+    return self.cube.reshape(-1)[lineIndex].sum(axis=1)
+
+  def batchSums(states) :
+    # Jumlah semua garis untuk banyak state sekaligus, states berbentuk (..., n, n, n)
+    states = np.asarray(states)
+    dimension = states.shape[-1]
+    lineIndex, _ = Cube.lineTable(dimension)
+    flat = states.reshape(states.shape[:-3] + (dimension**3,))
+    return flat[..., lineIndex].sum(axis=-1)
+
+  def batchH(states, objective = "std") :
+    sums = Cube.batchSums(states)
+    dimension = np.shape(states)[-1]
+    target = dimension * (dimension**3 + 1) // 2
+    return objectives.get(objective).full(sums, target, Cube.errorScale(dimension))
+
+  def batchControlH(states) :
+    return Cube.batchH(states, "control")
   
-  def allCoordinatePairs(dimension) :
+  def allCoordinatePairs(dimension, rng = random) :
     coordinate_pairs = []
     coordinates = [(i, j, k) for i in range(dimension) for j in range(dimension) for k in range(dimension)]
 
     for i, coordinate1 in enumerate(coordinates):
       for coordinate2 in coordinates[i+1:]:
         coordinate_pairs.append((coordinate1, coordinate2))
-    random.shuffle(coordinate_pairs)
+    rng.shuffle(coordinate_pairs)
 
     return coordinate_pairs
+
+  def coordinatePairs(dimension, cells = None, rng = random) :
+    # Generator pasangan koordinat dalam urutan acak tanpa membangun list semua pasangan.
+    # Jika cells diberikan, hanya pasangan yang memuat minimal satu sel tersebut.
+    coordinates = [(i, j, k) for i in range(dimension) for j in range(dimension) for k in range(dimension)]
+    rng.shuffle(coordinates)
+    if cells is None :
+      for i, coordinate1 in enumerate(coordinates) :
+        for coordinate2 in coordinates[i+1:] :
+          yield coordinate1, coordinate2
+      return
+
+    cells = set(cells)
+    for i, coordinate1 in enumerate(coordinates) :
+      for coordinate2 in coordinates[i+1:] :
+        if coordinate1 in cells or coordinate2 in cells :
+          yield coordinate1, coordinate2
+
+  def candidateCells(self) :
+    # Sel yang dilewati minimal satu garis yang belum magic
+    lineIndex, _ = Cube.lineTable(self.dimension)
+    unsatisfied = np.asarray(self.sums) != self.target()
+    n = self.dimension
+    return [(int(cell) // (n*n), int(cell) // n % n, int(cell) % n) for cell in np.unique(lineIndex[unsatisfied])]
+
+  def randomPair(self, cells = None) :
+    n = self.dimension
+    rng = self.rng
+    coordinate1 = rng.choice(cells) if cells else (rng.randrange(n), rng.randrange(n), rng.randrange(n))
+    coordinate2 = coordinate1
+    while coordinate2 == coordinate1 :
+      coordinate2 = (rng.randrange(n), rng.randrange(n), rng.randrange(n))
+    return coordinate1, coordinate2
+
+  def findMove(self, neighborhood = "full", sample_size = 100, candidates = False) :
+    # full = steepest ascent, first = first improvement, sample = terbaik dari sample_size pasangan acak.
+    # Mengembalikan (pasangan, delta H) tanpa mengubah kubus.
+    cells = self.candidateCells() if candidates else None
+    if neighborhood == "sample" :
+      pairs = (self.randomPair(cells) for _ in range(sample_size))
+    elif neighborhood in ("full", "first") :
+      pairs = Cube.coordinatePairs(self.dimension, cells, self.rng)
+    else :
+      raise ValueError(f"Unknown neighborhood: {neighborhood}")
+
+    bestPair, bestDelta = None, -float("inf")
+    for pair in pairs :
+      delta = self.deltaHForSwap(*pair)
+      if delta > bestDelta :
+        bestPair, bestDelta = pair, delta
+        if neighborhood == "first" and delta > 0 :
+          break
+    return bestPair, bestDelta
+
+  def updateSums(self) :
+    # Hitung ulang semua state garis, wajib dipanggil setelah menulis self.cube secara langsung
+    sums = self.allSums()
+    target = self.target()
+    self.sums = sums.tolist()
+    self.magicCount = int((sums == target).sum())
+    self.sumTotal = int(sums.sum())
+    self.sumSquares = int((sums * sums).sum())
+    self.absError = int(np.abs(target - sums).sum())
+    self.version += 1
+
+  def _lineChanges(self, c1, c2) :
+    # Perubahan jumlah per garis jika nilai di c1 dan c2 ditukar
+    _, cellLines = Cube.lineTable(self.dimension)
+    n = self.dimension
+    flat = self.cube.reshape(-1)
+    i1 = (c1[0] * n + c1[1]) * n + c1[2]
+    i2 = (c2[0] * n + c2[1]) * n + c2[2]
+    v1 = int(flat[i1])
+    v2 = int(flat[i2])
+    lines1 = cellLines[i1]
+    lines2 = cellLines[i2]
+    changes = [(line, v2 - v1) for line in lines1 - lines2]
+    changes += [(line, v1 - v2) for line in lines2 - lines1]
+    return changes
+
+  def _changedAggregates(self, changes) :
+    target = self.target()
+    magicCount, sumTotal, sumSquares, absError = self.magicCount, self.sumTotal, self.sumSquares, self.absError
+    for line, diff in changes :
+      old = self.sums[line]
+      new = old + diff
+      magicCount += (new == target) - (old == target)
+      sumTotal += diff
+      sumSquares += new * new - old * old
+      absError += abs(target - new) - abs(target - old)
+    return magicCount, sumTotal, sumSquares, absError
+
+  def deltaHForSwap(self, c1, c2) :
+    # Selisih getH jika c1 dan c2 ditukar, tanpa mengubah kubus
+    return self.objective.delta(self, c1, c2)
+
+  def deltaControlHForSwap(self, c1, c2) :
+    return objectives.get("control").delta(self, c1, c2)
+
+  def swap(self, c1, c2) :
+    changes = self._lineChanges(c1, c2)
+    self.magicCount, self.sumTotal, self.sumSquares, self.absError = self._changedAggregates(changes)
+    for line, diff in changes :
+      self.sums[line] += diff
+    c1, c2 = tuple(c1), tuple(c2)
+    self.cube[c1], self.cube[c2] = self.cube[c2], self.cube[c1]
+    self.version += 1
+
+  def set(self, coordinate, value) :
+    _, cellLines = Cube.lineTable(self.dimension)
+    coordinate = tuple(coordinate)
+    n = self.dimension
+    diff = value - int(self.cube[coordinate])
+    changes = [(line, diff) for line in cellLines[(coordinate[0] * n + coordinate[1]) * n + coordinate[2]]]
+    self.magicCount, self.sumTotal, self.sumSquares, self.absError = self._changedAggregates(changes)
+    for line, change in changes :
+      self.sums[line] += change
+    self.cube[coordinate] = value
+    self.version += 1
+
+  def score(self, objective = None) :
+    # Nilai objektif state saat ini, dihitung sekali per version
+    objective = self.objective if objective is None else objectives.get(objective)
+    cached = self.scores.get(objective.name)
+    if cached is not None and cached[0] == self.version :
+      return cached[1]
+    value = objective.evaluate((self.magicCount, self.sumTotal, self.sumSquares, self.absError), len(self.sums), Cube.errorScale(self.dimension))
+    self.scores[objective.name] = (self.version, value)
+    return value
   
   def getH(self) :
-    sums = np.array(self.allSums())
-    target = self.dimension * (self.dimension**3 + 1) / 2
-    stddev = np.std(sums)
-    n = 0
-    for sum in sums :
-      if (sum == target) :
-        n += 1
-    return n - stddev*Cube.stdfactor
+    return self.score()
   
   def controlH(self) :
-    sums = self.allSums()
-    target = self.dimension * (self.dimension**3 + 1) / 2
-    n = 0
-    e = 0
-    for sum in sums :
-      if (sum == target) :
-        n += 1
-      e += abs(target - sum)
-    e /= 32700
-    return n + e
+    return self.score("control")
 
 
 class GeneticCube:
 
-  def  __init__(self, dimension, popSize = 8) :
+  CHECKPOINT_FILE = "ga_state.npz"
+  CHECKPOINT_VERSION = 1
+
+  def  __init__(self, dimension, popSize = 8, seed = None, objective = "control", initializer = "random") :
     self.dimension = dimension
     self.popSize = popSize
-    self.population = [Cube(dimension) for i in range(popSize)]
+    self.rng = np.random.default_rng(seed)
+    # Strategi populasi awal (lihat initializer.py)
+    self.initializer = initializer
+    # Objektif seleksi; fitness populasi di-cache per version populasi
+    self.objective = objectives.get(objective)
+    self.version = 0
+    self.fitnesses = None
+    self.fitnessVersion = -1
+    # Diganti profiling.Profiler() untuk mengukur fase fitness/selection/crossover/repair
+    self.profiler = NULL_PROFILER
+    cells = dimension**3
+    lineCount = len(Cube.lineTable(dimension)[0])
+
+    # Seluruh populasi disimpan di satu array (popSize x n^3), buffer dipakai ulang tiap generasi
+    self.population = np.zeros((popSize, cells), dtype=np.int64)
+    self.parents = np.zeros((popSize, cells), dtype=np.int64)
+    self.gathered = np.zeros((popSize, lineCount, dimension), dtype=np.int64)
+    self.sums = np.zeros((popSize, lineCount), dtype=np.int64)
+    self.counts = np.zeros((popSize, cells + 1), dtype=np.int64)
+    # Anak pertama mengambil sel dengan indeks sumbu terakhir < 2 dari parent pertama
+    self.crossoverMask = (np.arange(cells) % dimension) < 2
 
   def initPopulation(self) :
-    for cube in self.population :
-      cube.initialize()
+    import initializer as initializers
+    self.population[:] = initializers.population(self.initializer, self.popSize, self.dimension, self.rng)
+    self.version += 1
 
   def getFitnesses(self) :
-    fitnesses = []
-    for cube in self.population :
-      fitnesses.append(cube.controlH())
-    return fitnesses
+    # Penulisan langsung ke self.population harus diikuti self.version += 1
+    if self.fitnessVersion == self.version :
+      return self.fitnesses
+    with self.profiler.phase("fitness") :
+      lineIndex, _ = Cube.lineTable(self.dimension)
+      target = self.dimension * (self.dimension**3 + 1) // 2
+      np.take(self.population, lineIndex, axis=1, out=self.gathered)
+      np.sum(self.gathered, axis=2, out=self.sums)
+      self.fitnesses = self.objective.full(self.sums, target, Cube.errorScale(self.dimension))
+    self.profiler.count("evaluations", self.popSize)
+    self.fitnessVersion = self.version
+    return self.fitnesses
 
   def getBucketsFromFitnesses(self, fitnesses) :
-    sum = 0
-    for fitness in fitnesses :
-      sum += fitness
-    
-    buckets = []
-    progress = 0
-    for fitness in fitnesses :
-      progress += fitness/sum
-      buckets.append(progress)
-    return buckets
-
-  def generateRandom(self, buckets) :
-    roll = random.random()
-    for i in range(self.popSize) :
-      if roll < buckets[i] :
-        return i
-      
-  def combine(self, cube1, cube2) :
-    child1 = Cube(self.dimension)
-    child2 = Cube(self.dimension)
-
-    posCounts = self.dimension**3
-    for i in range(posCounts) :
-      z = i // (self.dimension**2)
-      y = (i % (self.dimension**2)) // self.dimension
-      x = i % self.dimension
+    # Objektif yang bisa negatif (misalnya std) digeser supaya peluang roulette tetap valid
+    if fitnesses.min() < 0 :
+      fitnesses = fitnesses - fitnesses.min() + 1e-9
+    buckets = np.cumsum(fitnesses)
+    return buckets / buckets[-1]
+
+  def generateRandom(self, buckets, count = 1) :
+    rolls = self.rng.random(count)
+    return np.minimum(np.searchsorted(buckets, rolls, side="right"), self.popSize - 1)
       
-      if (i < 2*posCounts//self.dimension) :
-        child1.cube[x][y][z] = cube1.cube[x][y][z]
-        child2.cube[x][y][z] = cube2.cube[x][y][z]
-      else :
-        child1.cube[x][y][z] = cube2.cube[x][y][z]
-        child2.cube[x][y][z] = cube1.cube[x][y][z]
-
-    return (child1, child2)
+  def combine(self, parents, children) :
+    # Pasangan parent (2j, 2j+1) menghasilkan anak (2j, 2j+1)
+    pairs = (self.popSize // 2) * 2
+    first, second = parents[0:pairs:2], parents[1:pairs:2]
+    np.copyto(children[0:pairs:2], second)
+    np.copyto(children[0:pairs:2], first, where=self.crossoverMask)
+    np.copyto(children[1:pairs:2], first)
+    np.copyto(children[1:pairs:2], second, where=self.crossoverMask)
   
-  def mutate(self, cube: Cube) :
-      mutated = {}
-      counts = dict()
-
-      for i in range(1, self.dimension**3 + 1) :
-          counts[i] = 0
-
-      for z in range(5) :
-          for y in range(5) :
-              for x in range(5) :
-                  counts[cube.cube[x][y][z]] += 1
-
-      unplacedNumbers = [key for key, value in counts.items() if value == 0]
-
-      for z in range(5) :
-        for y in range(5) :
-          for x in range(5) :
-            number = cube.cube[x][y][z]
-            if (counts[number] > 1) :
-              cube.cube[x][y][z] = unplacedNumbers.pop()
-              mutated[f"{x} {y} {z}"] = cube.cube[x][y][z]
-              counts[number] -= 1
-      return mutated
+  def mutate(self, cubes) :
+    # Perbaiki anak hasil crossover: angka duplikat diganti angka yang belum terpakai
+    cells = self.dimension**3
+    rows = np.arange(len(cubes))[:, None]
+    counts = self.counts[:len(cubes)]
+    counts.fill(0)
+    np.add.at(counts, (rows, cubes), 1)
+
+    order = np.argsort(cubes, axis=1, kind="stable")
+    ordered = np.take_along_axis(cubes, order, axis=1)
+    duplicate = np.zeros(cubes.shape, dtype=bool)
+    duplicate[:, 1:] = ordered[:, 1:] == ordered[:, :-1]
+
+    duplicateRows, duplicateCols = np.nonzero(duplicate)
+    _, missingValues = np.nonzero(counts[:, 1:] == 0)
+    cubes[duplicateRows, order[duplicateRows, duplicateCols]] = missingValues + 1
+    return len(missingValues)
   
-  def pop_max(self):
-    return max(self.population, key=lambda x: x.controlH())
+  def evolve(self, fitnesses) :
+    # Satu generasi: seleksi roulette, crossover per pasangan, perbaikan duplikat
+    with self.profiler.phase("selection") :
+      buckets = self.getBucketsFromFitnesses(fitnesses)
+      np.take(self.population, self.generateRandom(buckets, self.popSize), axis=0, out=self.parents)
+    with self.profiler.phase("crossover") :
+      self.combine(self.parents, self.population)
+    with self.profiler.phase("repair") :
+      repaired = self.mutate(self.population[:(self.popSize // 2) * 2])
+    self.profiler.count("generations")
+    self.profiler.count("repaired", repaired)
+    self.version += 1
+
+  def pop_max(self, fitnesses):
+    return int(np.argmax(fitnesses))
   
-  def pop_h_avg(self):
-    return sum(x.controlH() for x in self.population) / len(self.population)
-
-  def geneticAlgorithm(self, iterationCount = 1000) :
-    self.initPopulation()
-    results = {}
-    results["max_h"] = []
-    results["avg_h"] = []
-    results["max_cubes"] = [] 
-
-    max_cube = self.pop_max()
-    results["max_cubes"].append(max_cube.cube)
-    results["max_h"].append(max_cube.controlH())
-    results["avg_h"].append(self.pop_h_avg())
-
-    for i in range(iterationCount) :
-
-      max_cube = self.pop_max()
-      results["max_cubes"].append(max_cube.cube)
-      results["max_h"].append(max_cube.controlH())
-      results["avg_h"].append(self.pop_h_avg())
-
+  def pop_h_avg(self, fitnesses):
+    return float(np.mean(fitnesses))
+
+  def checkpointLogs(self, checkpoint) :
+    return {
+      "max_h": AppendLog(os.path.join(checkpoint, "max_h.bin"), np.float64),
+      "avg_h": AppendLog(os.path.join(checkpoint, "avg_h.bin"), np.float64),
+      "max_cubes": AppendLog(os.path.join(checkpoint, "max_cubes.bin"), np.int16 if self.dimension**3 < 2**15 else np.int32, (self.dimension,) * 3),
+    }
+
+  def saveCheckpoint(self, checkpoint, logs, histories, policy, generation, iterationCount, interval, elapsed) :
+    # Riwayat penuh hanya ditambahkan ke log, snapshot berisi populasi + state RNG untuk generasi berikutnya.
+    # Riwayat terbatas (ring/downsample) berukuran kecil dan disimpan utuh di snapshot.
+    arrays = {}
+    for key, history in histories.items() :
+      if policy.bounded() :
+        arrays[key] = history.values()
+        arrays[key + "_state"] = encodeState(history.state())
+      else :
+        logs[key].append(history.buffer, generation)
+    atomicSave(
+      os.path.join(checkpoint, GeneticCube.CHECKPOINT_FILE),
+      version=np.array(GeneticCube.CHECKPOINT_VERSION),
+      dimension=np.array(self.dimension),
+      popSize=np.array(self.popSize),
+      generation=np.array(generation),
+      iterationCount=np.array(iterationCount),
+      interval=np.array(interval),
+      elapsed=np.array(elapsed),
+      population=self.population,
+      objective=np.array(self.objective.name),
+      rng=encodeState(self.rng.bit_generator.state),
+      history=encodeState(vars(policy)),
+      **arrays,
+    )
+
+  def resume(checkpoint) :
+    with np.load(os.path.join(checkpoint, GeneticCube.CHECKPOINT_FILE)) as snapshot :
+      if int(snapshot["version"]) != GeneticCube.CHECKPOINT_VERSION :
+        raise ValueError(f"Unsupported GA checkpoint version {int(snapshot['version'])}")
+      objective = str(snapshot["objective"]) if "objective" in snapshot else "control"
+      agent = GeneticCube(int(snapshot["dimension"]), int(snapshot["popSize"]), objective=objective)
+      agent.population[:] = snapshot["population"]
+      agent.version += 1
+      agent.rng.bit_generator.state = decodeState(snapshot["rng"])
+      state = {key: snapshot[key].item() for key in ("generation", "iterationCount", "interval", "elapsed")}
+      policy = HistoryPolicy(**decodeState(snapshot["history"])) if "history" in snapshot else HistoryPolicy()
+      if policy.bounded() :
+        state["histories"] = {key: (snapshot[key], decodeState(snapshot[key + "_state"])) for key in ("max_h", "avg_h", "max_cubes")}
+    return agent.geneticAlgorithm(state["iterationCount"], checkpoint, state["interval"], state, history=policy)
+
+  def geneticAlgorithm(self, iterationCount = 1000, checkpoint = None, checkpoint_interval = 100, resumeState = None, progress = None, stop = None, progress_interval = 10, history = None) :
+    # progress(record) dipanggil tiap progress_interval generasi, nilai True menghentikan run.
+    # stop (StopConditions) memeriksa fitness terbaik per generasi.
+    # history (HistoryPolicy) membatasi riwayat max_h/avg_h/max_cubes; downsample tidak menyimpan max_cubes.
+    start_time = time.time()
+    policy = history or HistoryPolicy()
+    histories = {
+      "max_h": History(policy, capacity=iterationCount + 1),
+      "avg_h": History(policy, capacity=iterationCount + 1),
+      # Kubus terbaik per generasi disimpan ringkas dalam satu array int16
+      "max_cubes": History(policy, (self.dimension,) * 3, np.int16 if self.dimension**3 < 2**15 else np.int32, iterationCount + 1, sampled=False),
+    }
+
+    logs = None
+    if checkpoint :
+      os.makedirs(checkpoint, exist_ok=True)
+      logs = self.checkpointLogs(checkpoint)
+
+    if resumeState is None :
+      self.initPopulation()
+      start, elapsed = 0, 0.0
+    else :
+      start, elapsed = resumeState["generation"], resumeState["elapsed"]
+      for key, history in histories.items() :
+        if policy.bounded() :
+          history.restore(*resumeState["histories"][key])
+        else :
+          history.restore(logs[key].read(start), {"count": start, "total": start, "stride": 1})
+    # Snapshot akhir bisa sudah memuat generasi terakhir, generasi tersebut tidak dicatat dua kali
+    recorded = histories["max_h"].total
+
+    reason = None
+    best_h = -float("inf")
+    for i in range(start, iterationCount + 1) :
+      # Fitness dihitung tepat sekali per individu per generasi
       fitnesses = self.getFitnesses()
-      buckets = self.getBucketsFromFitnesses(fitnesses)
-
-      parents = []
-      parents_idx = []
-      for j in range(self.popSize) :
-        randomIdx = self.generateRandom(buckets)
-        parents_idx.append(randomIdx)
-        parents.append(self.population[randomIdx])
-      
-      mutations = []
-      for j in range(self.popSize//2) :
-        self.population[2*j], self.population[2*j + 1] = self.combine(parents[2*j], parents[2*j + 1])
-        mutations.append(self.mutate(self.population[2*j]))
-        mutations.append(self.mutate(self.population[2*j + 1]))
+      with self.profiler.phase("bookkeeping") :
+        max_idx = self.pop_max(fitnesses)
+        max_h = fitnesses[max_idx]
+        if i >= recorded :
+          histories["max_cubes"].append(self.population[max_idx].reshape((self.dimension,) * 3))
+          histories["max_h"].append(max_h)
+          histories["avg_h"].append(self.pop_h_avg(fitnesses))
+
+        if stop is not None or progress is not None :
+          now = elapsed + time.time() - start_time
+          best_h = max(best_h, max_h)
+          if stop is not None :
+            reason = stop.check(i, max_h, now)
+          if progress is not None and (i % progress_interval == 0 or reason or i == iterationCount) :
+            if progress(record([i, max_h, best_h, float("nan"), float("nan"), 0, now])) :
+              reason = reason or "callback"
+
+      if i == iterationCount or reason :
+        break
+
+      self.evolve(fitnesses)
+
+      if logs and (i + 1) % checkpoint_interval == 0 :
+        with self.profiler.phase("checkpoint") :
+          self.saveCheckpoint(checkpoint, logs, histories, policy, i + 1, iterationCount, checkpoint_interval, elapsed + time.time() - start_time)
+
+    # Run yang berhenti dini dicatat sebagai run yang selesai di generasi tersebut
+    last = i
+    if logs :
+      with self.profiler.phase("checkpoint") :
+        self.saveCheckpoint(checkpoint, logs, histories, policy, last, last, checkpoint_interval, elapsed + time.time() - start_time)
 
-    best_cube = max(self.population, key=lambda cube: cube.getH())
+    results = {}
+    results["max_cubes"] = histories["max_cubes"].values()
+    results["max_h"] = histories["max_h"].values().tolist()
+    results["avg_h"] = histories["avg_h"].values().tolist()
+    results["history_stride"] = histories["max_h"].stride
+    results["history_offset"] = histories["max_h"].offset
+    results["stop_reason"] = reason
+    # Individu terbaik dipilih dari fitness generasi terakhir (sudah di-cache), tanpa evaluasi ulang
+    best_cube = Cube(self.dimension, self.population[self.pop_max(self.getFitnesses())])
     results["final_state"] = best_cube.cube
-    results["final H"] = best_cube.controlH()
+    results["final H"] = best_cube.score(self.objective)
     results["control H"] = best_cube.controlH()
+    results["duration"] = elapsed + time.time() - start_time
+    if self.profiler.enabled :
+      results["profile"] = self.profiler.report(time.time() - start_time)
     return results
   
-def run_algorithm(algorithm, argv=None):
-  argv = argv or {}
-  
-  command = ["./Cube.exe", algorithm]
-
-  for key, value in argv.items():
-      command.extend([f"--{key}", str(value)])
+NATIVE_ALGORITHMS = ["steepest ascent", "sideways ascent", "random restart", "stochastic", "simulated annealing", "parallel tempering", "tabu search", "late acceptance"]
 
-  if (algorithm in ["steepest ascent", "sideways ascent", "random restart", "stochastic", "simulated annealing"]) :
-    try:
-        result_json = subprocess.check_output(command, text=True)
-        result = json.loads(result_json)
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing the command: {e}")
-        result = {"error": str(e)}
-
-    except json.JSONDecodeError:
-        print("Failed to parse JSON output from the binary.")
-        result = {"error": "Invalid JSON output"}
+def run_algorithm(algorithm, argv=None, progress=None):
+  # Opsi target_h, time_budget dan stall menghentikan run lebih awal (lihat progress.py),
+  # progress(record) menerima laporan berkala tiap progress_interval iterasi/generasi.
+  # initializer = strategi state awal (random, algebraic, greedy; lihat initializer.py).
+  # profile = 1 menambahkan laporan counter/timer result["profile"], trace = nama file folded stack (menyalakan profile)
+  argv = argv or {}
+  if argv.get("trace") :
+    argv = dict(argv, profile=1)
+
+  if (algorithm in NATIVE_ALGORITHMS) :
+    result = run_native(algorithm, argv, progress)
+    if "profile_counters" in result :
+      result["profile"] = nativeReport(result)
+  elif algorithm == "genetic algorithm" and (argv.get("islands") or 1) > 1 :
+    # Diimpor di sini karena island.py bergantung pada modul ini
+    from island import IslandGeneticCube
+    geneticAgent = IslandGeneticCube(argv.get("dimension") or 5, argv.get("popSize") or 8, argv["islands"], argv.get("topology") or "ring",
+                                     argv.get("migration_interval") or 10, argv.get("migrants") or 1, argv.get("seed"), argv.get("max_workers"),
+                                     argv.get("objective") or "control", bool(argv.get("profile")), argv.get("initializer") or "random")
+    result = geneticAgent.geneticAlgorithm(argv.get("max_iteration") or 1000, progress, StopConditions.fromOptions(argv), HistoryPolicy.fromOptions(argv))
   elif algorithm == "genetic algorithm" :
-    start_time = time.time()
-    geneticAgent = GeneticCube(5, argv.get("popSize") or 8)
-    result = geneticAgent.geneticAlgorithm(argv.get("max_iteration") or 1000)
-    result["duration"] = time.time() - start_time
+    geneticAgent = GeneticCube(argv.get("dimension") or 5, argv.get("popSize") or 8, argv.get("seed"), argv.get("objective") or "control",
+                               argv.get("initializer") or "random")
+    if argv.get("profile") :
+      geneticAgent.profiler = Profiler()
+    result = geneticAgent.geneticAlgorithm(argv.get("max_iteration") or 1000, argv.get("checkpoint"), argv.get("checkpoint_interval") or 100,
+                                           progress=progress, stop=StopConditions.fromOptions(argv), progress_interval=argv.get("progress_interval") or 10,
+                                           history=HistoryPolicy.fromOptions(argv))
   else :
     result = "What are you doing man!"
-  return result
\ No newline at end of file
+
+  if argv.get("trace") and isinstance(result, dict) and "profile" in result :
+    writeTrace(result["profile"], argv["trace"], algorithm)
+  return result
+
+def stream_algorithm(algorithm, argv=None):
+  # Generator event: {"event": "progress", ...} secara berkala, diakhiri {"event": "result", "result": ...}.
+  # Menutup generator (break dari loop) menghentikan run pada laporan progres berikutnya.
+  events = queue.Queue()
+  stopped = threading.Event()
+
+  def progress(record):
+    events.put(dict(record, event="progress"))
+    return stopped.is_set()
+
+  def worker():
+    try:
+      result = run_algorithm(algorithm, argv, progress)
+    except Exception as e:
+      result = {"error": str(e)}
+    events.put({"event": "result", "result": result})
+
+  thread = threading.Thread(target=worker, daemon=True)
+  thread.start()
+  try:
+    while True:
+      event = events.get()
+      yield event
+      if event["event"] == "result":
+        return
+  finally:
+    stopped.set()
+    thread.join()
+
+def spawn_seeds(seed, count):
+  # Seed independen untuk run paralel dari satu seed induk (SeedSequence.spawn), berupa int 64-bit
+  # supaya bisa dipakai oleh GA (NumPy) maupun engine native (mt19937 lewat seed_seq).
+  children = np.random.SeedSequence(seed).spawn(count)
+  return [int(child.generate_state(1, np.uint64)[0]) for child in children]
+
+def resume(checkpoint):
+  # Lanjutkan run (native atau GA) dari checkpoint terakhir di direktori tersebut
+  if os.path.exists(os.path.join(checkpoint, GeneticCube.CHECKPOINT_FILE)) :
+    return GeneticCube.resume(checkpoint)
+  return run_native("resume", {"resume": checkpoint})
+
+def run_native(algorithm, argv, progress=None):
+  if native.isAvailable() :
+    try:
+      return native.run(algorithm, argv, progress)
+    except RuntimeError as e:
+      print(f"Error running the native engine: {e}")
+      return {"error": str(e)}
+  if progress is not None :
+    return {"error": "Progress callbacks require the native library"}
+  return run_subprocess(algorithm, argv)
+
+def run_subprocess(algorithm, argv):
+  # Fallback jika shared library belum di-build, memakai binary CLI
+  command = [native.EXECUTABLE_PATH, algorithm]
+
+  for key, value in argv.items():
+      command.extend([f"--{key}", native.optionValue(value)])
+
+  try:
+      result_json = subprocess.check_output(command, text=True)
+      result = json.loads(result_json)
+      for key in ("initial_state", "final_state") :
+        if key in result :
+          result[key] = np.array(result[key])
+      result["stop_reason"] = STOP_REASONS[result.get("stop_reason", 0)]
+  except (subprocess.CalledProcessError, FileNotFoundError) as e:
+      print(f"Error executing the command: {e}")
+      result = {"error": str(e)}
+
+  except json.JSONDecodeError:
+      print("Failed to parse JSON output from the binary.")
+      result = {"error": "Invalid JSON output"}
+  return result
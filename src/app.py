@@ -1,54 +1,79 @@
+import argparse
+import json
+import os
+import sys
 import algorithm
-from beta import *
-from plotly.offline import plot
-from plotly.subplots import make_subplots
+from trajectory import Trajectory
+from profiling import formatReport
 
-def resultToStates(config) :
-    currState = np.array(config["initial_state"])
-    states = [currState.copy()]
+# plotly dan beta hanya diimpor saat visualisasi diminta (lihat visualize), mode headless tidak memuatnya
 
-    for [coord1, coord2] in config["switches"]:
-        currState[coord1[1], coord1[2], coord1[0]], currState[coord2[1], coord2[2], coord2[0]] = \
-            currState[coord2[1], coord2[2], coord2[0]], currState[coord1[1], coord1[2], coord1[0]]
-        
-        states.append(currState.copy())
-    
-    return states
+def resultToStates(config) :
+    # State di-replay secara lazy dari switch log, tidak di-materialisasi semua
+    return Trajectory.fromResult(config)
 
 def mainDihitungDulu(algo, argv = {}):
 
     result = algorithm.run_algorithm(algo, argv)
     genericPrinter(result)
-
+    visualize(algo, result)
+    return result
+
+def visualize(algo, result, show = True, plot_dir = "."):
+    # show = False hanya menulis file HTML ke plot_dir tanpa membuka browser
+    import numpy as np
+    import plotly.graph_objects as go
+    from beta import CubeVisualizer
+    from plotly.offline import plot
+    from plotly.subplots import make_subplots
+
+    # detail summary/downsample tidak menyimpan switches atau max_cubes: yang divisualisasikan hanya final_state
+    final_state = np.asarray(result["final_state"])
     if algo != 'genetic algorithm' :
         cube_states = resultToStates(result)
-    else :
+        if not np.array_equal(cube_states.final_state(), final_state) :
+            cube_states = np.array([final_state])
+    elif len(result.get("max_cubes", [])) :
         cube_states = np.array(result["max_cubes"])
-        
-    visualizer = CubeVisualizer(cube_states)
-    visualizer.fig.show()
+    else :
+        # GA model pulau tidak menyimpan kubus terbaik per generasi
+        cube_states = np.array([final_state])
+
+    visualizer = CubeVisualizer(cube_states, max_frames=200, sampling="improvement")
+    if show :
+        visualizer.fig.show()
+    else :
+        visualizer.fig.write_html(os.path.join(plot_dir, 'cube_visualization.html'))
+
+    # Iterasi tiap nilai riwayat (downsample menyimpan tiap history_stride, ring buffer membuang history_offset langkah)
+    def iterations(values) :
+        return [result.get("history_offset", 0) + i * result.get("history_stride", 1) for i in range(len(values))]
 
     if algo != "genetic algorithm" :
-        objective_value = result["h_values"]
+        objective_value = result.get("h_values", [])
+        if len(objective_value) == 0 :
+            return
         line_fig1 = go.Figure()
-        line_fig1.add_trace(go.Scatter(x=list(range(len(objective_value))), y=objective_value, mode='lines+markers', name='Objective Value'))
+        line_fig1.add_trace(go.Scatter(x=iterations(objective_value), y=objective_value, mode='lines+markers', name='Objective Value'))
         line_fig1.update_layout(title='Objective Value with respect to Iteration Number',
                                 xaxis_title='Iteration Number',
                                 yaxis_title='Objective Value')
 
-        plot(line_fig1, filename='objective_value_plot.html', auto_open=True)
+        plot(line_fig1, filename=os.path.join(plot_dir, 'objective_value_plot.html'), auto_open=show)
     else :
         max_objective_value = result["max_h"]
         avg_objective_value = result["avg_h"]
+        if len(max_objective_value) == 0 :
+            return
         line_fig1 = make_subplots(specs=[[{"secondary_y": True}]])
 
         line_fig1.add_trace(
-            go.Scatter(x=list(range(len(max_objective_value))), y=max_objective_value, mode='lines+markers', name='Max Objective Value'),
+            go.Scatter(x=iterations(max_objective_value), y=max_objective_value, mode='lines+markers', name='Max Objective Value'),
             secondary_y=False,
         )
 
         line_fig1.add_trace(
-            go.Scatter(x=list(range(len(avg_objective_value))), y=avg_objective_value, mode='lines+markers', name='Avg Objective Value'),
+            go.Scatter(x=iterations(avg_objective_value), y=avg_objective_value, mode='lines+markers', name='Avg Objective Value'),
             secondary_y=True,
         )
 
@@ -60,18 +85,20 @@ def mainDihitungDulu(algo, argv = {}):
         )
 
         # Plot the figure
-        plot(line_fig1, filename='objective_value_plot.html', auto_open=True)
+        plot(line_fig1, filename=os.path.join(plot_dir, 'objective_value_plot.html'), auto_open=show)
 
     if algo == "simulated annealing":
         edeltaT = result["boltzmanns"]
+        if len(edeltaT) == 0 :
+            return
 
         line_fig2 = go.Figure()
-        line_fig2.add_trace(go.Scatter(x=list(range(len(edeltaT))), y=edeltaT, mode='lines+markers', name='e^delta(E)/T Value'))
+        line_fig2.add_trace(go.Scatter(x=iterations(edeltaT), y=edeltaT, mode='lines+markers', name='e^delta(E)/T Value'))
         line_fig2.update_layout(title='e^delta(E)/T Value with respect to Iteration Number',
                                 xaxis_title='Iteration Number',
                                 yaxis_title='e^delta(E)/T Value')
 
-        plot(line_fig2, filename='edeltaT_value_plot.html', auto_open=True)
+        plot(line_fig2, filename=os.path.join(plot_dir, 'edeltaT_value_plot.html'), auto_open=show)
 
 def genericPrinter(output):
    print("\n========================== OUTPUT RESULTS ==========================")
@@ -81,53 +108,108 @@ def genericPrinter(output):
    if (output.get('stucks')) :
       print("Stucks: ", output['stucks'])
 
-   if(output.get('iteration_per_restarts')) :
+   if(output.get('iteration_per_restarts') is not None) :
        print("Iteration per Restarts: ", output['iteration_per_restarts'])
        print("Restart Counts: ", output['restart_counts'])
 
-
-isFile = input("Do you want to input your own file? TODO (y/n) => ")
-print("========================== Choose your algorithm ==========================")
-print("1. Steepest Ascent Hill Climb")
-print("2. Hill Climb with Sideways Move")
-print("3. Random Restart Hill Climb")
-print("4. Stochastic Hill Climbing")
-print("5. Simulated Annealing")
-print("6. Genetic Algorithm")
-print("7. Die")
-alg = int(input("=> "))
-
-while True:
-    if(alg == 1 or alg == 4 or alg == 5):
-        output = None
-        if(alg==1):
-         mainDihitungDulu("steepest ascent")
-        elif(alg==4):
-         mainDihitungDulu("stochastic")
-        elif(alg==5):
-         mainDihitungDulu("simulated annealing")
-    elif(alg == 2):
-        max_limit = int(input("Max Limit => "))
-        mainDihitungDulu("sideways ascent",{"max_limit": max_limit})
-    elif(alg== 3):
-        max_restart = int(input("Max Restart => "))
-        mainDihitungDulu("random restart",{"max_restart": max_restart})
-    elif(alg==6):
-        population_size = int(input("Population Size => "))
-        iteration_max = int(input("Maximum Iteration => "))
-        output = mainDihitungDulu("genetic algorithm",{"popSize": population_size, "max_iteration": iteration_max})
-    elif(alg==7):
-        exit()
-    else:
-        print("Invalid input, so i will die")
-        break
-    print("\n\n========================== Choose your algorithm ==========================")
-    print("Choose your algorithm:")
+   if output.get('profile') :
+       print(formatReport(output['profile']))
+
+def toJson(value):
+    # Array numpy (final_state, max_cubes, ...) ditulis sebagai list
+    if hasattr(value, 'tolist') :
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def main(args = None):
+    # Mode headless: algoritma dan parameter dari argumen, tanpa input() dan tanpa figure kecuali --plot/--show
+    from batch import ALGORITHMS, parseParams
+
+    parser = argparse.ArgumentParser(description="Run one local search algorithm without the interactive menu")
+    parser.add_argument("algorithm", choices=ALGORITHMS)
+    parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="algorithm parameter, e.g. --param max_limit=50")
+    parser.add_argument("--output", help="write the full result as JSON to this file")
+    parser.add_argument("--plot", action="store_true", help="write the visualization and plots as HTML files")
+    parser.add_argument("--plot-dir", default=".", help="directory for the HTML files of --plot")
+    parser.add_argument("--show", action="store_true", help="open the visualization and plots in a browser")
+    parser.add_argument("--quiet", action="store_true", help="do not print the result summary")
+    args = parser.parse_args(args)
+
+    result = algorithm.run_algorithm(args.algorithm, parseParams(args.param))
+    if isinstance(result, dict) and "error" in result :
+        print(f"Error: {result['error']}", file=sys.stderr)
+        return 1
+    if not args.quiet :
+        genericPrinter(result)
+    if args.output :
+        with open(args.output, "w") as file :
+            json.dump(result, file, default=toJson)
+    if args.plot or args.show :
+        os.makedirs(args.plot_dir, exist_ok=True)
+        visualize(args.algorithm, result, args.show, args.plot_dir)
+    return 0
+
+def interactive():
+    isFile = input("Do you want to input your own file? TODO (y/n) => ")
+    print("========================== Choose your algorithm ==========================")
     print("1. Steepest Ascent Hill Climb")
     print("2. Hill Climb with Sideways Move")
     print("3. Random Restart Hill Climb")
     print("4. Stochastic Hill Climbing")
     print("5. Simulated Annealing")
     print("6. Genetic Algorithm")
-    print("7. Die")
-    alg = int(input("=> ")) 
+    print("7. Tabu Search")
+    print("8. Late Acceptance Hill Climbing")
+    print("9. Die")
+    alg = int(input("=> "))
+
+    while True:
+        if(alg == 1 or alg == 4 or alg == 5):
+            output = None
+            if(alg==1):
+             mainDihitungDulu("steepest ascent")
+            elif(alg==4):
+             mainDihitungDulu("stochastic")
+            elif(alg==5):
+             mainDihitungDulu("simulated annealing")
+        elif(alg == 2):
+            max_limit = int(input("Max Limit => "))
+            mainDihitungDulu("sideways ascent",{"max_limit": max_limit})
+        elif(alg== 3):
+            max_restart = int(input("Max Restart => "))
+            mainDihitungDulu("random restart",{"max_restart": max_restart})
+        elif(alg==6):
+            population_size = int(input("Population Size => "))
+            iteration_max = int(input("Maximum Iteration => "))
+            output = mainDihitungDulu("genetic algorithm",{"popSize": population_size, "max_iteration": iteration_max})
+        elif(alg==7):
+            iteration_max = int(input("Maximum Iteration => "))
+            tenure = int(input("Tabu Tenure => "))
+            mainDihitungDulu("tabu search",{"max_iteration": iteration_max, "tenure": tenure})
+        elif(alg==8):
+            iteration_max = int(input("Maximum Iteration => "))
+            history_length = int(input("History Length => "))
+            mainDihitungDulu("late acceptance",{"max_iteration": iteration_max, "lahc_length": history_length})
+        elif(alg==9):
+            exit()
+        else:
+            print("Invalid input, so i will die")
+            break
+        print("\n\n========================== Choose your algorithm ==========================")
+        print("Choose your algorithm:")
+        print("1. Steepest Ascent Hill Climb")
+        print("2. Hill Climb with Sideways Move")
+        print("3. Random Restart Hill Climb")
+        print("4. Stochastic Hill Climbing")
+        print("5. Simulated Annealing")
+        print("6. Genetic Algorithm")
+        print("7. Tabu Search")
+        print("8. Late Acceptance Hill Climbing")
+        print("9. Die")
+        alg = int(input("=> "))
+
+if __name__ == "__main__" :
+    if len(sys.argv) > 1 :
+        sys.exit(main())
+    interactive()
@@ -0,0 +1,178 @@
+import argparse
+import os
+import struct
+import numpy as np
+
+# Arsip state biner: header 32 byte lalu record berukuran tetap (n^3 nilai per state, int8 untuk n <= 5,
+# int16 sampai n^3 < 2^15, selain itu int32). Dibaca lewat memory map, jadi slicing dan iterasi tidak menyalin
+# dan tidak memuat seluruh file.
+MAGIC = b"CUBESTAT"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIIIQ")
+
+def stateDtype(dimension):
+  cells = dimension**3
+  if cells <= np.iinfo(np.int8).max :
+    return np.dtype(np.int8)
+  if cells <= np.iinfo(np.int16).max :
+    return np.dtype(np.int16)
+  return np.dtype(np.int32)
+
+def isArchive(filename):
+  with open(filename, "rb") as file :
+    return file.read(len(MAGIC)) == MAGIC
+
+class StateArchive:
+  # Urutan state (len, indeks, slice, iterasi) berbentuk (n, n, n), setiap state adalah view read-only ke file
+
+  def __init__(self, filename):
+    with open(filename, "rb") as file :
+      header = file.read(HEADER.size)
+    if len(header) < HEADER.size :
+      raise ValueError(f"Not a cube state archive: {filename}")
+    magic, version, dimension, itemsize, _, count = HEADER.unpack(header)
+    if magic != MAGIC :
+      raise ValueError(f"Not a cube state archive: {filename}")
+    if version != FORMAT_VERSION :
+      raise ValueError(f"Unsupported state archive version {version}")
+
+    self.filename = filename
+    self.dimension = dimension
+    self.dtype = stateDtype(dimension)
+    if self.dtype.itemsize != itemsize :
+      raise ValueError(f"Corrupt state archive header: {filename}")
+    shape = (count,) + (dimension,) * 3
+    if count == 0 :
+      self.states = np.empty(shape, dtype=self.dtype)
+    else :
+      self.states = np.memmap(filename, dtype=self.dtype, mode="r", offset=HEADER.size, shape=shape)
+
+  def __len__(self):
+    return len(self.states)
+
+  def __getitem__(self, index):
+    return self.states[index]
+
+  def __iter__(self):
+    return iter(self.states)
+
+  def chunks(self, size = 4096):
+    for start in range(0, len(self.states), size) :
+      yield self.states[start:start + size]
+
+class ArchiveWriter:
+  # Menulis state satu per satu atau per blok; jumlah state di header diperbarui saat close
+
+  def __init__(self, filename, dimension):
+    self.filename = filename
+    self.dimension = dimension
+    self.dtype = stateDtype(dimension)
+    self.count = 0
+    self.file = open(filename, "wb")
+    self._writeHeader()
+
+  def _writeHeader(self):
+    self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.dimension, self.dtype.itemsize, 0, self.count))
+
+  def append(self, state):
+    self.extend(np.asarray(state).reshape((1,) + (self.dimension,) * 3))
+
+  def extend(self, states):
+    # states = array (k, n, n, n) atau iterable state apa pun (misalnya Trajectory), ditulis per blok
+    if not isinstance(states, np.ndarray) :
+      block = []
+      for state in states :
+        block.append(state)
+        if len(block) == 4096 :
+          self.extend(np.stack(block))
+          block = []
+      if block :
+        self.extend(np.stack(block))
+      return
+    np.ascontiguousarray(states, dtype=self.dtype).tofile(self.file)
+    self.count += len(states)
+
+  def close(self):
+    if self.file.closed :
+      return
+    self.file.seek(0)
+    self._writeHeader()
+    self.file.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+def saveStates(states, filename):
+  # states: iterable state (n, n, n), misalnya Trajectory atau list array
+  iterator = iter(states)
+  first = next(iterator, None)
+  if first is None :
+    raise ValueError("No states to save")
+  with ArchiveWriter(filename, np.shape(first)[-1]) as writer :
+    writer.append(first)
+    writer.extend(iterator)
+  return writer.count
+
+def _parseState(text, dimension):
+  numbers = np.array(text.split(), dtype=np.int64)
+  if len(numbers) == 0 :
+    return None
+  n = round(len(numbers) ** (1/3))
+  if n**3 != len(numbers) or (dimension is not None and n != dimension) :
+    raise ValueError(f"Each state must contain n^3 numbers. Found {len(numbers)} numbers.")
+  return numbers.reshape((n, n, n))
+
+def convertText(source, destination, chunk_size = 1 << 20):
+  # Format teks lama: state dipisah koma, angka dipisah whitespace. Dibaca per chunk, memori tidak bergantung
+  # pada ukuran file. Orde kubus diambil dari state pertama; state yang tidak valid dilewati.
+  writer = None
+  pending = ""
+  try :
+    with open(source, "r") as file :
+      while True :
+        chunk = file.read(chunk_size)
+        parts = (pending + chunk).split(",")
+        # Bagian terakhir mungkin terpotong di tengah chunk, disimpan sampai chunk berikutnya
+        pending = parts.pop() if chunk else ""
+        for part in parts :
+          try :
+            state = _parseState(part, writer.dimension if writer else None)
+          except ValueError as e :
+            print(f"Error processing state: {e}")
+            continue
+          if state is None :
+            continue
+          if writer is None :
+            writer = ArchiveWriter(destination, state.shape[0])
+          writer.append(state)
+        if not chunk :
+          break
+  finally :
+    if writer is not None :
+      writer.close()
+  if writer is None :
+    raise ValueError(f"No states found in {source}")
+  return writer.count
+
+def openStates(filename):
+  # Arsip biner dibuka langsung; file teks dikonversi sekali ke filename + ".cubes" (diulang jika teksnya lebih baru)
+  if isArchive(filename) :
+    return StateArchive(filename)
+  converted = filename + ".cubes"
+  if not os.path.exists(converted) or os.path.getmtime(converted) < os.path.getmtime(filename) :
+    convertText(filename, converted)
+  return StateArchive(converted)
+
+def main():
+  parser = argparse.ArgumentParser(description="Convert cube state text files to the binary state archive")
+  parser.add_argument("source", help="text file with comma separated states")
+  parser.add_argument("destination", help="binary archive to write")
+  args = parser.parse_args()
+  count = convertText(args.source, args.destination)
+  print(f"Wrote {count} states to {args.destination}")
+
+if __name__ == "__main__":
+  main()
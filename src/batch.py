@@ -0,0 +1,147 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import signal
+import time
+import numpy as np
+import algorithm
+
+ALGORITHMS = algorithm.NATIVE_ALGORITHMS + ["genetic algorithm"]
+
+def _initWorker() :
+  # Ctrl-C ditangani proses utama, worker cukup di-terminate
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def summarizeRun(run, algo, result, seed=None) :
+  if not isinstance(result, dict) or "error" in result :
+    error = result.get("error") if isinstance(result, dict) else str(result)
+    return {"run": run, "algorithm": algo, "seed": seed, "error": error}
+
+  final_state = np.asarray(result["final_state"])
+  cube = algorithm.Cube.fromArray(final_state)
+  return {
+    "run": run,
+    "algorithm": algo,
+    "seed": seed,
+    "final H": result["final H"],
+    "control H": result["control H"],
+    "duration": result["duration"],
+    "magic_lines": cube.magicCount,
+    "solved": cube.magicCount == len(cube.sums),
+    "final_state": final_state.tolist(),
+  }
+
+def _runOne(task) :
+  run, algo, argv, seed = task
+  # Proses hasil fork mewarisi state random yang sama, tiap run memakai stream-nya sendiri
+  random.seed(seed)
+  return summarizeRun(run, algo, algorithm.run_algorithm(algo, dict(argv, seed=seed)), seed)
+
+def iter_batch(algo, runs, argv=None, max_workers=None, seed=None) :
+  # Yield ringkasan tiap run begitu selesai (urutan selesai, bukan urutan run).
+  # Seed tiap run diturunkan dari seed batch, run ke-i selalu mendapat seed yang sama
+  # berapapun jumlah worker-nya; tanpa seed dipakai entropy OS.
+  if algo not in ALGORITHMS :
+    raise ValueError(f"Unknown algorithm: {algo}")
+  if algo == "genetic algorithm" and ((argv or {}).get("islands") or 1) > 1 :
+    raise ValueError("Island GA starts its own worker pool and cannot run inside a batch")
+
+  # Ringkasan run hanya butuh hasil akhir, riwayat tidak disimpan kecuali diminta lewat argv
+  argv = dict({"detail": "summary"}, **(argv or {}))
+  seeds = algorithm.spawn_seeds(seed, runs)
+  tasks = [(run, algo, argv, seeds[run]) for run in range(runs)]
+  pool = multiprocessing.Pool(max_workers or os.cpu_count(), initializer=_initWorker)
+  try :
+    for summary in pool.imap_unordered(_runOne, tasks) :
+      yield summary
+    pool.close()
+  except BaseException :
+    pool.terminate()
+    raise
+  finally :
+    pool.join()
+
+def _distribution(values) :
+  if len(values) == 0 :
+    return None
+  values = np.asarray(values, dtype=np.float64)
+  return {
+    "mean": float(values.mean()),
+    "std": float(values.std()),
+    "min": float(values.min()),
+    "median": float(np.median(values)),
+    "max": float(values.max()),
+  }
+
+def aggregate(summaries) :
+  completed = [summary for summary in summaries if "error" not in summary]
+  best = max(completed, key=lambda summary: summary["final H"], default=None)
+  return {
+    "runs": len(summaries),
+    "errors": len(summaries) - len(completed),
+    "final H": _distribution([summary["final H"] for summary in completed]),
+    "magic_lines": _distribution([summary["magic_lines"] for summary in completed]),
+    "duration": _distribution([summary["duration"] for summary in completed]),
+    "success_rate": sum(summary["solved"] for summary in completed) / len(summaries) if summaries else 0.0,
+    "best": best,
+  }
+
+def run_batch(algo, runs, argv=None, max_workers=None, on_result=None, seed=None) :
+  summaries = []
+  for summary in iter_batch(algo, runs, argv, max_workers, seed) :
+    summaries.append(summary)
+    if on_result :
+      on_result(summary)
+  return {"summaries": summaries, "aggregate": aggregate(summaries)}
+
+def parseParams(params) :
+  argv = {}
+  for param in params :
+    key, _, value = param.partition("=")
+    argv[key] = int(value) if value.lstrip("-").isdigit() else value
+  return argv
+
+def printSummary(summary) :
+  if "error" in summary :
+    print(f"run {summary['run']:>4}: error {summary['error']}")
+  else :
+    print(f"run {summary['run']:>4}: H = {summary['final H']:.4f}, magic lines = {summary['magic_lines']}, duration = {summary['duration']:.3f}s")
+
+def main() :
+  parser = argparse.ArgumentParser(description="Run many independent local search runs in parallel")
+  parser.add_argument("algorithm", choices=ALGORITHMS)
+  parser.add_argument("--runs", type=int, default=10)
+  parser.add_argument("--max-workers", type=int, default=None)
+  parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                      help="algorithm parameter, e.g. --param max_limit=50")
+  parser.add_argument("--seed", type=int, default=None, help="batch seed for reproducible runs")
+  parser.add_argument("--output", help="write summaries and aggregate to this JSON file")
+  args = parser.parse_args()
+
+  start_time = time.time()
+  summaries = []
+  try :
+    for summary in iter_batch(args.algorithm, args.runs, parseParams(args.param), args.max_workers, args.seed) :
+      summaries.append(summary)
+      printSummary(summary)
+  except KeyboardInterrupt :
+    print(f"\nInterrupted, {len(summaries)} of {args.runs} runs completed")
+
+  report = {"seed": args.seed, "summaries": summaries, "aggregate": aggregate(summaries), "wall_time": time.time() - start_time}
+  stats = report["aggregate"]
+  print("\n========================== BATCH RESULTS ==========================")
+  print("Runs: ", stats["runs"], "Errors: ", stats["errors"])
+  if stats["final H"] :
+    print("Final H: ", stats["final H"])
+    print("Duration: ", stats["duration"])
+  print("Success Rate: ", stats["success_rate"])
+  print("Wall Time: ", report["wall_time"])
+
+  if args.output :
+    with open(args.output, "w") as file :
+      json.dump(report, file, indent=2)
+
+if __name__ == "__main__" :
+  main()
@@ -0,0 +1,180 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import numpy as np
+import algorithm
+import native
+from trajectory import Trajectory
+
+SEED = 13522089
+
+def measure(fn, repeat = 5, number = 1):
+  # Waktu terbaik dari beberapa pengulangan, dalam detik per panggilan
+  timings = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    for _ in range(number):
+      fn()
+    timings.append((time.perf_counter() - start) / number)
+  return min(timings)
+
+def seededCube(dimension = 5):
+  random.seed(SEED)
+  cube = algorithm.Cube(dimension)
+  cube.initialize()
+  return cube
+
+def benchObjective(results, quick):
+  cube = seededCube()
+  number = 2000 if quick else 20000
+  # getH/controlH di-cache per version; version dinaikkan supaya yang diukur tetap evaluasi objektif
+  def uncached(objective):
+    def evaluate():
+      cube.version += 1
+      return cube.score(objective)
+    return evaluate
+  results["objective.getH"] = {"value": 1 / measure(uncached(None), number=number), "unit": "ops/s"}
+  results["objective.controlH"] = {"value": 1 / measure(uncached("control"), number=number), "unit": "ops/s"}
+  results["objective.getH_cached"] = {"value": 1 / measure(cube.getH, number=number), "unit": "ops/s"}
+  results["objective.updateSums"] = {"value": 1 / measure(cube.updateSums, number=number // 10), "unit": "ops/s"}
+  results["objective.deltaHForSwap"] = {"value": 1 / measure(lambda: cube.deltaHForSwap((0, 1, 2), (3, 4, 0)), number=number), "unit": "ops/s"}
+
+  states = np.random.default_rng(SEED).permuted(np.tile(np.arange(1, 126), (1000, 1)), axis=1).reshape((1000, 5, 5, 5))
+  results["objective.batchH"] = {"value": len(states) / measure(lambda: algorithm.Cube.batchH(states)), "unit": "states/s"}
+
+def benchNeighborScan(results, quick):
+  cube = seededCube()
+  pairs = 125 * 124 // 2
+
+  for neighborhood in ["full", "first", "sample"]:
+    results[f"neighbors.python_{neighborhood}"] = {"value": measure(lambda: cube.findMove(neighborhood), repeat=2 if quick else 5), "unit": "s/scan", "pairs": pairs}
+
+  if native.isAvailable():
+    # Satu iterasi steepest ascent native = satu scan seluruh pasangan
+    result = native.run("steepest ascent", {"seed": SEED})
+    results["neighbors.native_scan"] = {"value": result["duration"] / len(result["h_values"]), "unit": "s/scan", "pairs": pairs}
+
+def benchGenetic(results, quick):
+  generations = 10 if quick else 50
+  for popSize in ([8, 64] if quick else [8, 64, 256, 1024]):
+    def run():
+      agent = algorithm.GeneticCube(5, popSize)
+      agent.rng = np.random.default_rng(SEED)
+      agent.geneticAlgorithm(generations)
+    results[f"genetic.generation.pop{popSize}"] = {"value": measure(run, repeat=3) / generations, "unit": "s/generation"}
+
+def randomTrajectory(steps):
+  rng = np.random.default_rng(SEED)
+  return Trajectory(rng.permutation(125).reshape((5, 5, 5)) + 1, rng.integers(0, 125, (steps, 2)))
+
+def benchTrajectory(results, quick):
+  steps = 10000 if quick else 100000
+  trajectory = randomTrajectory(steps)
+  results["trajectory.build"] = {"value": steps / measure(lambda: randomTrajectory(steps), repeat=3), "unit": "swaps/s"}
+  results["trajectory.iterate"] = {"value": len(trajectory) / measure(lambda: sum(1 for _ in trajectory), repeat=3), "unit": "states/s"}
+
+  indices = np.random.default_rng(SEED).integers(0, len(trajectory), 1000)
+  results["trajectory.random_access"] = {"value": len(indices) / measure(lambda: [trajectory[i] for i in indices], repeat=3), "unit": "states/s"}
+
+def benchVisualization(results, quick):
+  try:
+    import beta
+  except ImportError:
+    return
+
+  results["visualization.detailed.states5"] = {"value": measure(lambda: beta.CubeVisualizer(list(randomTrajectory(4))), repeat=1), "unit": "s"}
+  for steps in ([1000] if quick else [1000, 10000, 100000]):
+    trajectory = randomTrajectory(steps)
+    for frames in ([50] if quick else [50, 200]):
+      results[f"visualization.batched.states{steps}.frames{frames}"] = {
+        "value": measure(lambda: beta.CubeVisualizer(trajectory, max_frames=frames), repeat=1),
+        "unit": "s",
+      }
+
+def initialQuality(states):
+  # Rata-rata garis magic dan simpangan baku jumlah garis per state
+  states = np.asarray(states).reshape((-1, 5, 5, 5))
+  sums = algorithm.Cube.batchSums(states)
+  return float((sums == 5 * 126 // 2).sum(axis=1).mean()), float(sums.std(axis=1).mean())
+
+def benchInitializer(results, quick):
+  import initializer
+  seeds = range(5 if quick else 20)
+  for name in ["algebraic", "greedy"]:
+    build = initializer.get(name)
+    results[f"initializer.python_{name}"] = {"value": measure(lambda: build(5, np.random.default_rng(SEED)), repeat=3), "unit": "s"}
+    magic, spread = initialQuality([build(5, np.random.default_rng(seed)) for seed in seeds])
+    results[f"initializer.python_{name}.magic_lines"] = {"value": magic, "unit": "lines", "line_std": spread}
+
+    if native.isAvailable():
+      # Strategi native harus setara: kualitas state awal dibandingkan pada seed yang sama
+      states = [native.run("steepest ascent", {"initializer": name, "seed": seed, "detail": "summary"})["initial_state"] for seed in seeds]
+      magic, spread = initialQuality(states)
+      results[f"initializer.native_{name}.magic_lines"] = {"value": magic, "unit": "lines", "line_std": spread}
+
+BENCHMARKS = {
+  "objective": benchObjective,
+  "neighbors": benchNeighborScan,
+  "genetic": benchGenetic,
+  "trajectory": benchTrajectory,
+  "initializer": benchInitializer,
+  "visualization": benchVisualization,
+}
+
+def metadata():
+  try:
+    commit = subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+  except (subprocess.CalledProcessError, FileNotFoundError):
+    commit = None
+  return {
+    "commit": commit,
+    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    "python": sys.version.split()[0],
+    "numpy": np.__version__,
+    "platform": platform.platform(),
+    "processor": platform.processor(),
+    "native": native.isAvailable(),
+    "seed": SEED,
+  }
+
+def compare(results, baseline):
+  # Rasio > 1 berarti lebih baik dari baseline (ops/s atau garis magic naik, detik turun)
+  print(f"\n{'benchmark':<48} {'baseline':>12} {'current':>12} {'ratio':>8}")
+  for name, current in results.items():
+    if name not in baseline:
+      continue
+    old, new = baseline[name]["value"], current["value"]
+    ratio = new / old if current["unit"].endswith("/s") or current["unit"] == "lines" else old / new
+    print(f"{name:<48} {old:>12.4g} {new:>12.4g} {ratio:>7.2f}x")
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark objective evaluation, neighbor scans, GA, trajectory replay and visualization")
+  parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="run only these groups")
+  parser.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+  parser.add_argument("--output", help="write results as JSON to this file")
+  parser.add_argument("--compare", help="JSON file from a previous run to compare against")
+  args = parser.parse_args()
+
+  results = {}
+  for name in args.only or BENCHMARKS:
+    start = time.perf_counter()
+    BENCHMARKS[name](results, args.quick)
+    print(f"{name} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+  for name, result in results.items():
+    print(f"{name:<48} {result['value']:>14.4g} {result['unit']}")
+
+  report = {"meta": metadata(), "results": results}
+  if args.output:
+    with open(args.output, "w") as file:
+      json.dump(report, file, indent=2)
+  if args.compare:
+    with open(args.compare) as file:
+      compare(results, json.load(file)["results"])
+
+if __name__ == "__main__":
+  main()
@@ -1,92 +1,106 @@
 import numpy as np
 import plotly.graph_objects as go
 from collections import defaultdict
+from algorithm import Cube
+from archive import openStates
+
+# Segitiga untuk 8 titik sudut kubus satuan (urutan titik sama dengan mode detail)
+UNIT_CUBE_X = np.array([0, 1, 1, 0, 0, 1, 1, 0])
+UNIT_CUBE_Y = np.array([0, 0, 1, 1, 0, 0, 1, 1])
+UNIT_CUBE_Z = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+UNIT_CUBE_FACES = np.array([
+    [0, 1, 2], [0, 2, 3], [4, 5, 6], [4, 6, 7],
+    [0, 1, 5], [0, 5, 4], [3, 2, 6], [3, 6, 7],
+    [0, 3, 7], [0, 7, 4], [1, 2, 6], [1, 6, 5],
+])
 
 def loadStatesFromFile(filename):
+    # Arsip biner (archive.py) di-memory-map; file teks lama dikonversi sekali secara streaming ke filename + ".cubes".
+    # Hasilnya urutan state lazy, state dibaca dari disk saat diakses.
+    return openStates(filename)
 
-    with open(filename, 'r') as file:
-        content = file.read()
-        # Split dari koma
-        states = content.split(',')
-        cube_states = []
-        
-        for state in states:
-            # konvert jadi array of array of araray
-            try:
-                numbers = [int(num) for num in state.strip().split()]
-                if len(numbers) != 125:
-                    raise ValueError(f"Each state must contain exactly 125 numbers. Found {len(numbers)} numbers.")
-                # 
-                cube_states.append(np.array(numbers).reshape((5, 5, 5)))
-            except ValueError as e:
-                print(f"Error processing state: {e}")
-                continue
-            
-        return cube_states
-
-def isMagicSum(arr):
-    return np.sum(arr) == 315
+lineIncidences = {}
+
+def lineIncidence(dimension):
+    # Matriks (garis x sel): 1 jika sel dilalui garis tersebut
+    if dimension not in lineIncidences:
+        line_index, _ = Cube.lineTable(dimension)
+        incidence = np.zeros((len(line_index), dimension**3), dtype=np.int32)
+        incidence[np.arange(len(line_index))[:, None], line_index] = 1
+        lineIncidences[dimension] = incidence
+    return lineIncidences[dimension]
+
+def magicLineMask(states):
+    # states (..., n, n, n) -> boolean (..., jumlah garis), urutan garis sama dengan Cube.allSums
+    states = np.asarray(states)
+    n = states.shape[-1]
+    return Cube.batchSums(states) == n * (n**3 + 1) // 2
+
+def magicCellCounts(states):
+    # Jumlah magic line yang melewati tiap sel, bentuk sama dengan states
+    states = np.asarray(states)
+    n = states.shape[-1]
+    return (magicLineMask(states).astype(np.int32) @ lineIncidence(n)).reshape(states.shape)
 
 def findMagicCoordinates(cube_data):
+    counts = magicCellCounts(cube_data)
     magic_coords = defaultdict(int)
+    for coordinate in zip(*np.nonzero(counts)):
+        magic_coords[tuple(int(c) for c in coordinate)] = int(counts[coordinate])
+    return magic_coords
 
-    for i in range(5):
-        for j in range(5):
-            # Sumbu Z
-            if isMagicSum(cube_data[i, j, :]):
-                for k in range(5):
-                    magic_coords[(i, j, k)] += 1
-            # Sumbu Y
-            if isMagicSum(cube_data[i, :, j]):
-                for k in range(5):
-                    magic_coords[(i, k, j)] += 1
-            # Sumbu X
-            if isMagicSum(cube_data[:, i, j]):
-                for k in range(5):
-                    magic_coords[(k, i, j)] += 1
-        
-        # XY plane diagonals for each Z level
-        if isMagicSum(cube_data[i, range(5), range(5)]):
-            for k in range(5):
-                magic_coords[(i, k, k)] += 1
-        if isMagicSum(cube_data[i, range(5), range(4, -1, -1)]):
-            for k in range(5):
-                magic_coords[(i, k, 4 - k)] += 1
-
-        # YZ plane diagonals for each X level
-        if isMagicSum(cube_data[range(5), i, range(5)]):
-            for k in range(5):
-                magic_coords[(k, i, k)] += 1
-        if isMagicSum(cube_data[range(5), i, range(4, -1, -1)]):
-            for k in range(5):
-                magic_coords[(k, i, 4 - k)] += 1
-
-        # XZ plane diagonals for each Y level
-        if isMagicSum(cube_data[range(5), range(5), i]):
-            for k in range(5):
-                magic_coords[(k, k, i)] += 1
-        if isMagicSum(cube_data[range(5), range(4, -1, -1), i]):
-            for k in range(5):
-                magic_coords[(k, 4 - k, i)] += 1
-
-    if isMagicSum(cube_data[range(5), range(5), range(5)]):
-        for k in range(5):
-            magic_coords[(k, k, k)] += 1
-    if isMagicSum(cube_data[range(5), range(5), range(4, -1, -1)]):
-        for k in range(5):
-            magic_coords[(k, k, 4 - k)] += 1
-    if isMagicSum(cube_data[range(5), range(4, -1, -1), range(5)]):
-        for k in range(5):
-            magic_coords[(k, 4 - k, k)] += 1
-    if isMagicSum(cube_data[range(5), range(4, -1, -1), range(4, -1, -1)]):
-        for k in range(5):
-            magic_coords[(k, 4 - k, 4 - k)] += 1
+def scoreStates(states, chunk_size=4096):
+    # H tiap state dihitung per chunk supaya trajectory panjang tidak dimuat sekaligus
+    scores = np.empty(len(states))
+    if hasattr(states, "chunks"):
+        # Arsip state: chunk berupa view memory map, tanpa menyalin per state
+        start = 0
+        for chunk in states.chunks(chunk_size):
+            scores[start:start + len(chunk)] = Cube.batchH(chunk)
+            start += len(chunk)
+        return scores
+    chunk = []
+    start = 0
+    for state in states:
+        chunk.append(state)
+        if len(chunk) == chunk_size:
+            scores[start:start + len(chunk)] = Cube.batchH(np.stack(chunk))
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        scores[start:start + len(chunk)] = Cube.batchH(np.stack(chunk))
+    return scores
 
-    return magic_coords
+def selectKeyframes(count, max_frames, sampling="uniform", every=None, scores=None):
+    if sampling == "every":
+        indices = np.arange(0, count, every or max(1, count // max_frames))
+    elif sampling == "uniform":
+        indices = np.linspace(0, count - 1, min(count, max_frames)).round().astype(int)
+    elif sampling == "improvement":
+        best_before = np.maximum.accumulate(np.concatenate([[-np.inf], scores[:-1]]))
+        indices = np.nonzero(scores > best_before)[0]
+    elif sampling == "adaptive":
+        # Frame lebih rapat di bagian trajectory dengan perubahan H besar
+        progress = np.concatenate([[0], np.cumsum(np.abs(np.diff(scores)))])
+        thresholds = np.linspace(0, progress[-1], min(count, max_frames))
+        indices = np.searchsorted(progress, thresholds)
+    else:
+        raise ValueError(f"Unknown sampling strategy: {sampling}")
+
+    indices = np.unique(np.concatenate([[0], np.minimum(indices, count - 1), [count - 1]]))
+    if len(indices) > max_frames:
+        indices = indices[np.linspace(0, len(indices) - 1, max_frames).round().astype(int)]
+    return indices
 
 class CubeVisualizer:
-    def __init__(self, states):
+    def __init__(self, states, max_frames=None, sampling="uniform", every=None, highlight=True):
+        # max_frames=None: semua state dengan trace per sel (mode detail).
+        # Selain itu hanya keyframe terpilih, dengan satu Mesh3d + satu Scatter3d per frame.
         self.states = states
+        self.max_frames = max_frames
+        self.sampling = sampling
+        self.every = every
+        self.highlight = highlight
         self.current_state_idx = 0
         self.explosion_factor = 1.2
         self.gap = 2
@@ -98,25 +112,23 @@ class CubeVisualizer:
             16: '#440402'
         }
         self.fig = go.Figure()
-        self.setup_figure()
+        if max_frames is None:
+            self.setup_figure()
+        else:
+            self.setup_batched_figure()
 
     def find_different_cells(self, state1, state2):
-        different_coords = []
-        for i in range(5):
-            for j in range(5):
-                for k in range(5):
-                    if state1[i,j,k] != state2[i,j,k]:
-                        different_coords.append((i,j,k))
-        return different_coords
+        return [tuple(int(c) for c in coordinate) for coordinate in np.argwhere(np.asarray(state1) != np.asarray(state2))]
 
     def create_cube_traces(self, highlight_coords=None):
         traces = []
-        current_state = self.states[self.current_state_idx]
-        magic_coords = findMagicCoordinates(current_state)
+        current_state = np.asarray(self.states[self.current_state_idx])
+        n = current_state.shape[0]
+        magic_counts = magicCellCounts(current_state)
 
-        for i in range(5):
-            for j in range(5):
-                for k in range(5):
+        for i in range(n):
+            for j in range(n):
+                for k in range(n):
                     x_pos = i * (self.explosion_factor + self.gap)
                     y_pos = j * (self.explosion_factor + self.gap)
                     z_pos = k * (self.explosion_factor + self.gap)
@@ -125,7 +137,7 @@ class CubeVisualizer:
                     if highlight_coords and (i,j,k) in highlight_coords:
                         color = 'yellow'
                     else:
-                        match_count = magic_coords.get((i, j, k), 0)
+                        match_count = int(magic_counts[i, j, k])
                         color = self.color_map.get(match_count, 'grey')
 
                     traces.append(go.Mesh3d(
@@ -137,7 +149,7 @@ class CubeVisualizer:
                         alphahull=0,
                         flatshading=True,
                         hoverinfo='text',
-                        text=f"Value: {current_state[i, j, k]}<br>Magic Lines: {magic_coords.get((i,j,k), 0)}"
+                        text=f"Value: {current_state[i, j, k]}<br>Magic Lines: {magic_counts[i, j, k]}"
                     ))
                     
                     traces.append(go.Scatter3d(
@@ -153,6 +165,7 @@ class CubeVisualizer:
         return traces
 
     def setup_figure(self): 
+        n = self.states[0].shape[0]
         self.fig = go.Figure(data=self.create_cube_traces())
         
         # Bikin frame
@@ -163,7 +176,7 @@ class CubeVisualizer:
             frame = go.Frame(
                 data=self.create_cube_traces(),
                 name=f"state_{i}",
-                traces=[i for i in range(250)]
+                traces=list(range(2 * n**3))
             )
             frames.append(frame)
 
@@ -175,13 +188,76 @@ class CubeVisualizer:
                 highlight_frame = go.Frame(
                     data=self.create_cube_traces(highlight_coords=different_coords),
                     name=f"state_{i}_highlight",
-                    traces=[i for i in range(250)]
+                    traces=list(range(2 * n**3))
                 )
                 frames.append(highlight_frame)
 
         # Reset state
         self.current_state_idx = 0
 
+        labels = [f"{i // 2 + 1}" if i % 2 == 0 else f"{i // 2 + 1}h" for i in range(len(frames))]
+        self.apply_animation_layout(frames, labels)
+
+    def batched_geometry(self):
+        n = self.states[0].shape[0]
+        offsets = np.arange(n) * (self.explosion_factor + self.gap)
+        # Urutan sel sama dengan mode detail: i -> x, j -> y, k -> z
+        ox, oy, oz = [axis.ravel() for axis in np.meshgrid(offsets, offsets, offsets, indexing='ij')]
+        x = (ox[:, None] + UNIT_CUBE_X).ravel()
+        y = (oy[:, None] + UNIT_CUBE_Y).ravel()
+        z = (oz[:, None] + UNIT_CUBE_Z).ravel()
+        faces = (UNIT_CUBE_FACES[None, :, :] + 8 * np.arange(n**3)[:, None, None]).reshape(-1, 3)
+        return x, y, z, faces, ox + 0.5, oy + 0.5, oz + 0.5
+
+    def batched_traces(self, state, counts, highlight_mask=None):
+        values = np.asarray(state).ravel()
+        counts = counts.ravel()
+        colors = self.color_table[np.minimum(counts, len(self.color_table) - 1)]
+        if highlight_mask is not None:
+            colors[highlight_mask] = 'yellow'
+
+        hover = [f"Value: {value}<br>Magic Lines: {count}" for value, count in zip(values, counts)]
+        mesh = go.Mesh3d(facecolor=np.repeat(colors, len(UNIT_CUBE_FACES)))
+        labels = go.Scatter3d(text=[str(value) for value in values], hovertext=hover)
+        return [mesh, labels]
+
+    def setup_batched_figure(self):
+        count = len(self.states)
+        scores = scoreStates(self.states) if self.sampling in ("improvement", "adaptive") else None
+        self.keyframes = selectKeyframes(count, self.max_frames, self.sampling, self.every, scores)
+
+        # Warna magic line semua keyframe dihitung dalam satu panggilan batch
+        keyframe_states = np.stack([np.asarray(self.states[index]) for index in self.keyframes])
+        keyframe_counts = magicCellCounts(keyframe_states)
+        self.color_table = np.array([self.color_map.get(count, 'grey') for count in range(max(self.color_map) + 2)], dtype=object)
+
+        x, y, z, faces, cx, cy, cz = self.batched_geometry()
+        first_mesh, first_labels = self.batched_traces(keyframe_states[0], keyframe_counts[0])
+        first_mesh.update(x=x, y=y, z=z, i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+                          opacity=0.6, flatshading=True, hoverinfo='skip')
+        first_labels.update(x=cx, y=cy, z=cz, mode='text', textposition="middle center",
+                            textfont=dict(size=18, color="black"), hoverinfo='text')
+        self.fig = go.Figure(data=[first_mesh, first_labels])
+
+        # Frame hanya mengubah warna dan teks, geometri dipakai ulang
+        frames = []
+        labels = []
+        for position, index in enumerate(self.keyframes):
+            state, counts = keyframe_states[position], keyframe_counts[position]
+            frames.append(go.Frame(data=self.batched_traces(state, counts), name=f"state_{index}", traces=[0, 1]))
+            labels.append(f"{index + 1}")
+
+            if self.highlight and position < len(self.keyframes) - 1:
+                changed = (state != keyframe_states[position + 1]).ravel()
+                frames.append(go.Frame(data=self.batched_traces(state, counts, changed),
+                                       name=f"state_{index}_highlight", traces=[0, 1]))
+                labels.append(f"{index + 1}h")
+
+        self.apply_animation_layout(frames, labels)
+
+    def apply_animation_layout(self, frames, labels):
+        n = self.states[0].shape[0]
+
         # Slider
         steps = []
         for i in range(len(frames)):
@@ -191,7 +267,7 @@ class CubeVisualizer:
                     'mode': 'immediate',
                     'transition': {'duration': 0}
                 }],
-                'label': f"{i // 2 + 1}" if i % 2 == 0 else f"{i // 2 + 1}h",
+                'label': labels[i],
                 'method': 'animate'
             }
             steps.append(step)
@@ -252,7 +328,7 @@ class CubeVisualizer:
         }]
 
         self.fig.update_layout(
-            title=f"5x5x5 Magic Cube States Visualization ({len(self.states)} states)",
+            title=f"{n}x{n}x{n} Magic Cube States Visualization ({len(self.states)} states)",
             scene=dict(
                 xaxis=dict(showgrid=False, zeroline=False, showline=False, 
                           showbackground=False, showaxeslabels=False, 
@@ -0,0 +1,45 @@
+import json
+import os
+import numpy as np
+
+# Format checkpoint sisi Python (GA), mengikuti engine native:
+# snapshot kecil yang ditulis atomik + log biner append-only untuk riwayat.
+
+def atomicSave(filename, **arrays):
+  temporary = filename + ".tmp"
+  with open(temporary, "wb") as file:
+    np.savez(file, **arrays)
+    file.flush()
+    os.fsync(file.fileno())
+  os.replace(temporary, filename)
+
+def encodeState(state):
+  return np.array(json.dumps(state))
+
+def decodeState(array):
+  return json.loads(str(array))
+
+class AppendLog:
+  # Log biner berisi record berukuran tetap, hanya record baru yang ditulis tiap checkpoint
+
+  def __init__(self, filename, dtype, shape=()):
+    self.filename = filename
+    self.dtype = np.dtype(dtype)
+    self.shape = tuple(shape)
+    self.saved = 0
+
+  def recordSize(self):
+    return self.dtype.itemsize * int(np.prod(self.shape, dtype=np.int64))
+
+  def append(self, records, count):
+    # records[:count] adalah seluruh riwayat, yang ditulis hanya records[saved:count]
+    with open(self.filename, "ab" if self.saved else "wb") as file:
+      np.ascontiguousarray(records[self.saved:count], dtype=self.dtype).tofile(file)
+    self.saved = count
+
+  def read(self, count):
+    # Record setelah snapshot terakhir (misalnya crash saat append) dibuang
+    with open(self.filename, "r+b") as file:
+      file.truncate(count * self.recordSize())
+    self.saved = count
+    return np.fromfile(self.filename, dtype=self.dtype, count=count * int(np.prod(self.shape, dtype=np.int64))).reshape((count,) + self.shape)
@@ -10,390 +10,1328 @@
 #include <chrono>
 #include <stdexcept>
 #include <sstream>
+#include <fstream>
+#include <filesystem>
+#include <cstdint>
+#include <thread>
 #include "json.hpp"
 
-class Cube {
-public:
-    static double stdfactor;
-    int dimension;
-    std::vector<std::vector<std::vector<int>>> cube;
+class Cube;
+using Coordinate = std::tuple<int, int, int>;
+using Switch = std::pair<Coordinate, Coordinate>;
+using Options = std::unordered_map<std::string, std::any>;
 
-    Cube(int dimension) : dimension(dimension), cube(dimension, std::vector<std::vector<int>>(dimension, std::vector<int>(dimension, 0))) {}
+std::string optionString(const Options& options, const std::string& key) {
+    const auto& value = options.at(key);
+    if (value.type() == typeid(int))
+        return std::to_string(std::any_cast<int>(value));
+    return std::any_cast<std::string>(value);
+}
 
-    void initialize() {
-        std::vector<int> numbers(dimension * dimension * dimension);
-        for (int i = 0; i < dimension * dimension * dimension; ++i)
-            numbers[i] = i + 1;
+double optionDouble(const Options& options, const std::string& key) {
+    return std::stod(optionString(options, key));
+}
 
-        std::shuffle(numbers.begin(), numbers.end(), std::default_random_engine(static_cast<unsigned>(time(0))));
-        int index = 0;
-        for (int i = 0; i < dimension; ++i) {
-            for (int j = 0; j < dimension; ++j) {
-                for (int k = 0; k < dimension; ++k) {
-                    cube[i][j][k] = numbers[index++];
-                }
+// Seed 64-bit dari opsi "seed" (boleh melebihi int), dipecah jadi dua kata 32-bit untuk seed_seq
+void seedRng(std::mt19937& rng, const std::string& seed) {
+    unsigned long long value = std::stoull(seed);
+    std::seed_seq sequence{static_cast<uint32_t>(value), static_cast<uint32_t>(value >> 32)};
+    rng.seed(sequence);
+}
+
+// Detail riwayat pada hasil: full = semua langkah, downsample = nilai H/boltzmann tiap stride langkah
+// (stride berlipat ganda, paling banyak 2 * history_points nilai, switches tidak disimpan), summary = tanpa riwayat.
+// history = N menyimpan N langkah terakhir saja (ring buffer), initial_state menjadi state di awal jendela.
+struct HistoryPolicy {
+    std::string detail = "full";
+    long long points = 1000;
+    long long ring = 0;
+
+    static HistoryPolicy fromOptions(const Options& options) {
+        HistoryPolicy policy;
+        if (options.find("detail") != options.end())
+            policy.detail = optionString(options, "detail");
+        if (options.find("history_points") != options.end())
+            policy.points = std::max(1, std::any_cast<int>(options.at("history_points")));
+        if (options.find("history") != options.end())
+            policy.ring = std::max(0, std::any_cast<int>(options.at("history")));
+        if (policy.detail != "full" && policy.detail != "downsample" && policy.detail != "summary")
+            throw std::invalid_argument("Unknown detail level: " + policy.detail);
+        return policy;
+    }
+
+    bool bounded() const {
+        return detail != "full" || ring > 0;
+    }
+};
+
+// Penghitung satu deret riwayat: total langkah yang dicatat, stride downsample dan jumlah nilai terdepan yang dibuang ring buffer
+struct Series {
+    long long total = 0;
+    long long stride = 1;
+    long long offset = 0;
+
+    // Mengembalikan jumlah nilai terdepan yang harus dibuang; sampled = false berarti deret ini tidak disimpan saat downsample
+    template <typename T>
+    size_t append(std::vector<T>& values, const T& value, const HistoryPolicy& policy, bool sampled = true) {
+        if (policy.detail == "summary" || (policy.ring == 0 && policy.detail == "downsample" && !sampled)) {
+            total++;
+            return 0;
+        }
+        if (policy.ring > 0) {
+            values.push_back(value);
+            total++;
+            // Buffer dibiarkan tumbuh sampai 2N supaya pembuangan di depan teramortisasi O(1)
+            return values.size() >= static_cast<size_t>(2 * policy.ring) ? values.size() - policy.ring : 0;
+        }
+        if (policy.detail == "downsample") {
+            if (total % stride == 0)
+                values.push_back(value);
+            total++;
+            if (values.size() >= static_cast<size_t>(2 * policy.points)) {
+                for (size_t i = 0; i < static_cast<size_t>(policy.points); ++i)
+                    values[i] = values[2 * i];
+                values.resize(policy.points);
+                stride *= 2;
             }
+            return 0;
         }
+        values.push_back(value);
+        total++;
+        return 0;
+    }
+
+    template <typename T>
+    void drop(std::vector<T>& values, size_t count) {
+        values.erase(values.begin(), values.begin() + count);
+        offset += count;
+    }
+};
+
+// Cache state yang sudah dievaluasi: hash Zobrist -> H, kapasitas tetap dengan eviction clock (second chance).
+// cache = kapasitas (0 = nonaktif), symmetry = 1 memakai hash kanonik atas 48 simetri kubus dan komplemen nilai.
+struct TranspositionCache {
+    size_t capacity = 0;
+    bool symmetric = false;
+    std::vector<uint64_t> keys;
+    std::vector<double> values;
+    std::vector<uint8_t> referenced;
+    std::unordered_map<uint64_t, size_t> slots;
+    size_t hand = 0;
+    long long lookups = 0;
+    long long hits = 0;
+    long long evictions = 0;
+    // Sideways move yang ditolak karena kembali ke state lama, dan climb yang berhenti di basin yang sudah dikunjungi
+    long long cycles = 0;
+    long long revisits = 0;
+    // Evaluasi tetangga yang dilewati karena H state tujuannya sudah tersimpan di cache
+    long long skips = 0;
+
+    void configure(const Options& options) {
+        if (options.find("cache") != options.end())
+            capacity = std::max(0, std::any_cast<int>(options.at("cache")));
+        if (options.find("symmetry") != options.end())
+            symmetric = std::any_cast<int>(options.at("symmetry")) != 0;
     }
 
-    std::vector<int> rowSums() const {
-        std::vector<int> results;
-        for (int z = 0; z < dimension; ++z) {
-            for (int y = 0; y < dimension; ++y) {
-                int sum = 0;
-                for (int x = 0; x < dimension; ++x)
-                    sum += cube[z][y][x];
-                results.push_back(sum);
+    bool enabled() const {
+        return capacity > 0;
+    }
+
+    const double* find(uint64_t key) {
+        lookups++;
+        auto found = slots.find(key);
+        if (found == slots.end())
+            return nullptr;
+        hits++;
+        referenced[found->second] = 1;
+        return &values[found->second];
+    }
+
+    // H tersimpan tanpa mengubah statistik lookup/hit dan bit referenced (dipakai saat menilai tetangga)
+    const double* peek(uint64_t key) const {
+        auto found = slots.find(key);
+        return found == slots.end() ? nullptr : &values[found->second];
+    }
+
+    void insert(uint64_t key, double value) {
+        auto found = slots.find(key);
+        if (found != slots.end()) {
+            values[found->second] = value;
+            referenced[found->second] = 1;
+            return;
+        }
+
+        size_t slot = keys.size();
+        if (keys.size() < capacity) {
+            keys.push_back(key);
+            values.push_back(value);
+            referenced.push_back(0);
+        } else {
+            while (referenced[hand]) {
+                referenced[hand] = 0;
+                hand = (hand + 1) % capacity;
             }
+            slot = hand;
+            hand = (hand + 1) % capacity;
+            slots.erase(keys[slot]);
+            keys[slot] = key;
+            values[slot] = value;
+            evictions++;
         }
-        return results;
+        slots[key] = slot;
     }
 
-    std::vector<int> columnSums() const {
-        std::vector<int> results;
-        for (int z = 0; z < dimension; ++z) {
-            for (int x = 0; x < dimension; ++x) {
-                int sum = 0;
-                for (int y = 0; y < dimension; ++y) {
-                    sum += cube[z][y][x];
-                }
-                results.push_back(sum);
-            }
+    void rebuild() {
+        slots.clear();
+        for (size_t slot = 0; slot < keys.size(); ++slot)
+            slots[keys[slot]] = slot;
+    }
+
+    size_t bytes() const {
+        size_t node = sizeof(uint64_t) + sizeof(size_t) + 2 * sizeof(void*);
+        return keys.capacity() * sizeof(uint64_t) + values.capacity() * sizeof(double) + referenced.capacity()
+             + slots.size() * node + slots.bucket_count() * sizeof(void*);
+    }
+};
+
+// Semua state sebuah run yang dibutuhkan untuk melanjutkannya dari checkpoint
+struct SearchState {
+    std::string algorithm;
+    Options options;
+    long long iteration = 0;
+    long long step = 0;
+    int streak = 0;
+    int stucks = 0;
+    int restart = 0;
+    // Naik setiap riwayat diganti (climb baru pada random restart), log checkpoint lalu ditulis ulang dari awal
+    int historyGeneration = 0;
+    bool running = false;
+    bool finished = false;
+    int stopReason = 0;
+
+    std::vector<int> initialState;
+    std::vector<Switch> switches;
+    std::vector<double> hValues;
+    std::vector<double> boltzmanns;
+    std::vector<int> iterationPerRestarts;
+
+    HistoryPolicy history;
+    Series switchSeries;
+    Series hSeries;
+    Series boltzmannSeries;
+
+    double bestH = -INFINITY;
+    std::vector<int> bestInitialState;
+    std::vector<int> bestState;
+    std::vector<Switch> bestSwitches;
+    std::vector<double> bestHValues;
+    Series bestHSeries;
+    // Jumlah switch saat state terbaik ditemukan (tabu search dan late acceptance)
+    long long bestStep = 0;
+
+    // Tabu search: iterasi sampai nilai (indeks kedua) dilarang kembali ke sel (indeks pertama), flat cell * (n^3 + 1) + value
+    std::vector<int64_t> tabuUntil;
+    // Late acceptance: H beberapa iterasi sebelumnya, diakses melingkar
+    std::vector<double> lateHValues;
+
+    TranspositionCache cache;
+
+    // Parallel tempering: temperatur, acceptance rate per slot temperatur dan swap rate per pasangan slot bertetangga
+    std::vector<double> temperatures;
+    std::vector<double> acceptanceRates;
+    std::vector<double> swapRates;
+
+    void recordSwitch(const Switch& pair) {
+        if (size_t dropped = switchSeries.append(switches, pair, history, false))
+            dropSwitches(dropped);
+    }
+
+    // Swap yang keluar dari jendela diterapkan ke initialState supaya riwayat tetap bisa di-replay
+    void dropSwitches(size_t count) {
+        int n = static_cast<int>(std::round(std::cbrt(initialState.size())));
+        auto index = [n](const Coordinate& c) { return (std::get<2>(c) * n + std::get<1>(c)) * n + std::get<0>(c); };
+        for (size_t i = 0; i < count; ++i)
+            std::swap(initialState[index(switches[i].first)], initialState[index(switches[i].second)]);
+        switchSeries.drop(switches, count);
+    }
+
+    void recordH(double h) {
+        if (size_t dropped = hSeries.append(hValues, h, history))
+            hSeries.drop(hValues, dropped);
+    }
+
+    void recordBoltzmann(double probability) {
+        if (size_t dropped = boltzmannSeries.append(boltzmanns, probability, history))
+            boltzmannSeries.drop(boltzmanns, dropped);
+    }
+
+    // Ring buffer dibiarkan sampai 2N selama run, hasil akhir dipangkas tepat N entri terakhir
+    void trimHistory() {
+        if (history.ring == 0)
+            return;
+        size_t ring = history.ring;
+        if (switches.size() > ring)
+            dropSwitches(switches.size() - ring);
+        if (hValues.size() > ring)
+            hSeries.drop(hValues, hValues.size() - ring);
+        if (boltzmanns.size() > ring)
+            boltzmannSeries.drop(boltzmanns, boltzmanns.size() - ring);
+    }
+
+    void resetHistory() {
+        historyGeneration++;
+        switches.clear();
+        hValues.clear();
+        boltzmanns.clear();
+        switchSeries = hSeries = boltzmannSeries = Series();
+    }
+};
+
+class Checkpointer {
+public:
+    std::string directory;
+    int interval = 1000;
+    size_t savedSwitches = 0;
+    size_t savedH = 0;
+    size_t savedBoltzmanns = 0;
+    int savedGeneration = 0;
+    double previousElapsed = 0;
+    std::chrono::high_resolution_clock::time_point startTime = std::chrono::high_resolution_clock::now();
+
+    bool enabled() const {
+        return !directory.empty() && interval > 0;
+    }
+
+    double elapsed() const {
+        std::chrono::duration<double> duration = std::chrono::high_resolution_clock::now() - startTime;
+        return previousElapsed + duration.count();
+    }
+
+    void configure(const Options& options);
+    void maybeSave(const Cube& cube, SearchState& state);
+    void save(const Cube& cube, SearchState& state);
+    Cube load(const std::string& checkpointDirectory, SearchState& state);
+
+private:
+    void appendLogs(const SearchState& state);
+};
+
+// Record progres dikirim sebagai array double dengan urutan PROGRESS_FIELDS di progress.py,
+// nilai kembalian callback selain 0 menghentikan run
+using ProgressCallback = int (*)(const double* record, int size);
+
+enum StopReason { STOP_NONE = 0, STOP_TARGET, STOP_TIME, STOP_STALL, STOP_CALLBACK };
+
+// Laporan progres berkala dan kondisi berhenti dini: target H, batas waktu (detik) dan stagnasi (iterasi tanpa perbaikan)
+class Monitor {
+public:
+    ProgressCallback callback = nullptr;
+    int interval = 1000;
+    double targetH = INFINITY;
+    double timeBudget = INFINITY;
+    long long stall = 0;
+
+    double bestH = -INFINITY;
+    long long bestIteration = 0;
+    long long reportedIteration = 0;
+    size_t reportedSwitches = 0;
+    // Jam dibaca tiap clockStride tick; stride disesuaikan supaya jarak antar pembacaan sekitar 1 ms,
+    // jadi iterasi mahal (scan tetangga penuh) memeriksa budget setiap tick
+    long long ticks = 0;
+    long long clockStride = 1;
+    double lastClock = 0;
+
+    bool enabled() const {
+        return callback || targetH < INFINITY || timeBudget < INFINITY || stall > 0;
+    }
+
+    void configure(const Options& options);
+    void observe(const Cube& cube, SearchState& state, const Checkpointer& checkpointer);
+
+private:
+    void report(const Cube& cube, SearchState& state, const Checkpointer& checkpointer, double currentH);
+};
+
+// Counter dan timer hot path (opsi profile = 1), urutan sama dengan PROFILE_COUNTERS dan PROFILE_PHASES di profiling.py.
+// Waktu dihitung eksklusif: masuk fase baru menagihkan waktu sejak pergantian terakhir ke fase yang sedang berjalan,
+// sisa waktu di luar fase lain tercatat sebagai bookkeeping (riwayat, monitor). Jika nonaktif Cube memegang
+// pointer null dan tiap titik ukur hanya satu pengecekan pointer.
+struct Profiler {
+    enum Counter { EVALUATIONS, ACCEPTED, REJECTED, RESTARTS, PROPOSALS, COUNTER_COUNT };
+    enum Phase { OBJECTIVE, NEIGHBORS, APPLY, BOOKKEEPING, CHECKPOINT, PHASE_COUNT };
+
+    long long counters[COUNTER_COUNT] = {};
+    double times[PHASE_COUNT] = {};
+    Phase current = BOOKKEEPING;
+    std::chrono::steady_clock::time_point last = std::chrono::steady_clock::now();
+
+    Phase enter(Phase phase) {
+        auto now = std::chrono::steady_clock::now();
+        times[current] += std::chrono::duration<double>(now - last).count();
+        last = now;
+        Phase previous = current;
+        current = phase;
+        return previous;
+    }
+
+    // Interval sejak pergantian terakhir tidak ditagihkan (sudah dihitung profiler lain, misalnya thread replika)
+    void skip() {
+        last = std::chrono::steady_clock::now();
+    }
+
+    void merge(const Profiler& other) {
+        for (int i = 0; i < COUNTER_COUNT; ++i)
+            counters[i] += other.counters[i];
+        for (int i = 0; i < PHASE_COUNT; ++i)
+            times[i] += other.times[i];
+    }
+
+    // Langkah yang tidak diterapkan; proposal dihitung eksplisit (parallel tempering) atau sama dengan jumlah iterasi
+    void finish(long long iterations) {
+        enter(current);
+        if (!counters[PROPOSALS])
+            counters[PROPOSALS] = iterations;
+        counters[REJECTED] = std::max(0LL, counters[PROPOSALS] - counters[ACCEPTED]);
+    }
+};
+
+struct ProfileScope {
+    Profiler* profiler;
+    Profiler::Phase previous = Profiler::BOOKKEEPING;
+
+    ProfileScope(Profiler* profiler, Profiler::Phase phase) : profiler(profiler) {
+        if (profiler)
+            previous = profiler->enter(phase);
+    }
+
+    ~ProfileScope() {
+        if (profiler)
+            profiler->enter(previous);
+    }
+};
+
+struct RunContext {
+    Checkpointer checkpointer;
+    Monitor monitor;
+    Profiler profiler;
+    bool profiling = false;
+
+    Profiler* activeProfiler() {
+        return profiling ? &profiler : nullptr;
+    }
+
+    // Dipanggil algoritma setelah setiap iterasi
+    void tick(const Cube& cube, SearchState& state) {
+        {
+            ProfileScope scope(activeProfiler(), Profiler::CHECKPOINT);
+            checkpointer.maybeSave(cube, state);
         }
-        return results;
+        if (monitor.enabled())
+            monitor.observe(cube, state, checkpointer);
     }
+};
 
-    std::vector<int> pillarSums() const {
-        std::vector<int> results;
-        for (int y = 0; y < dimension; ++y) {
-            for (int x = 0; x < dimension; ++x) {
-                int sum = 0;
-                for (int z = 0; z < dimension; ++z) {
-                    sum += cube[z][y][x];
-                }
-                results.push_back(sum);
-            }
+// Indeks garis untuk kubus orde n: daftar sel tiap garis (urutan sama dengan Cube.allSums di Python)
+// dan daftar garis yang melewati tiap sel. Dibuat sekali per orde, ukurannya linear terhadap n^3.
+struct LineTable {
+    std::vector<std::vector<int>> lines;
+    std::vector<std::vector<int>> cellLines;
+
+    static const LineTable& forDimension(int n) {
+        static std::unordered_map<int, LineTable> tables;
+        auto found = tables.find(n);
+        if (found != tables.end())
+            return found->second;
+
+        LineTable table;
+        auto index = [n](int z, int y, int x) { return (z * n + y) * n + x; };
+        auto addLine = [&](auto cell) {
+            std::vector<int> line;
+            for (int i = 0; i < n; ++i)
+                line.push_back(cell(i));
+            table.lines.push_back(line);
+        };
+
+        for (int z = 0; z < n; ++z)
+            for (int y = 0; y < n; ++y)
+                addLine([&](int i) { return index(z, y, i); });
+        for (int z = 0; z < n; ++z)
+            for (int x = 0; x < n; ++x)
+                addLine([&](int i) { return index(z, i, x); });
+        for (int y = 0; y < n; ++y)
+            for (int x = 0; x < n; ++x)
+                addLine([&](int i) { return index(i, y, x); });
+        addLine([&](int i) { return index(i, i, i); });
+        addLine([&](int i) { return index(i, n - 1 - i, i); });
+        addLine([&](int i) { return index(i, i, n - 1 - i); });
+        addLine([&](int i) { return index(i, n - 1 - i, n - 1 - i); });
+        for (int z = 0; z < n; ++z) {
+            addLine([&](int i) { return index(z, i, i); });
+            addLine([&](int i) { return index(z, i, n - 1 - i); });
+        }
+        for (int y = 0; y < n; ++y) {
+            addLine([&](int i) { return index(i, y, i); });
+            addLine([&](int i) { return index(i, y, n - 1 - i); });
         }
-        return results;
+        for (int x = 0; x < n; ++x) {
+            addLine([&](int i) { return index(i, i, x); });
+            addLine([&](int i) { return index(i, n - 1 - i, x); });
+        }
+
+        table.cellLines.resize(n * n * n);
+        for (size_t line = 0; line < table.lines.size(); ++line)
+            for (int cell : table.lines[line])
+                table.cellLines[cell].push_back(line);
+
+        return tables.emplace(n, std::move(table)).first->second;
     }
+};
 
-    std::vector<int> spatialDiagonalSums() const {
-        std::vector<int> diagonalSums(4, 0);
-        for (int i = 0; i < dimension; ++i) {
-            diagonalSums[0] += cube[i][i][i];
-            diagonalSums[1] += cube[i][dimension - 1 - i][i];
-            diagonalSums[2] += cube[i][i][dimension - 1 - i];
-            diagonalSums[3] += cube[i][dimension - 1 - i][dimension - 1 - i];
+// Peta sel untuk satu simetri kubus: sumbu tujuan ke-a diambil dari sumbu permutation[a], dicerminkan jika bit a dari mirror menyala
+std::vector<int> symmetryImage(int n, const int permutation[3], int mirror) {
+    int cells = n * n * n;
+    std::vector<int> image(cells);
+    for (int cell = 0; cell < cells; ++cell) {
+        int source[3] = {cell % n, cell / n % n, cell / (n * n)};
+        int target[3];
+        for (int axis = 0; axis < 3; ++axis) {
+            target[axis] = source[permutation[axis]];
+            if (mirror >> axis & 1)
+                target[axis] = n - 1 - target[axis];
         }
-        return diagonalSums;
+        image[cell] = (target[2] * n + target[1]) * n + target[0];
+    }
+    return image;
+}
+
+// Kunci Zobrist acak per (sel, nilai) dan peta sel untuk 48 simetri rotasi/refleksi (simetri 0 = identitas).
+// Kunci dibangkitkan dari seed tetap sehingga hash sama antar run dan tidak memakai RNG run.
+struct ZobristTable {
+    size_t stride;
+    std::vector<uint64_t> keys;
+    std::vector<std::vector<int>> symmetries;
+
+    uint64_t key(int cell, int value) const {
+        return keys[cell * stride + value];
     }
 
-    std::vector<int> xyIntersectionDiagonalSums() const {
-        std::vector<int> diagonal_sums;
-        for (int z = 0; z < dimension; ++z) {
-            int diagonal1 = 0, diagonal2 = 0;
-            for (int i = 0; i < dimension; ++i) {
-                diagonal1 += cube[z][i][i];
-                diagonal2 += cube[z][i][dimension - 1 - i];
-            }
-            diagonal_sums.push_back(diagonal1);
-            diagonal_sums.push_back(diagonal2);
+    static const ZobristTable& forDimension(int n) {
+        static std::unordered_map<int, ZobristTable> tables;
+        auto found = tables.find(n);
+        if (found != tables.end())
+            return found->second;
+
+        ZobristTable table;
+        int cells = n * n * n;
+        table.stride = cells + 1;
+        std::mt19937_64 rng(0x9E3779B97F4A7C15ULL + n);
+        table.keys.resize(cells * table.stride);
+        for (auto& key : table.keys)
+            key = rng();
+
+        // Permutasi sumbu x 8 kombinasi pencerminan
+        int permutation[3] = {0, 1, 2};
+        do {
+            for (int mirror = 0; mirror < 8; ++mirror)
+                table.symmetries.push_back(symmetryImage(n, permutation, mirror));
+        } while (std::next_permutation(permutation, permutation + 3));
+
+        return tables.emplace(n, std::move(table)).first->second;
+    }
+};
+
+// Agregat jumlah garis, cukup untuk menghitung getH dan controlH tanpa membaca semua garis
+struct LineAggregates {
+    int magicCount = 0;
+    long long sumTotal = 0;
+    long long sumSquares = 0;
+    long long absError = 0;
+};
+
+// Fungsi objektif yang bisa dipilih per run (opsi objective), nama dan rumusnya sama dengan objective.py:
+// std = magicCount - stddev, std_half = magicCount - stddev / 2 (default), control = magicCount + absError / errorScale,
+// count = magicCount. Semua dihitung dari LineAggregates, jadi evaluasi penuh dan delta memakai rumus yang sama.
+struct Objective {
+    enum Kind { STD, CONTROL, COUNT };
+    Kind kind = STD;
+    double stdfactor = 0.5;
+
+    static Objective fromOptions(const Options& options) {
+        Objective objective;
+        std::string name = options.find("objective") != options.end() ? optionString(options, "objective") : "std_half";
+        if (name == "std")
+            objective.stdfactor = 1;
+        else if (name == "control")
+            objective.kind = CONTROL;
+        else if (name == "count")
+            objective.kind = COUNT;
+        else if (name != "std_half")
+            throw std::invalid_argument("Unknown objective: " + name);
+        return objective;
+    }
+
+    double evaluate(const LineAggregates& values, double lineCount, double errorScale) const {
+        if (kind == CONTROL)
+            return values.magicCount + values.absError / errorScale;
+        if (kind == COUNT)
+            return values.magicCount;
+        double mean = values.sumTotal / lineCount;
+        double variance = std::max(values.sumSquares / lineCount - mean * mean, 0.0);
+        return values.magicCount - std::sqrt(variance) * stdfactor;
+    }
+};
+
+// Strategi tetangga untuk hill climbing:
+// full = steepest ascent atas semua pasangan, first = first improvement, sample = terbaik dari k pasangan acak.
+// candidates = pasangan diambil dari sel yang dilewati minimal satu garis yang belum magic.
+struct Neighborhood {
+    std::string strategy = "full";
+    int sampleSize = 100;
+    bool candidates = false;
+
+    static Neighborhood fromOptions(const Options& options) {
+        Neighborhood neighborhood;
+        if (options.find("neighborhood") != options.end())
+            neighborhood.strategy = optionString(options, "neighborhood");
+        if (options.find("sample_size") != options.end())
+            neighborhood.sampleSize = std::any_cast<int>(options.at("sample_size"));
+        if (options.find("candidates") != options.end())
+            neighborhood.candidates = std::any_cast<int>(options.at("candidates")) != 0;
+        if (neighborhood.strategy != "full" && neighborhood.strategy != "first" && neighborhood.strategy != "sample")
+            throw std::invalid_argument("Unknown neighborhood: " + neighborhood.strategy);
+        return neighborhood;
+    }
+};
+
+// Strategi state awal (opsi initializer), nama dan strateginya sama dengan initializer.py:
+// random = permutasi acak (default), algebraic = konstruksi linear digit Latin (LSD), terbaik dari beberapa matriks acak,
+// lalu diacak dengan permutasi digit dan simetri kubus (n genap memakai greedy), greedy = setiap nilai, mulai dari
+// yang terjauh dari rata-rata, ditempatkan di sel kosong yang paling mendekatkan simpangan garis-garisnya ke 0.
+struct Initializer {
+    enum Kind { RANDOM, ALGEBRAIC, GREEDY };
+    Kind kind = RANDOM;
+    int tries = 64;
+
+    static Initializer fromOptions(const Options& options) {
+        Initializer initializer;
+        std::string name = options.find("initializer") != options.end() ? optionString(options, "initializer") : "random";
+        if (name == "algebraic")
+            initializer.kind = ALGEBRAIC;
+        else if (name == "greedy")
+            initializer.kind = GREEDY;
+        else if (name != "random")
+            throw std::invalid_argument("Unknown initializer: " + name);
+        return initializer;
+    }
+
+    void fill(std::vector<int>& cells, int n, std::mt19937& rng) const {
+        if (kind == RANDOM) {
+            std::iota(cells.begin(), cells.end(), 1);
+            std::shuffle(cells.begin(), cells.end(), rng);
+            return;
         }
-        return diagonal_sums;
+        // Matriks invertibel dengan semua entri unit mod n hanya ada untuk n ganjil, selain itu greedy
+        if (kind == ALGEBRAIC && n % 2 == 1 && algebraic(cells, n, rng))
+            return;
+        greedy(cells, n, rng);
     }
 
-    std::vector<int> xzIntersectionDiagonalSums() const {
-        std::vector<int> diagonal_sums;
-        for (int y = 0; y < dimension; ++y) {
-            int diagonal1 = 0, diagonal2 = 0;
-            for (int i = 0; i < dimension; ++i) {
-                diagonal1 += cube[i][y][i];
-                diagonal2 += cube[i][y][dimension - 1 - i];
-            }
-            diagonal_sums.push_back(diagonal1);
-            diagonal_sums.push_back(diagonal2);
+    static int magicLines(const std::vector<int>& cells, int n) {
+        long long target = static_cast<long long>(n) * (static_cast<long long>(n) * n * n + 1) / 2;
+        int count = 0;
+        for (const auto& line : LineTable::forDimension(n).lines) {
+            long long sum = 0;
+            for (int cell : line)
+                sum += cells[cell];
+            count += sum == target;
         }
-        return diagonal_sums;
+        return count;
     }
 
-    std::vector<int> yzIntersectionDiagonalSums() const {
-        std::vector<int> diagonal_sums;
-        for (int x = 0; x < dimension; ++x) {
-            int diagonal1 = 0, diagonal2 = 0;
-            for (int i = 0; i < dimension; ++i) {
-                diagonal1 += cube[i][i][x];
-                diagonal2 += cube[i][dimension - 1 - i][x];
+    // Digit ke-k sel (x, y, z) = (matrix[k] . (x, y, z) + offset[k]) mod n, nilai = 1 + sum digit_k * n^k.
+    // Garis berarah v memuat semua digit jika matrix[k] . v unit mod n; offset membuat sel pusat bernilai tengah,
+    // jadi garis lewat pusat dengan digit konstan juga magic.
+    bool algebraic(std::vector<int>& cells, int n, std::mt19937& rng) const {
+        std::vector<int> units;
+        for (int k = 1; k < n; ++k)
+            if (std::gcd(k, n) == 1)
+                units.push_back(k);
+        int middle = (n - 1) / 2;
+        int power[3] = {1, n, n * n};
+        std::vector<int> candidate(cells.size());
+        int best = -1;
+
+        for (int attempt = 0; attempt < tries; ++attempt) {
+            long long m[3][3];
+            for (auto& row : m)
+                for (auto& entry : row)
+                    entry = units[rng() % units.size()];
+            long long det = m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1]) - m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0])
+                          + m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0]);
+            if (std::gcd(((det % n) + n) % n, static_cast<long long>(n)) != 1)
+                continue;
+            long long offset[3];
+            for (int k = 0; k < 3; ++k)
+                offset[k] = ((middle - (m[k][0] + m[k][1] + m[k][2]) * middle) % n + n) % n;
+            for (int z = 0; z < n; ++z)
+                for (int y = 0; y < n; ++y)
+                    for (int x = 0; x < n; ++x) {
+                        int value = 1;
+                        for (int k = 0; k < 3; ++k)
+                            value += (m[k][0] * x + m[k][1] * y + m[k][2] * z + offset[k]) % n * power[k];
+                        candidate[(z * n + y) * n + x] = value;
+                    }
+            int count = magicLines(candidate, n);
+            if (count > best) {
+                best = count;
+                cells = candidate;
             }
-            diagonal_sums.push_back(diagonal1);
-            diagonal_sums.push_back(diagonal2);
         }
-        return diagonal_sums;
+        if (best < 0)
+            return false;
+
+        // Permutasi digit yang mempertahankan digit tengah, lalu salah satu dari 48 simetri kubus
+        std::vector<std::vector<int>> mapping(3, std::vector<int>(n));
+        for (auto& digits : mapping) {
+            std::vector<int> others;
+            for (int d = 0; d < n; ++d)
+                if (d != middle)
+                    others.push_back(d);
+            std::shuffle(others.begin(), others.end(), rng);
+            others.insert(others.begin() + middle, middle);
+            digits = others;
+        }
+        int permutation[3] = {0, 1, 2};
+        std::shuffle(permutation, permutation + 3, rng);
+        std::vector<int> image = symmetryImage(n, permutation, rng() % 8);
+        for (size_t cell = 0; cell < cells.size(); ++cell) {
+            int value = 1;
+            for (int k = 0; k < 3; ++k)
+                value += mapping[k][(cells[cell] - 1) / power[k] % n] * power[k];
+            candidate[image[cell]] = value;
+        }
+        cells = candidate;
+        return true;
     }
 
-    static std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>> allCoordinatePairs(int dimension) {
-        std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>> coordinate_pairs;
-        std::vector<std::tuple<int, int, int>> coordinates;
-
-        for (int i = 0; i < dimension; ++i) {
-            for (int j = 0; j < dimension; ++j) {
-                for (int k = 0; k < dimension; ++k) {
-                    coordinates.emplace_back(i, j, k);
+    // Simpangan garis = sisa target - jumlah sel kosong * rata-rata; biaya sel = perubahan jumlah kuadrat simpangan
+    static void greedy(std::vector<int>& cells, int n, std::mt19937& rng) {
+        const LineTable& table = LineTable::forDimension(n);
+        int count = cells.size();
+        double mean = (count + 1) / 2.0;
+        std::vector<double> deviation(table.lines.size(), 0);
+        std::vector<bool> free(count, true);
+
+        // Urutan nilai: terjauh dari rata-rata lebih dulu, nilai setara diacak
+        std::vector<std::pair<double, uint32_t>> keys;
+        for (int value = 1; value <= count; ++value)
+            keys.push_back({-std::abs(value - mean), rng()});
+        std::vector<int> order(count);
+        std::iota(order.begin(), order.end(), 1);
+        std::sort(order.begin(), order.end(), [&](int a, int b) { return keys[a - 1] < keys[b - 1]; });
+
+        for (int value : order) {
+            double weight = value - mean;
+            double bestCost = INFINITY;
+            int chosen = -1;
+            int ties = 0;
+            for (int cell = 0; cell < count; ++cell) {
+                if (!free[cell])
+                    continue;
+                double cost = 0;
+                for (int line : table.cellLines[cell])
+                    cost += weight * weight - 2 * weight * deviation[line];
+                if (cost < bestCost) {
+                    bestCost = cost;
+                    chosen = cell;
+                    ties = 1;
+                } else if (cost == bestCost && rng() % ++ties == 0) {
+                    chosen = cell;
                 }
             }
+            cells[chosen] = value;
+            free[chosen] = false;
+            for (int line : table.cellLines[chosen])
+                deviation[line] -= weight;
         }
+    }
+};
 
-        for (size_t i = 0; i < coordinates.size(); ++i) {
-            for (size_t j = i + 1; j < coordinates.size(); ++j) {
-                coordinate_pairs.emplace_back(coordinates[i], coordinates[j]);
-            }
+class Cube {
+public:
+    int dimension;
+    long long target;
+    const LineTable* table;
+    // Sel disimpan flat dengan indeks (z * n + y) * n + x
+    std::vector<int> cells;
+    std::vector<long long> sums;
+    LineAggregates aggregates;
+    // Jumlah garis belum magic yang melewati tiap sel
+    std::vector<int> unsatisfied;
+    Neighborhood neighborhood;
+    Objective objective;
+    Initializer initializer;
+    // version naik setiap sel berubah; getH dihitung sekali per version
+    long long version = 0;
+    mutable long long scoredVersion = -1;
+    mutable double score = 0;
+    // Hash Zobrist per varian simetri: 1 varian tanpa kanonikalisasi, 96 (48 simetri x komplemen) dengan kanonikalisasi.
+    // Kosong jika transposition cache tidak aktif.
+    const ZobristTable* zobrist = nullptr;
+    std::vector<uint64_t> hashes;
+    // Transposition cache run ini; hAfterSwap memakai H yang tersimpan jika state tujuan sudah dikunjungi
+    TranspositionCache* cache = nullptr;
+    Profiler* profiler = nullptr;
+    std::mt19937 rng;
+
+    Cube(int dimension) : dimension(dimension), target(static_cast<long long>(dimension) * (static_cast<long long>(dimension) * dimension * dimension + 1) / 2),
+                          table(&LineTable::forDimension(dimension)), cells(dimension * dimension * dimension, 0), rng(std::random_device{}()) {
+        updateSums();
+    }
+
+    int index(int x, int y, int z) const {
+        return (z * dimension + y) * dimension + x;
+    }
+
+    Coordinate coordinate(int cell) const {
+        return {cell % dimension, (cell / dimension) % dimension, cell / (dimension * dimension)};
+    }
+
+    void initialize() {
+        initializer.fill(cells, dimension, rng);
+        updateSums();
+    }
+
+    void updateSums() {
+        sums.assign(table->lines.size(), 0);
+        unsatisfied.assign(cells.size(), 0);
+        aggregates = LineAggregates();
+        version++;
+        rehash();
+        for (size_t line = 0; line < table->lines.size(); ++line) {
+            for (int cell : table->lines[line])
+                sums[line] += cells[cell];
+            addLine(aggregates, sums[line], 1);
+            if (sums[line] != target)
+                for (int cell : table->lines[line])
+                    unsatisfied[cell]++;
         }
+    }
 
-        std::random_device rd;
-        std::mt19937 g(rd());
-        std::shuffle(coordinate_pairs.begin(), coordinate_pairs.end(), g);
+    void updateLine(int line, long long diff) {
+        bool wasMagic = sums[line] == target;
+        sums[line] += diff;
+        bool isMagic = sums[line] == target;
+        if (wasMagic != isMagic)
+            for (int cell : table->lines[line])
+                unsatisfied[cell] += wasMagic ? 1 : -1;
+    }
 
-        return coordinate_pairs;
+    void addLine(LineAggregates& result, long long sum, int sign) const {
+        result.magicCount += sign * (sum == target);
+        result.sumTotal += sign * sum;
+        result.sumSquares += sign * sum * sum;
+        result.absError += sign * std::abs(target - sum);
     }
 
     std::vector<int> allSums() const {
-        std::vector<int> all_sums;
+        return std::vector<int>(sums.begin(), sums.end());
+    }
 
-        auto row_sums = rowSums();
-        all_sums.insert(all_sums.end(), row_sums.begin(), row_sums.end());
+    int lineCount() const {
+        return table->lines.size();
+    }
 
-        auto column_sums = columnSums();
-        all_sums.insert(all_sums.end(), column_sums.begin(), column_sums.end());
+    // Normalisasi error controlH: jumlah garis dikali simpangan terbesar yang mungkin (32700 untuk n = 5)
+    double errorScale() const {
+        long long n = dimension;
+        long long maxLineSum = n * n * n * n - n * (n - 1) / 2;
+        return static_cast<double>(lineCount()) * (maxLineSum - target);
+    }
 
-        auto pillar_sums = pillarSums();
-        all_sums.insert(all_sums.end(), pillar_sums.begin(), pillar_sums.end());
+    double hFromAggregates(const LineAggregates& values) const {
+        return objective.evaluate(values, lineCount(), errorScale());
+    }
 
-        auto xy_diagonal_sums = xyIntersectionDiagonalSums();
-        all_sums.insert(all_sums.end(), xy_diagonal_sums.begin(), xy_diagonal_sums.end());
+    double controlHFromAggregates(const LineAggregates& values) const {
+        return values.magicCount + values.absError / errorScale();
+    }
 
-        auto xz_diagonal_sums = xzIntersectionDiagonalSums();
-        all_sums.insert(all_sums.end(), xz_diagonal_sums.begin(), xz_diagonal_sums.end());
+    void enableHashing(bool symmetric) {
+        zobrist = &ZobristTable::forDimension(dimension);
+        hashes.assign(symmetric ? 2 * zobrist->symmetries.size() : 1, 0);
+        rehash();
+    }
 
-        auto yz_diagonal_sums = yzIntersectionDiagonalSums();
-        all_sums.insert(all_sums.end(), yz_diagonal_sums.begin(), yz_diagonal_sums.end());
+    // Varian ganjil memakai komplemen nilai v -> n^3 + 1 - v; semua varian mempertahankan getH
+    uint64_t variantKey(size_t variant, int cell, int value) const {
+        int image = zobrist->symmetries[variant / 2][cell];
+        return zobrist->key(image, variant % 2 ? static_cast<int>(cells.size()) + 1 - value : value);
+    }
 
-        return all_sums;
+    void rehash() {
+        for (size_t variant = 0; variant < hashes.size(); ++variant) {
+            hashes[variant] = 0;
+            for (size_t cell = 0; cell < cells.size(); ++cell)
+                hashes[variant] ^= variantKey(variant, cell, cells[cell]);
+        }
     }
 
-    double calculateStandardDeviation(const std::vector<int>& sums) const {
-        double mean = std::accumulate(sums.begin(), sums.end(), 0.0) / sums.size();
-        double variance = 0;
-        for (int sum : sums)
-            variance += (sum - mean) * (sum - mean);
-        variance /= sums.size();
-        return std::sqrt(variance);
+    uint64_t swapKeys(size_t variant, int a, int b) const {
+        return variantKey(variant, a, cells[a]) ^ variantKey(variant, a, cells[b])
+             ^ variantKey(variant, b, cells[b]) ^ variantKey(variant, b, cells[a]);
     }
 
-    double getH() const {
-        std::vector<int> sums = allSums();
+    // Hash kanonik = minimum atas semua varian, sama untuk state yang simetris
+    uint64_t stateHash() const {
+        return *std::min_element(hashes.begin(), hashes.end());
+    }
 
-        double target = dimension * (std::pow(dimension, 3) + 1) / 2;
-        double stddev = calculateStandardDeviation(sums);
+    uint64_t hashAfterSwap(int a, int b) const {
+        uint64_t result = UINT64_MAX;
+        for (size_t variant = 0; variant < hashes.size(); ++variant)
+            result = std::min(result, hashes[variant] ^ swapKeys(variant, a, b));
+        return result;
+    }
 
-        int n = std::count(sums.begin(), sums.end(), static_cast<int>(target));
+    void setObjective(const Objective& value) {
+        objective = value;
+        scoredVersion = -1;
+    }
 
-        return n - stddev * stdfactor;
+    double getH() const {
+        if (scoredVersion != version) {
+            if (profiler)
+                profiler->counters[Profiler::EVALUATIONS]++;
+            score = hFromAggregates(aggregates);
+            scoredVersion = version;
+        }
+        return score;
     }
 
     double controlH() const {
-        std::vector<int> sums = allSums();
+        return controlHFromAggregates(aggregates);
+    }
 
-        double target = dimension * (std::pow(dimension, 3) + 1) / 2;
+    // Agregat setelah sel a dan b ditukar; hanya garis yang dilewati salah satu sel yang berubah
+    LineAggregates aggregatesAfterSwap(int a, int b) const {
+        LineAggregates result = aggregates;
+        long long diff = cells[b] - cells[a];
+        const auto& linesA = table->cellLines[a];
+        const auto& linesB = table->cellLines[b];
+        for (int line : linesA) {
+            if (std::find(linesB.begin(), linesB.end(), line) != linesB.end())
+                continue;
+            addLine(result, sums[line], -1);
+            addLine(result, sums[line] + diff, 1);
+        }
+        for (int line : linesB) {
+            if (std::find(linesA.begin(), linesA.end(), line) != linesA.end())
+                continue;
+            addLine(result, sums[line], -1);
+            addLine(result, sums[line] - diff, 1);
+        }
+        return result;
+    }
 
-        int n = 0;
-        double e = 0.0;
-        for (int sum : sums) {
-            if (sum == static_cast<int>(target)) {
-                ++n;
+    double hAfterSwap(int a, int b) const {
+        ProfileScope scope(profiler, Profiler::OBJECTIVE);
+        if (cache) {
+            if (const double* stored = cache->peek(hashAfterSwap(a, b))) {
+                cache->skips++;
+                return *stored;
             }
-            e += std::abs(target - sum);
         }
+        if (profiler)
+            profiler->counters[Profiler::EVALUATIONS]++;
+        return hFromAggregates(aggregatesAfterSwap(a, b));
+    }
 
-        e /= 32700.0;
+    void swapCells(int a, int b) {
+        ProfileScope scope(profiler, Profiler::APPLY);
+        if (profiler)
+            profiler->counters[Profiler::ACCEPTED]++;
+        aggregates = aggregatesAfterSwap(a, b);
+        for (size_t variant = 0; variant < hashes.size(); ++variant)
+            hashes[variant] ^= swapKeys(variant, a, b);
+        long long diff = cells[b] - cells[a];
+        const auto& linesA = table->cellLines[a];
+        const auto& linesB = table->cellLines[b];
+        for (int line : linesA)
+            if (std::find(linesB.begin(), linesB.end(), line) == linesB.end())
+                updateLine(line, diff);
+        for (int line : linesB)
+            if (std::find(linesA.begin(), linesA.end(), line) == linesA.end())
+                updateLine(line, -diff);
+        std::swap(cells[a], cells[b]);
+        version++;
+    }
 
-        return n + e;
+    Switch toSwitch(int a, int b) const {
+        return {coordinate(a), coordinate(b)};
     }
 
     static Cube copyCube(const Cube& source) {
-        Cube copy(source.dimension);
-        copy.cube = source.cube;
-        return copy;
+        return source;
     }
 
-    std::pair<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>, double> findSteepestAscent() {
-        Cube dummy_cube = copyCube(*this);
-        auto coordinatePairs = allCoordinatePairs(dimension);
+    // Urutan sel acak untuk scan tetangga; dengan candidates, sel pada garis yang belum magic didahulukan
+    // dan hanya pasangan yang memuat minimal satu sel kandidat yang diperiksa
+    std::pair<std::vector<int>, size_t> scanOrder() {
+        std::vector<int> order(cells.size());
+        std::iota(order.begin(), order.end(), 0);
+        std::shuffle(order.begin(), order.end(), rng);
+        if (!neighborhood.candidates)
+            return {order, order.size()};
+
+        auto split = std::stable_partition(order.begin(), order.end(), [this](int cell) { return unsatisfied[cell] > 0; });
+        return {order, static_cast<size_t>(split - order.begin())};
+    }
 
-        std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>> maxCoordPairs;
-        double maxH = -2000;
+    // Semua pasangan sel diperiksa tanpa dimaterialisasi; urutan acak lewat permutasi sel (memori O(n^3)).
+    // firstImprovement berhenti pada pasangan pertama yang lebih baik dari currentH.
+    // admissible(a, b, newH) menyaring langkah (misalnya daftar tabu); tanpa langkah yang lolos, H bernilai -INFINITY.
+    struct AnyMove {
+        bool operator()(int, int, double) const { return true; }
+    };
+
+    template <typename Admissible = AnyMove>
+    std::pair<Switch, double> scanPairs(bool firstImprovement, double currentH, Admissible admissible = {}) {
+        auto [order, candidateCount] = scanOrder();
+
+        std::pair<int, int> maxPair = {order[0], order[1]};
+        double maxH = -INFINITY;
+
+        for (size_t i = 0; i < candidateCount; ++i) {
+            for (size_t j = i + 1; j < order.size(); ++j) {
+                double newH = hAfterSwap(order[i], order[j]);
+
+                if (newH > maxH && admissible(order[i], order[j], newH)) {
+                    maxH = newH;
+                    maxPair = {order[i], order[j]};
+                    if (firstImprovement && newH > currentH)
+                        return {toSwitch(maxPair.first, maxPair.second), maxH};
+                }
+            }
+        }
 
-        for (const auto& [coord1, coord2] : coordinatePairs) {
-            auto [x1, y1, z1] = coord1;
-            auto [x2, y2, z2] = coord2;
+        return {toSwitch(maxPair.first, maxPair.second), maxH};
+    }
 
-            std::swap(dummy_cube.cube[z1][y1][x1], dummy_cube.cube[z2][y2][x2]);
+    std::pair<Switch, double> findSteepestAscent() {
+        return scanPairs(false, INFINITY);
+    }
 
-            double currentH = dummy_cube.getH();
+    int randomCell(bool candidate) {
+        int cell = rng() % cells.size();
+        // Rejection sampling: kubus dengan semua garis magic tidak punya kandidat, batasi percobaan
+        for (int tries = 0; candidate && unsatisfied[cell] == 0 && tries < 64; ++tries)
+            cell = rng() % cells.size();
+        return cell;
+    }
 
-            if (currentH > maxH) {
-                maxH = currentH;
-                maxCoordPairs = {coord1, coord2};
-            }
+    std::pair<int, int> randomPair(bool candidates) {
+        int a = randomCell(candidates);
+        int b;
+        do {
+            b = rng() % cells.size();
+        } while (a == b);
+        return {a, b};
+    }
 
-            std::swap(dummy_cube.cube[z1][y1][x1], dummy_cube.cube[z2][y2][x2]);
+    template <typename Admissible = AnyMove>
+    std::pair<Switch, double> sampleBestPair(Admissible admissible = {}) {
+        std::pair<int, int> maxPair = {0, 1};
+        double maxH = -INFINITY;
+        for (int i = 0; i < neighborhood.sampleSize; ++i) {
+            auto pair = randomPair(neighborhood.candidates);
+            double newH = hAfterSwap(pair.first, pair.second);
+            if (newH > maxH && admissible(pair.first, pair.second, newH)) {
+                maxH = newH;
+                maxPair = pair;
+            }
         }
-
-        return {maxCoordPairs, maxH};
+        return {toSwitch(maxPair.first, maxPair.second), maxH};
     }
 
-    std::unordered_map<std::string, std::any> steepestAscentHillClimb() {
-        initialize();
-        std::unordered_map<std::string, std::any> result;
-        result["initial_state"] = copyCube(*this).cube;
-        result["switches"] = std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>>();
-        result["h_values"] = std::vector<double>();
+    template <typename Admissible = AnyMove>
+    std::pair<Switch, double> findMove(double currentH, Admissible admissible = {}) {
+        ProfileScope scope(profiler, Profiler::NEIGHBORS);
+        if (neighborhood.strategy == "first")
+            return scanPairs(true, currentH, admissible);
+        if (neighborhood.strategy == "sample")
+            return sampleBestPair(admissible);
+        return scanPairs(false, currentH, admissible);
+    }
 
-        auto& h_values = std::any_cast<std::vector<double>&>(result["h_values"]);
-        auto& switches = std::any_cast<std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>>&>(result["switches"]);
+    std::vector<int> flatten() const {
+        return cells;
+    }
 
-        bool done = false;
-        while (!done) {
-            double currentH = getH();
-            h_values.push_back(currentH);
-            auto [pair, newH] = findSteepestAscent();
+    void load(const std::vector<int>& flat) {
+        cells = flat;
+        updateSums();
+    }
 
-            if (newH > currentH) {
-                auto [coord1, coord2] = pair;
-                auto [x1, y1, z1] = coord1;
-                auto [x2, y2, z2] = coord2;
-                std::swap(cube[z1][y1][x1], cube[z2][y2][x2]);
+    static std::vector<std::vector<std::vector<int>>> unflatten(const std::vector<int>& flat, int dimension) {
+        std::vector<std::vector<std::vector<int>>> nested(dimension, std::vector<std::vector<int>>(dimension, std::vector<int>(dimension)));
+        int index = 0;
+        for (auto& plane : nested)
+            for (auto& row : plane)
+                for (auto& value : row)
+                    value = flat[index++];
+        return nested;
+    }
 
-                switches.push_back(pair);
-            } else {
-                done = true;
-            }
-        }
+    std::vector<std::vector<std::vector<int>>> nested() const {
+        return unflatten(cells, dimension);
+    }
 
-        std::any_cast<std::vector<double>>(result["h_values"]).push_back(getH());
-        return result;
+    int randomIndex() {
+        return rng() % dimension;
     }
 
-    std::unordered_map<std::string, std::any> sidewayAscentHillClimb(int limit = 100) {
-        initialize();
-        std::unordered_map<std::string, std::any> result;
-        result["initial_state"] = copyCube(*this).cube;
-        result["switches"] = std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>>();
-        result["h_values"] = std::vector<double>();
+    double randomUnit() {
+        return static_cast<double>(rng()) / rng.max();
+    }
 
-        auto& h_values = std::any_cast<std::vector<double>&>(result["h_values"]);
-        auto& switches = std::any_cast<std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>>&>(result["switches"]);
+    // Pasangan acak untuk stochastic dan annealing
+    std::pair<int, int> randomMove() {
+        ProfileScope scope(profiler, Profiler::NEIGHBORS);
+        if (neighborhood.candidates)
+            return randomPair(true);
+
+        int x1, y1, z1, x2, y2, z2;
+        do {
+            x1 = randomIndex();
+            y1 = randomIndex();
+            z1 = randomIndex();
+            x2 = randomIndex();
+            y2 = randomIndex();
+            z2 = randomIndex();
+        } while (x1 == x2 && y1 == y2 && z1 == z2);
+        return {index(x1, y1, z1), index(x2, y2, z2)};
+    }
 
-        bool done = false;
-        int currentStreak = 0;
-        while (!done) {
-            double currentH = getH();
-            h_values.push_back(currentH);
-            auto [pair, newH] = findSteepestAscent();
+    void beginRun(SearchState& state) {
+        initialize();
+        state.initialState = flatten();
+        state.resetHistory();
+        state.streak = 0;
+        state.stucks = 0;
+        state.step = 0;
+        state.running = true;
+    }
 
-            if (newH > currentH || (currentH == newH && currentStreak < limit)) {
-                auto [coord1, coord2] = pair;
-                auto [x1, y1, z1] = coord1;
-                auto [x2, y2, z2] = coord2;
-                std::swap(cube[z1][y1][x1], cube[z2][y2][x2]);
+    // Satu langkah steepest ascent; limit > 0 mengizinkan sideways move sebanyak limit kali berturut-turut
+    bool climbStep(SearchState& state, int limit) {
+        double currentH = getH();
+        state.recordH(currentH);
+        TranspositionCache& cache = state.cache;
+        // Dengan cache aktif, sideways move ke state yang sudah dikunjungi (siklus) tidak diizinkan
+        auto acyclic = [&](int a, int b, double newH) {
+            if (newH != currentH || !cache.find(hashAfterSwap(a, b)))
+                return true;
+            cache.cycles++;
+            return false;
+        };
+        auto [pair, newH] = limit > 0 && cache.enabled() ? findMove(currentH, acyclic) : findMove(currentH);
+        state.iteration++;
+
+        if (newH > currentH || (currentH == newH && state.streak < limit)) {
+            auto [coord1, coord2] = pair;
+            auto [x1, y1, z1] = coord1;
+            auto [x2, y2, z2] = coord2;
+            swapCells(index(x1, y1, z1), index(x2, y2, z2));
 
-                switches.push_back(pair);
+            state.recordSwitch(pair);
 
-                if (newH > currentH){
-                    currentStreak = 0;
-                }
-                else{
-                    currentStreak++;
+            if (cache.enabled()) {
+                // State yang lebih baik tapi sudah dikenal berarti basin dari restart sebelumnya, climb tidak diulang
+                if (newH > currentH && cache.find(stateHash())) {
+                    cache.revisits++;
+                    return false;
                 }
+                cache.insert(stateHash(), newH);
+            }
+
+            if (newH > currentH) {
+                state.streak = 0;
             } else {
-                done = true;
+                state.streak++;
             }
+            return true;
         }
+        return false;
+    }
 
-        std::any_cast<std::vector<double>>(result["h_values"]).push_back(getH());
-        return result;
+    void steepestAscentHillClimb(SearchState& state, RunContext& context) {
+        if (!state.running)
+            beginRun(state);
+
+        while (!state.stopReason && climbStep(state, 0))
+            context.tick(*this, state);
+        state.running = false;
     }
 
-    std::unordered_map<std::string, std::any> randomRestartHillClimb(int max_restart = 10) {
-        std::unordered_map<std::string, std::any> result;
-        result["iteration_per_restarts"] = std::vector<int>();
-        int iteration = 0;
-        double maxH = 0;
-        Cube final_cube = Cube(5);
+    void sidewayAscentHillClimb(SearchState& state, RunContext& context, int limit = 100) {
+        if (!state.running)
+            beginRun(state);
 
-        auto& iteration_per_restarts = std::any_cast<std::vector<int>&>(result["iteration_per_restarts"]);
+        while (!state.stopReason && climbStep(state, limit))
+            context.tick(*this, state);
+        state.running = false;
+    }
 
-        while (getH() != 109 && iteration < max_restart) {
-            auto currResult = steepestAscentHillClimb();
-            iteration_per_restarts.push_back(
-                std::any_cast<std::vector<double>>(currResult["h_values"]).size()
-            );
+    void randomRestartHillClimb(SearchState& state, RunContext& context, int max_restart = 10) {
+        while (!state.stopReason && (state.running || (getH() != lineCount() && state.restart < max_restart))) {
+            steepestAscentHillClimb(state, context);
+            state.iterationPerRestarts.push_back(state.hSeries.total);
 
             double currentH = getH();
-            if (currentH > maxH) {
-                result["initial_state"] = currResult["initial_state"];
-                result["switches"] = currResult["switches"];
-                result["h_values"] = currResult["h_values"];
-                maxH = currentH;
-                final_cube = copyCube(*this);
+            if (currentH > state.bestH) {
+                state.bestInitialState = state.initialState;
+                state.bestSwitches = state.switches;
+                state.bestHValues = state.hValues;
+                state.bestHSeries = state.hSeries;
+                state.bestH = currentH;
+                state.bestState = flatten();
             }
-            iteration++;
+            state.restart++;
+            // Langkah terakhir climb (tanpa perbaikan) belum di-tick; penting jika setiap climb langsung buntu
+            context.tick(*this, state);
         }
 
-        result["restart_counts"] = iteration;
-        *this = final_cube;
-        return result;
+        state.initialState = state.bestInitialState;
+        state.historyGeneration++;
+        state.switches = state.bestSwitches;
+        state.hValues = state.bestHValues;
+        state.hSeries = state.bestHSeries;
+        load(state.bestState);
     }
 
-    std::unordered_map<std::string, std::any> stochasticHillClimb() {
-        initialize();
-        std::unordered_map<std::string, std::any> result;
-        result["initial_state"] = copyCube(*this).cube;
-        result["switches"] = std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>>();
-        result["h_values"] = std::vector<double>();
-
-        auto& h_values = std::any_cast<std::vector<double>&>(result["h_values"]);
-        auto& switches = std::any_cast<std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>>&>(result["switches"]);
+    void stochasticHillClimb(SearchState& state, RunContext& context) {
+        if (!state.running)
+            beginRun(state);
 
         const int nmax = 100000;
 
-        std::srand(static_cast<unsigned int>(std::time(nullptr)));
+        while (!state.stopReason && state.step < nmax) {
+            auto [a, b] = randomMove();
+            auto [x1, y1, z1] = coordinate(a);
+            auto [x2, y2, z2] = coordinate(b);
+            double currentH = getH();
+            double newH = hAfterSwap(a, b);
 
-        for (int i = 0; i < nmax; ++i) {
-            int x1, y1, z1, x2, y2, z2;
+            if (currentH < newH) {
+                swapCells(a, b);
+                state.recordSwitch({std::make_tuple(x1, y1, z1), std::make_tuple(x2, y2, z2)});
+            }
 
-            do {
-                x1 = std::rand() % dimension;
-                y1 = std::rand() % dimension;
-                z1 = std::rand() % dimension;
-                x2 = std::rand() % dimension;
-                y2 = std::rand() % dimension;
-                z2 = std::rand() % dimension;
-            } while (x1 == x2 && y1 == y2 && z1 == z2);
+            state.recordH(getH());
+            state.step++;
+            state.iteration++;
+            context.tick(*this, state);
+        }
+        state.running = false;
+    }
 
-            double currentH = getH();
-            std::swap(cube[z1][y1][x1], cube[z2][y2][x2]);
+    void recordBest(SearchState& state) {
+        if (getH() > state.bestH) {
+            state.bestH = getH();
+            state.bestState = flatten();
+            state.bestStep = state.switchSeries.total;
+        }
+    }
 
-            double newH = getH();
+    // Hasil akhir = state terbaik; switch setelahnya dibuang supaya replay berakhir di final_state
+    void restoreBest(SearchState& state) {
+        if (state.bestState.empty() || state.bestH <= getH())
+            return;
+        load(state.bestState);
+        long long keep = state.bestStep - state.switchSeries.offset;
+        if (keep >= 0) {
+            if (keep < static_cast<long long>(state.switches.size()))
+                state.switches.resize(keep);
+        } else {
+            // State terbaik sudah keluar dari ring buffer, riwayat dimulai dari state terbaik itu sendiri
+            state.switches.clear();
+            state.initialState = state.bestState;
+            state.switchSeries.offset = state.bestStep;
+        }
+        state.switchSeries.total = state.bestStep;
+    }
 
-            if (currentH >= newH) {
-                std::swap(cube[z1][y1][x1], cube[z2][y2][x2]);
-            } else {
-                switches.emplace_back(std::make_tuple(x1, y1, z1), std::make_tuple(x2, y2, z2));
-            }
+    // Tabu search: tiap iterasi mengambil langkah terbaik yang tidak tabu walaupun memburuk. Atribut tabu adalah
+    // (sel, nilai): nilai yang keluar dari sebuah sel tidak boleh kembali ke sel itu selama tenure iterasi.
+    // Langkah tabu tetap boleh jika menghasilkan H di atas H terbaik (aspiration).
+    void tabuSearch(SearchState& state, RunContext& context, long long maxIteration, int tenure) {
+        size_t stride = cells.size() + 1;
+        if (!state.running) {
+            beginRun(state);
+            state.tabuUntil.assign(cells.size() * stride, 0);
+            state.bestH = -INFINITY;
+            recordBest(state);
+        }
 
-            h_values.push_back(getH());
+        while (!state.stopReason && state.step < maxIteration && getH() != lineCount()) {
+            long long now = state.step;
+            auto admissible = [&](int a, int b, double newH) {
+                bool tabu = state.tabuUntil[a * stride + cells[b]] > now || state.tabuUntil[b * stride + cells[a]] > now;
+                return !tabu || newH > state.bestH;
+            };
+            auto [pair, newH] = findMove(getH(), admissible);
+            if (newH == -INFINITY)
+                break;
+
+            int a = index(std::get<0>(pair.first), std::get<1>(pair.first), std::get<2>(pair.first));
+            int b = index(std::get<0>(pair.second), std::get<1>(pair.second), std::get<2>(pair.second));
+            state.tabuUntil[a * stride + cells[a]] = now + tenure;
+            state.tabuUntil[b * stride + cells[b]] = now + tenure;
+            swapCells(a, b);
+            state.recordSwitch(pair);
+            recordBest(state);
+
+            state.recordH(getH());
+            state.step++;
+            state.iteration++;
+            context.tick(*this, state);
         }
+        state.running = false;
+        restoreBest(state);
+    }
 
-        return result;
+    // Late acceptance hill climbing: langkah acak diterima jika tidak lebih buruk dari H saat ini
+    // atau dari H length iterasi sebelumnya
+    void lateAcceptanceHillClimb(SearchState& state, RunContext& context, long long maxIteration, int length) {
+        if (!state.running) {
+            beginRun(state);
+            state.lateHValues.assign(length, getH());
+            state.bestH = -INFINITY;
+            recordBest(state);
+        }
+
+        while (!state.stopReason && state.step < maxIteration && getH() != lineCount()) {
+            auto [a, b] = randomMove();
+            double newH = hAfterSwap(a, b);
+            double& lateH = state.lateHValues[state.step % length];
+
+            if (newH >= getH() || newH >= lateH) {
+                auto pair = toSwitch(a, b);
+                swapCells(a, b);
+                state.recordSwitch(pair);
+                recordBest(state);
+            }
+            lateH = getH();
+
+            state.recordH(getH());
+            state.step++;
+            state.iteration++;
+            context.tick(*this, state);
+        }
+        state.running = false;
+        restoreBest(state);
     }
 
     double getTemperature(int iteration) const {
@@ -404,116 +1342,778 @@ public:
         return std::exp(deltaE / temp);
     }
 
-    std::unordered_map<std::string, std::any> simulatedAnnealing() {
-        initialize();
-        std::unordered_map<std::string, std::any> result;
-        result["initial_state"] = copyCube(*this).cube;
-        result["switches"] = std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>>();
-        result["h_values"] = std::vector<double>();
-        result["boltzmanns"] = std::vector<double>();
-        result["stucks"] = 0;
-
-        auto& h_values = std::any_cast<std::vector<double>&>(result["h_values"]);
-        auto& switches = std::any_cast<std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>>&>(result["switches"]);
-        auto& boltzmanns = std::any_cast<std::vector<double>&>(result["boltzmanns"]);
-        auto& stucks = std::any_cast<int&>(result["stucks"]);
-
-        int iteration = 1;
-        double temperature = getTemperature(iteration);
-
-        std::srand(static_cast<unsigned int>(std::time(nullptr)));
-
-        h_values.push_back(getH());
+    // Satu langkah Metropolis pada temperatur tetap, mengembalikan true jika swap diterima
+    bool metropolisStep(double temperature) {
+        if (profiler)
+            profiler->counters[Profiler::PROPOSALS]++;
+        auto [a, b] = randomMove();
+        double delta = hAfterSwap(a, b) - getH();
+        if (delta >= 0 || randomUnit() <= getProbability(delta, temperature)) {
+            swapCells(a, b);
+            return true;
+        }
+        return false;
+    }
 
-        while (temperature > 0) {
-            int x1, y1, z1, x2, y2, z2;
+    void simulatedAnnealing(SearchState& state, RunContext& context) {
+        if (!state.running) {
+            beginRun(state);
+            state.step = 1;
+            state.recordH(getH());
+        }
 
-            do {
-                x1 = std::rand() % dimension;
-                y1 = std::rand() % dimension;
-                z1 = std::rand() % dimension;
-                x2 = std::rand() % dimension;
-                y2 = std::rand() % dimension;
-                z2 = std::rand() % dimension;
-            } while (x1 == x2 && y1 == y2 && z1 == z2);
+        double temperature = getTemperature(state.step);
 
+        while (!state.stopReason && temperature > 0) {
+            auto [a, b] = randomMove();
+            auto [x1, y1, z1] = coordinate(a);
+            auto [x2, y2, z2] = coordinate(b);
             double currentH = getH();
-            std::swap(cube[z1][y1][x1], cube[z2][y2][x2]);
-
-            double newH = getH();
+            double newH = hAfterSwap(a, b);
             double probability;
 
             if (newH >= currentH) {
-                boltzmanns.emplace_back(1.0);
-                switches.emplace_back(std::make_tuple(x1, y1, z1), std::make_tuple(x2, y2, z2));
+                state.recordBoltzmann(1.0);
+                swapCells(a, b);
+                state.recordSwitch({std::make_tuple(x1, y1, z1), std::make_tuple(x2, y2, z2)});
             } else {
-                double roll = static_cast<double>(std::rand()) / RAND_MAX;
+                double roll = randomUnit();
                 probability = getProbability(newH - currentH, temperature);
-                boltzmanns.emplace_back(probability);
-                stucks++;
+                state.recordBoltzmann(probability);
+                state.stucks++;
 
-                if (roll > probability) {
-                    std::swap(cube[z1][y1][x1], cube[z2][y2][x2]);
-                } else {
-                    switches.emplace_back(std::make_tuple(x1, y1, z1), std::make_tuple(x2, y2, z2));
+                if (roll <= probability) {
+                    swapCells(a, b);
+                    state.recordSwitch({std::make_tuple(x1, y1, z1), std::make_tuple(x2, y2, z2)});
                 }
             }
 
-            iteration++;
-            temperature = getTemperature(iteration);
+            state.step++;
+            temperature = getTemperature(state.step);
 
-            h_values.push_back(getH());
+            state.recordH(getH());
+            state.iteration++;
+            context.tick(*this, state);
         }
-
-        return result;
+        state.running = false;
     }
 
     void printCube() const {
         for (int i = 0; i < dimension; ++i) {
             for (int j = 0; j < dimension; ++j) {
                 for (int k = 0; k < dimension; ++k) {
-                    std::cout << "cube[" << i << "][" << j << "][" << k << "] = " << cube[i][j][k] << std::endl;
+                    std::cout << "cube[" << i << "][" << j << "][" << k << "] = " << cells[(i * dimension + j) * dimension + k] << std::endl;
+                }
+            }
+        }
+    }
+};
+
+// Checkpoint terdiri dari snapshot state.bin (ditulis atomik lewat rename) dan log append-only
+// untuk switches, h_values, dan boltzmanns sehingga tiap checkpoint hanya menulis entri baru.
+class BinaryWriter {
+public:
+    std::ofstream out;
+
+    BinaryWriter(const std::string& path, std::ios::openmode mode = std::ios::trunc) : out(path, std::ios::binary | std::ios::out | mode) {
+        if (!out)
+            throw std::runtime_error("Cannot open checkpoint file " + path);
+    }
+
+    template <typename T>
+    void write(const T& value) {
+        out.write(reinterpret_cast<const char*>(&value), sizeof(T));
+    }
+
+    void writeString(const std::string& value) {
+        write<uint64_t>(value.size());
+        out.write(value.data(), value.size());
+    }
+
+    template <typename T>
+    void writeVector(const std::vector<T>& values, size_t from = 0) {
+        write<uint64_t>(values.size() - from);
+        out.write(reinterpret_cast<const char*>(values.data() + from), (values.size() - from) * sizeof(T));
+    }
+
+    void writeSwitches(const std::vector<Switch>& switches, size_t from = 0) {
+        for (size_t i = from; i < switches.size(); ++i) {
+            const auto& [coord1, coord2] = switches[i];
+            int32_t packed[6] = {std::get<0>(coord1), std::get<1>(coord1), std::get<2>(coord1),
+                                 std::get<0>(coord2), std::get<1>(coord2), std::get<2>(coord2)};
+            out.write(reinterpret_cast<const char*>(packed), sizeof(packed));
+        }
+    }
+};
+
+class BinaryReader {
+public:
+    std::ifstream in;
+
+    BinaryReader(const std::string& path) : in(path, std::ios::binary) {
+        if (!in)
+            throw std::runtime_error("Cannot open checkpoint file " + path);
+    }
+
+    template <typename T>
+    T read() {
+        T value;
+        in.read(reinterpret_cast<char*>(&value), sizeof(T));
+        if (!in)
+            throw std::runtime_error("Truncated checkpoint file");
+        return value;
+    }
+
+    std::string readString() {
+        std::string value(read<uint64_t>(), '\0');
+        in.read(value.data(), value.size());
+        return value;
+    }
+
+    template <typename T>
+    std::vector<T> readVector() {
+        std::vector<T> values(read<uint64_t>());
+        in.read(reinterpret_cast<char*>(values.data()), values.size() * sizeof(T));
+        return values;
+    }
+
+    template <typename T>
+    std::vector<T> readRaw(size_t count) {
+        std::vector<T> values(count);
+        in.read(reinterpret_cast<char*>(values.data()), count * sizeof(T));
+        if (!in)
+            throw std::runtime_error("Truncated checkpoint log");
+        return values;
+    }
+
+    std::vector<Switch> readSwitches(size_t count) {
+        std::vector<Switch> switches;
+        auto packed = readRaw<int32_t>(count * 6);
+        for (size_t i = 0; i < count; ++i) {
+            const int32_t* p = packed.data() + 6 * i;
+            switches.emplace_back(std::make_tuple(p[0], p[1], p[2]), std::make_tuple(p[3], p[4], p[5]));
+        }
+        return switches;
+    }
+};
+
+const uint32_t CHECKPOINT_VERSION = 6;
+
+void Checkpointer::configure(const Options& options) {
+    if (options.find("checkpoint") != options.end())
+        directory = optionString(options, "checkpoint");
+    if (options.find("checkpoint_interval") != options.end())
+        interval = std::any_cast<int>(options.at("checkpoint_interval"));
+    if (enabled())
+        std::filesystem::create_directories(directory);
+}
+
+void Checkpointer::maybeSave(const Cube& cube, SearchState& state) {
+    if (!enabled() || state.iteration % interval != 0)
+        return;
+    save(cube, state);
+}
+
+void Checkpointer::appendLogs(const SearchState& state) {
+    auto path = [&](const char* name) { return (std::filesystem::path(directory) / name).string(); };
+
+    // Riwayat yang diganti (generasi baru, misalnya climb berikutnya pada random restart) atau dipotong ditulis ulang dari awal;
+    // ukuran saja tidak cukup karena climb baru bisa lebih panjang dari log lama.
+    // Riwayat terbatas (ring/downsample) bisa berubah di depan, ukurannya kecil jadi selalu ditulis ulang.
+    if (state.history.bounded() || state.historyGeneration != savedGeneration || state.switches.size() < savedSwitches
+        || state.hValues.size() < savedH || state.boltzmanns.size() < savedBoltzmanns)
+        savedSwitches = savedH = savedBoltzmanns = 0;
+    savedGeneration = state.historyGeneration;
+    auto mode = [](size_t saved) { return saved == 0 ? std::ios::trunc : std::ios::app; };
+
+    {
+        BinaryWriter log(path("switches.bin"), mode(savedSwitches));
+        log.writeSwitches(state.switches, savedSwitches);
+    }
+    {
+        BinaryWriter log(path("h_values.bin"), mode(savedH));
+        log.out.write(reinterpret_cast<const char*>(state.hValues.data() + savedH), (state.hValues.size() - savedH) * sizeof(double));
+    }
+    {
+        BinaryWriter log(path("boltzmanns.bin"), mode(savedBoltzmanns));
+        log.out.write(reinterpret_cast<const char*>(state.boltzmanns.data() + savedBoltzmanns), (state.boltzmanns.size() - savedBoltzmanns) * sizeof(double));
+    }
+    savedSwitches = state.switches.size();
+    savedH = state.hValues.size();
+    savedBoltzmanns = state.boltzmanns.size();
+}
+
+void Checkpointer::save(const Cube& cube, SearchState& state) {
+    appendLogs(state);
+
+    auto snapshot = std::filesystem::path(directory) / "state.bin";
+    auto temporary = std::filesystem::path(directory) / "state.bin.tmp";
+    {
+        BinaryWriter out(temporary.string());
+        out.out.write("CUBECKPT", 8);
+        out.write(CHECKPOINT_VERSION);
+        out.writeString(state.algorithm);
+
+        out.write<uint64_t>(state.options.size());
+        for (const auto& [key, value] : state.options) {
+            out.writeString(key);
+            if (value.type() == typeid(int)) {
+                out.write<uint8_t>(0);
+                out.write<int32_t>(std::any_cast<int>(value));
+            } else {
+                out.write<uint8_t>(1);
+                out.writeString(std::any_cast<std::string>(value));
+            }
+        }
+
+        out.write<int32_t>(cube.dimension);
+        out.writeVector(cube.flatten());
+        std::ostringstream rng;
+        rng << cube.rng;
+        out.writeString(rng.str());
+
+        out.write<int64_t>(state.iteration);
+        out.write<int64_t>(state.step);
+        out.write<int32_t>(state.streak);
+        out.write<int32_t>(state.stucks);
+        out.write<int32_t>(state.restart);
+        out.write<int32_t>(state.historyGeneration);
+        out.write<uint8_t>(state.running);
+        out.write<uint8_t>(state.finished);
+        out.write<double>(elapsed());
+        out.writeVector(state.initialState);
+        out.writeVector(state.iterationPerRestarts);
+
+        out.write<double>(state.bestH);
+        out.writeVector(state.bestInitialState);
+        out.writeVector(state.bestState);
+        out.writeVector(state.bestHValues);
+        out.write<uint64_t>(state.bestSwitches.size());
+        out.writeSwitches(state.bestSwitches);
+
+        out.write<uint64_t>(savedSwitches);
+        out.write<uint64_t>(savedH);
+        out.write<uint64_t>(savedBoltzmanns);
+        for (const Series* series : {&state.switchSeries, &state.hSeries, &state.boltzmannSeries, &state.bestHSeries}) {
+            out.write<int64_t>(series->total);
+            out.write<int64_t>(series->stride);
+            out.write<int64_t>(series->offset);
+        }
+        out.write<int64_t>(state.bestStep);
+        out.writeVector(state.tabuUntil);
+        out.writeVector(state.lateHValues);
+
+        const TranspositionCache& cache = state.cache;
+        out.writeVector(cache.keys);
+        out.writeVector(cache.values);
+        out.writeVector(cache.referenced);
+        out.write<uint64_t>(cache.hand);
+        for (long long counter : {cache.lookups, cache.hits, cache.evictions, cache.cycles, cache.revisits, cache.skips})
+            out.write<int64_t>(counter);
+        out.out.flush();
+        if (!out.out)
+            throw std::runtime_error("Failed to write checkpoint " + temporary.string());
+    }
+    std::filesystem::rename(temporary, snapshot);
+}
+
+Cube Checkpointer::load(const std::string& checkpointDirectory, SearchState& state) {
+    directory = checkpointDirectory;
+    auto path = [&](const char* name) { return (std::filesystem::path(directory) / name).string(); };
+
+    BinaryReader in(path("state.bin"));
+    char magic[8];
+    in.in.read(magic, 8);
+    if (std::string(magic, 8) != "CUBECKPT" || in.read<uint32_t>() != CHECKPOINT_VERSION)
+        throw std::runtime_error("Not a cube checkpoint: " + directory);
+    state.algorithm = in.readString();
+
+    auto optionCount = in.read<uint64_t>();
+    for (uint64_t i = 0; i < optionCount; ++i) {
+        std::string key = in.readString();
+        if (in.read<uint8_t>() == 0)
+            state.options[key] = static_cast<int>(in.read<int32_t>());
+        else
+            state.options[key] = in.readString();
+    }
+
+    Cube cube(in.read<int32_t>());
+    cube.load(in.readVector<int>());
+    std::istringstream rng(in.readString());
+    rng >> cube.rng;
+
+    state.iteration = in.read<int64_t>();
+    state.step = in.read<int64_t>();
+    state.streak = in.read<int32_t>();
+    state.stucks = in.read<int32_t>();
+    state.restart = in.read<int32_t>();
+    state.historyGeneration = savedGeneration = in.read<int32_t>();
+    state.running = in.read<uint8_t>();
+    state.finished = in.read<uint8_t>();
+    previousElapsed = in.read<double>();
+    state.initialState = in.readVector<int>();
+    state.iterationPerRestarts = in.readVector<int>();
+
+    state.bestH = in.read<double>();
+    state.bestInitialState = in.readVector<int>();
+    state.bestState = in.readVector<int>();
+    state.bestHValues = in.readVector<double>();
+    state.bestSwitches = in.readSwitches(in.read<uint64_t>());
+
+    savedSwitches = in.read<uint64_t>();
+    savedH = in.read<uint64_t>();
+    savedBoltzmanns = in.read<uint64_t>();
+    for (Series* series : {&state.switchSeries, &state.hSeries, &state.boltzmannSeries, &state.bestHSeries}) {
+        series->total = in.read<int64_t>();
+        series->stride = in.read<int64_t>();
+        series->offset = in.read<int64_t>();
+    }
+    state.bestStep = in.read<int64_t>();
+    state.tabuUntil = in.readVector<int64_t>();
+    state.lateHValues = in.readVector<double>();
+
+    TranspositionCache& cache = state.cache;
+    cache.keys = in.readVector<uint64_t>();
+    cache.values = in.readVector<double>();
+    cache.referenced = in.readVector<uint8_t>();
+    cache.hand = in.read<uint64_t>();
+    for (long long* counter : {&cache.lookups, &cache.hits, &cache.evictions, &cache.cycles, &cache.revisits, &cache.skips})
+        *counter = in.read<int64_t>();
+    cache.rebuild();
+
+    // Entri log setelah snapshot terakhir (misalnya crash saat append) dibuang
+    state.switches = BinaryReader(path("switches.bin")).readSwitches(savedSwitches);
+    state.hValues = BinaryReader(path("h_values.bin")).readRaw<double>(savedH);
+    state.boltzmanns = BinaryReader(path("boltzmanns.bin")).readRaw<double>(savedBoltzmanns);
+    std::filesystem::resize_file(path("switches.bin"), savedSwitches * 6 * sizeof(int32_t));
+    std::filesystem::resize_file(path("h_values.bin"), savedH * sizeof(double));
+    std::filesystem::resize_file(path("boltzmanns.bin"), savedBoltzmanns * sizeof(double));
+
+    configure(state.options);
+    return cube;
+}
+
+// Parallel tempering (replica exchange): satu replika kubus per slot temperatur, tiap ronde semua replika
+// menjalankan exchange_interval langkah Metropolis secara paralel, lalu replika di slot bertetangga ditukar
+// dengan peluang min(1, exp((H_j - H_i)(1/T_i - 1/T_j))).
+// schedule: geometric = tangga tetap t_min..t_max, adaptive = jarak tangga disesuaikan ke swap rate target,
+// annealing = tangga dikalikan jadwal simulated annealing (400 k^-0.5 - 8), berhenti saat temperaturnya habis.
+struct ParallelTempering {
+    struct Replica {
+        Cube cube;
+        double bestH = -INFINITY;
+        std::vector<int> bestState;
+        // Profiler per replika supaya thread tidak berbagi counter, digabung di akhir run
+        Profiler profiler;
+    };
+
+    int replicas = 8;
+    int threads = 1;
+    double tMin = 0.05;
+    double tMax = 5;
+    std::string schedule = "geometric";
+    int exchangeInterval = 1000;
+    long long maxSteps = 100000;
+    double targetSwapRate = 0.23;
+
+    std::vector<Replica> slots;
+    std::vector<double> ladder;
+    std::vector<long long> accepted, attempted, swapsAccepted, swapsAttempted;
+    // Jendela swap rate untuk schedule adaptive, direset tiap penyesuaian
+    std::vector<long long> windowAccepted, windowAttempted;
+
+    void configure(const Options& options) {
+        unsigned cores = std::max(1u, std::thread::hardware_concurrency());
+        replicas = options.find("replicas") != options.end() ? std::any_cast<int>(options.at("replicas")) : static_cast<int>(std::max(4u, cores));
+        threads = options.find("threads") != options.end() ? std::any_cast<int>(options.at("threads")) : static_cast<int>(cores);
+        threads = std::max(1, std::min(threads, replicas));
+        if (options.find("t_min") != options.end())
+            tMin = optionDouble(options, "t_min");
+        if (options.find("t_max") != options.end())
+            tMax = optionDouble(options, "t_max");
+        if (options.find("schedule") != options.end())
+            schedule = optionString(options, "schedule");
+        if (options.find("exchange_interval") != options.end())
+            exchangeInterval = std::max(1, std::any_cast<int>(options.at("exchange_interval")));
+        if (options.find("max_steps") != options.end())
+            maxSteps = std::any_cast<int>(options.at("max_steps"));
+        if (options.find("checkpoint") != options.end())
+            throw std::invalid_argument("parallel tempering does not support checkpoints");
+        if (replicas < 2 || tMin <= 0 || tMax < tMin)
+            throw std::invalid_argument("parallel tempering needs replicas >= 2 and 0 < t_min <= t_max");
+        if (schedule != "geometric" && schedule != "adaptive" && schedule != "annealing")
+            throw std::invalid_argument("Unknown schedule: " + schedule);
+    }
+
+    // Faktor jadwal annealing pada langkah ke-step, <= 0 berarti run selesai
+    double annealingFactor(long long step, const Cube& cube) const {
+        return schedule == "annealing" ? cube.getTemperature(std::max(1LL, step)) : 1.0;
+    }
+
+    void run(Cube& cube, SearchState& state, RunContext& context) {
+        ladder.resize(replicas);
+        for (int i = 0; i < replicas; ++i)
+            ladder[i] = tMin * std::pow(tMax / tMin, static_cast<double>(i) / (replicas - 1));
+        accepted.assign(replicas, 0);
+        attempted.assign(replicas, 0);
+        swapsAccepted.assign(replicas - 1, 0);
+        swapsAttempted.assign(replicas - 1, 0);
+        windowAccepted.assign(replicas - 1, 0);
+        windowAttempted.assign(replicas - 1, 0);
+
+        // Tiap replika punya RNG sendiri yang di-seed dari RNG utama, hasil tidak bergantung pada jumlah thread
+        for (int i = 0; i < replicas; ++i) {
+            Replica replica{Cube(cube.dimension)};
+            replica.cube.neighborhood = cube.neighborhood;
+            replica.cube.setObjective(cube.objective);
+            replica.cube.initializer = cube.initializer;
+            std::seed_seq sequence{cube.rng(), cube.rng()};
+            replica.cube.rng.seed(sequence);
+            replica.cube.initialize();
+            replica.bestH = replica.cube.getH();
+            replica.bestState = replica.cube.flatten();
+            slots.push_back(std::move(replica));
+        }
+        if (cube.profiler)
+            for (auto& replica : slots)
+                replica.cube.profiler = &replica.profiler;
+        state.initialState = slots.front().cube.flatten();
+        state.resetHistory();
+
+        long long steps = 0;
+        int parity = 0;
+        double bestH = -INFINITY;
+        while (!state.stopReason && steps < maxSteps) {
+            double factor = annealingFactor(steps + exchangeInterval, cube);
+            if (factor <= 0)
+                break;
+            if (cube.profiler)
+                cube.profiler->enter(Profiler::BOOKKEEPING);
+            runRound(factor);
+            if (cube.profiler)
+                cube.profiler->skip();
+            steps += exchangeInterval;
+            exchange(parity, factor, cube);
+            parity ^= 1;
+            if (schedule == "adaptive")
+                adapt();
+
+            const Replica* best = &slots.front();
+            for (const auto& replica : slots)
+                if (replica.bestH > best->bestH)
+                    best = &replica;
+            if (best->bestH > bestH) {
+                bestH = best->bestH;
+                cube.load(best->bestState);
+            }
+
+            state.step = steps;
+            state.iteration = steps;
+            state.recordH(bestH);
+            state.temperatures = currentTemperatures(factor);
+            recordRates(state);
+            context.tick(cube, state);
+            if (bestH == cube.lineCount())
+                break;
+        }
+
+        state.temperatures = currentTemperatures(annealingFactor(steps, cube));
+        recordRates(state);
+        // Replika tidak mencatat switches: initial_state = state terbaik yang dikembalikan, jadi replay trajectory berakhir di final_state
+        state.initialState = cube.flatten();
+        if (cube.profiler)
+            for (const auto& replica : slots)
+                cube.profiler->merge(replica.profiler);
+    }
+
+    void recordRates(SearchState& state) const {
+        state.acceptanceRates.clear();
+        for (int i = 0; i < replicas; ++i)
+            state.acceptanceRates.push_back(attempted[i] ? static_cast<double>(accepted[i]) / attempted[i] : 0.0);
+        state.swapRates.clear();
+        for (int i = 0; i + 1 < replicas; ++i)
+            state.swapRates.push_back(swapsAttempted[i] ? static_cast<double>(swapsAccepted[i]) / swapsAttempted[i] : 0.0);
+    }
+
+    std::vector<double> currentTemperatures(double factor) const {
+        std::vector<double> temperatures(ladder);
+        for (double& temperature : temperatures)
+            temperature *= factor;
+        return temperatures;
+    }
+
+    void runRound(double factor) {
+        auto work = [&](int first) {
+            for (int i = first; i < replicas; i += threads) {
+                Replica& replica = slots[i];
+                if (replica.cube.profiler)
+                    replica.profiler.skip();
+                double temperature = ladder[i] * factor;
+                for (int step = 0; step < exchangeInterval; ++step) {
+                    if (replica.cube.metropolisStep(temperature)) {
+                        accepted[i]++;
+                        if (replica.cube.getH() > replica.bestH) {
+                            replica.bestH = replica.cube.getH();
+                            replica.bestState = replica.cube.flatten();
+                        }
+                    }
+                }
+                attempted[i] += exchangeInterval;
+                if (replica.cube.profiler)
+                    replica.profiler.enter(replica.profiler.current);
+            }
+        };
+
+        std::vector<std::thread> workers;
+        for (int first = 1; first < threads; ++first)
+            workers.emplace_back(work, first);
+        work(0);
+        for (auto& worker : workers)
+            worker.join();
+    }
+
+    // Pasangan (i, i+1) dengan i genap dan ganjil bergantian tiap ronde
+    void exchange(int parity, double factor, Cube& cube) {
+        for (int i = parity; i + 1 < replicas; i += 2) {
+            double hI = slots[i].cube.getH();
+            double hJ = slots[i + 1].cube.getH();
+            double exponent = (hJ - hI) * (1 / (ladder[i] * factor) - 1 / (ladder[i + 1] * factor));
+            swapsAttempted[i]++;
+            windowAttempted[i]++;
+            if (exponent >= 0 || cube.randomUnit() <= std::exp(exponent)) {
+                std::swap(slots[i].cube, slots[i + 1].cube);
+                std::swap(slots[i].bestH, slots[i + 1].bestH);
+                std::swap(slots[i].bestState, slots[i + 1].bestState);
+                // Profiler milik slot, bukan kubus: pointer yang ikut tertukar dikembalikan ke slot masing-masing
+                if (cube.profiler) {
+                    slots[i].cube.profiler = &slots[i].profiler;
+                    slots[i + 1].cube.profiler = &slots[i + 1].profiler;
                 }
+                swapsAccepted[i]++;
+                windowAccepted[i]++;
             }
         }
     }
+
+    // Jarak log-temperatur diperlebar pada pasangan dengan swap rate di atas target dan dipersempit jika di bawah,
+    // ujung tangga tetap t_min dan t_max
+    void adapt() {
+        // t_min == t_max: semua replika bersuhu sama, tidak ada jarak yang bisa disesuaikan
+        if (tMax <= tMin)
+            return;
+        for (long long attempts : windowAttempted)
+            if (attempts < 10)
+                return;
+
+        std::vector<double> gaps(replicas - 1);
+        double total = 0;
+        for (int i = 0; i + 1 < replicas; ++i) {
+            double rate = static_cast<double>(windowAccepted[i]) / windowAttempted[i];
+            gaps[i] = std::log(ladder[i + 1] / ladder[i]) * std::clamp(1 + (rate - targetSwapRate), 0.5, 1.5);
+            total += gaps[i];
+        }
+        double span = std::log(tMax / tMin);
+        for (int i = 0; i + 1 < replicas; ++i)
+            ladder[i + 1] = ladder[i] * std::exp(gaps[i] * span / total);
+        windowAccepted.assign(replicas - 1, 0);
+        windowAttempted.assign(replicas - 1, 0);
+    }
 };
 
-std::unordered_map<std::string, std::any> runAlgorithm(const std::string& algorithm, const std::unordered_map<std::string, std::any>& argv = {}) {
-    Cube cube(5);
+void Monitor::configure(const Options& options) {
+    if (options.find("progress_interval") != options.end())
+        interval = std::max(1, std::any_cast<int>(options.at("progress_interval")));
+    if (options.find("target_h") != options.end())
+        targetH = optionDouble(options, "target_h");
+    if (options.find("time_budget") != options.end())
+        timeBudget = optionDouble(options, "time_budget");
+    if (options.find("stall") != options.end())
+        stall = std::any_cast<int>(options.at("stall"));
+}
+
+void Monitor::observe(const Cube& cube, SearchState& state, const Checkpointer& checkpointer) {
+    double currentH = cube.getH();
+    if (currentH > bestH) {
+        bestH = currentH;
+        bestIteration = state.iteration;
+    }
+
+    if (bestH >= targetH)
+        state.stopReason = STOP_TARGET;
+    else if (stall > 0 && state.iteration - bestIteration >= stall)
+        state.stopReason = STOP_STALL;
+    else if (timeBudget < INFINITY && ++ticks >= clockStride) {
+        double now = checkpointer.elapsed();
+        double perTick = (now - lastClock) / ticks;
+        clockStride = perTick > 0 ? std::clamp(static_cast<long long>(1e-3 / perTick), 1LL, 64LL) : 64;
+        lastClock = now;
+        ticks = 0;
+        if (now >= timeBudget)
+            state.stopReason = STOP_TIME;
+    }
+
+    // Iterasi bisa melompat (parallel tempering maju per ronde), laporan dikirim setelah minimal interval iterasi
+    if (callback && (state.iteration - reportedIteration >= interval || state.stopReason))
+        report(cube, state, checkpointer, currentH);
+}
+
+void Monitor::report(const Cube& cube, SearchState& state, const Checkpointer& checkpointer, double currentH) {
+    // Random restart mengosongkan switches di awal tiap restart
+    size_t accepted = state.switchSeries.total;
+    if (accepted < reportedSwitches)
+        reportedSwitches = 0;
+    long long iterations = state.iteration - reportedIteration;
+    double acceptance = iterations > 0 ? static_cast<double>(accepted - reportedSwitches) / iterations : NAN;
+    // Parallel tempering tidak mencatat switches, dipakai acceptance kumulatif replika terdingin
+    if (state.algorithm == "parallel tempering")
+        acceptance = state.acceptanceRates.front();
+    double temperature = NAN;
+    if (state.algorithm == "simulated annealing")
+        temperature = cube.getTemperature(state.step);
+    else if (state.algorithm == "parallel tempering")
+        temperature = state.temperatures.front();
+
+    double record[] = {static_cast<double>(state.iteration), currentH, bestH, acceptance, temperature,
+                       static_cast<double>(state.restart), checkpointer.elapsed()};
+    reportedIteration = state.iteration;
+    reportedSwitches = accepted;
+
+    if (callback(record, sizeof(record) / sizeof(record[0])) != 0 && !state.stopReason)
+        state.stopReason = STOP_CALLBACK;
+}
+
+std::unordered_map<std::string, std::any> buildResult(const SearchState& state, int dimension) {
     std::unordered_map<std::string, std::any> result;
-    
+    result["initial_state"] = Cube::unflatten(state.initialState, dimension);
+    result["switches"] = state.switches;
+    result["h_values"] = state.hValues;
+    result["history_stride"] = static_cast<int>(state.hSeries.stride);
+    result["history_offset"] = static_cast<int>(state.hSeries.offset);
+
+    if (state.algorithm == "random restart") {
+        result["iteration_per_restarts"] = state.iterationPerRestarts;
+        result["restart_counts"] = state.restart;
+    }
+    if (state.algorithm == "simulated annealing") {
+        result["boltzmanns"] = state.boltzmanns;
+        result["stucks"] = state.stucks;
+    }
+    if (state.algorithm == "parallel tempering") {
+        result["temperatures"] = state.temperatures;
+        result["acceptance_rates"] = state.acceptanceRates;
+        result["swap_rates"] = state.swapRates;
+    }
+    if (state.cache.enabled()) {
+        const TranspositionCache& cache = state.cache;
+        result["cache_lookups"] = static_cast<int>(cache.lookups);
+        result["cache_hits"] = static_cast<int>(cache.hits);
+        result["cache_hit_rate"] = cache.lookups ? static_cast<double>(cache.hits) / cache.lookups : 0.0;
+        result["cache_entries"] = static_cast<int>(cache.keys.size());
+        result["cache_evictions"] = static_cast<int>(cache.evictions);
+        result["cache_bytes"] = static_cast<int>(cache.bytes());
+        result["cycles_avoided"] = static_cast<int>(cache.cycles);
+        result["basin_revisits"] = static_cast<int>(cache.revisits);
+        result["evaluations_skipped"] = static_cast<int>(cache.skips);
+    }
+    return result;
+}
+
+std::unordered_map<std::string, std::any> runAlgorithm(const std::string& algorithmName, const Options& argv = {}, ProgressCallback callback = nullptr) {
+    SearchState state;
+    RunContext context;
+    Checkpointer& checkpointer = context.checkpointer;
+    Cube cube(argv.find("dimension") != argv.end() ? std::any_cast<int>(argv.at("dimension")) : 5);
+
+    if (argv.find("resume") != argv.end()) {
+        cube = checkpointer.load(optionString(argv, "resume"), state);
+    } else {
+        state.algorithm = algorithmName;
+        state.options = argv;
+        checkpointer.configure(argv);
+        if (argv.find("seed") != argv.end())
+            seedRng(cube.rng, optionString(argv, "seed"));
+    }
+
+    const std::string& algorithm = state.algorithm;
+    const Options& options = state.options;
+    cube.neighborhood = Neighborhood::fromOptions(options);
+    cube.setObjective(Objective::fromOptions(options));
+    cube.initializer = Initializer::fromOptions(options);
+    state.cache.configure(options);
+    if (state.cache.enabled()) {
+        cube.enableHashing(state.cache.symmetric);
+        cube.cache = &state.cache;
+    }
+    context.profiling = options.find("profile") != options.end() && std::any_cast<int>(options.at("profile")) != 0;
+    cube.profiler = context.activeProfiler();
+    long long startIteration = state.iteration;
+    context.monitor.configure(options);
+    state.history = HistoryPolicy::fromOptions(options);
+    context.monitor.callback = callback;
     auto start_time = std::chrono::high_resolution_clock::now();
+    checkpointer.startTime = start_time;
 
-    if (algorithm == "steepest ascent") {
-        result = cube.steepestAscentHillClimb();
+    if (state.finished) {
+        // Checkpoint dari run yang sudah selesai, cukup kembalikan hasilnya
+    } else if (algorithm == "steepest ascent") {
+        cube.steepestAscentHillClimb(state, context);
     } else if (algorithm == "sideways ascent") {
-        if (argv.find("limit") != argv.end()) {
-            int limit = std::any_cast<int>(argv.at("limit"));
-            result = cube.sidewayAscentHillClimb(limit);
+        if (options.find("limit") != options.end()) {
+            int limit = std::any_cast<int>(options.at("limit"));
+            cube.sidewayAscentHillClimb(state, context, limit);
+        } else if (options.find("max_limit") != options.end()) {
+            int limit = std::any_cast<int>(options.at("max_limit"));
+            cube.sidewayAscentHillClimb(state, context, limit);
         } else {
-            result = cube.sidewayAscentHillClimb();
+            cube.sidewayAscentHillClimb(state, context);
         }
     } else if (algorithm == "random restart") {
-        if (argv.find("max_restart") != argv.end()) {
-            int max_restart = std::any_cast<int>(argv.at("max_restart"));
-            result = cube.randomRestartHillClimb(max_restart);
+        if (options.find("max_restart") != options.end()) {
+            int max_restart = std::any_cast<int>(options.at("max_restart"));
+            cube.randomRestartHillClimb(state, context, max_restart);
         } else {
-            result = cube.randomRestartHillClimb();
+            cube.randomRestartHillClimb(state, context);
         }
     } else if (algorithm == "stochastic") {
-        result = cube.stochasticHillClimb();
+        cube.stochasticHillClimb(state, context);
     } else if (algorithm == "simulated annealing") {
-        result = cube.simulatedAnnealing();
+        cube.simulatedAnnealing(state, context);
+    } else if (algorithm == "tabu search") {
+        long long maxIteration = options.find("max_iteration") != options.end() ? std::any_cast<int>(options.at("max_iteration")) : 2000;
+        int tenure = options.find("tenure") != options.end() ? std::any_cast<int>(options.at("tenure")) : std::max(5, static_cast<int>(cube.cells.size()) / 10);
+        cube.tabuSearch(state, context, maxIteration, tenure);
+    } else if (algorithm == "late acceptance") {
+        long long maxIteration = options.find("max_iteration") != options.end() ? std::any_cast<int>(options.at("max_iteration")) : 1000000;
+        int length = options.find("lahc_length") != options.end() ? std::max(1, std::any_cast<int>(options.at("lahc_length"))) : 1000;
+        cube.lateAcceptanceHillClimb(state, context, maxIteration, length);
+    } else if (algorithm == "parallel tempering") {
+        ParallelTempering tempering;
+        tempering.configure(options);
+        tempering.run(cube, state, context);
+    } else {
+        throw std::invalid_argument("Unknown algorithm: " + algorithm);
     }
 
-    auto end_time = std::chrono::high_resolution_clock::now();
-    std::chrono::duration<double> duration = end_time - start_time;
+    state.finished = true;
+    state.trimHistory();
+    if (checkpointer.enabled()) {
+        ProfileScope scope(context.activeProfiler(), Profiler::CHECKPOINT);
+        checkpointer.save(cube, state);
+    }
 
-    result["duration"] = duration.count();
+    std::unordered_map<std::string, std::any> result = buildResult(state, cube.dimension);
+    result["duration"] = checkpointer.elapsed();
     result["final H"] = cube.getH();
     result["control H"] = cube.controlH();
-    result["final_state"] = cube.cube;
+    result["final_state"] = cube.nested();
+    result["stop_reason"] = state.stopReason;
+    if (context.profiling) {
+        Profiler& profiler = context.profiler;
+        profiler.counters[Profiler::RESTARTS] = state.restart;
+        profiler.finish(state.iteration - startIteration);
+        result["profile_counters"] = std::vector<double>(profiler.counters, profiler.counters + Profiler::COUNTER_COUNT);
+        result["profile_times"] = std::vector<double>(profiler.times, profiler.times + Profiler::PHASE_COUNT);
+    }
 
     return result;
 }
@@ -555,13 +2155,144 @@ void printResult(const std::unordered_map<std::string, std::any>& result) {
     if (result.find("stucks") != result.end()) {
         jsonResult["stucks"] = std::any_cast<int>(result.at("stucks"));
     }
+    for (const char* key : {"temperatures", "acceptance_rates", "swap_rates", "profile_counters", "profile_times"}) {
+        if (result.find(key) != result.end())
+            jsonResult[key] = std::any_cast<std::vector<double>>(result.at(key));
+    }
+    jsonResult["stop_reason"] = std::any_cast<int>(result.at("stop_reason"));
+    jsonResult["history_stride"] = std::any_cast<int>(result.at("history_stride"));
+    jsonResult["history_offset"] = std::any_cast<int>(result.at("history_offset"));
+    if (result.find("cache_hit_rate") != result.end()) {
+        jsonResult["cache_hit_rate"] = std::any_cast<double>(result.at("cache_hit_rate"));
+        for (const char* key : {"cache_lookups", "cache_hits", "cache_entries", "cache_evictions", "cache_bytes", "cycles_avoided", "basin_revisits",
+                                "evaluations_skipped"})
+            jsonResult[key] = std::any_cast<int>(result.at(key));
+    }
 
     std::cout << jsonResult.dump(4) << std::endl;
 }
 
 
-double Cube::stdfactor = 0.5;
 
+void setOption(std::unordered_map<std::string, std::any>& options, const std::string& key, const std::string& value) {
+    try {
+        size_t parsed;
+        int intValue = std::stoi(value, &parsed);
+        if (parsed == value.size()) {
+            options[key] = intValue;
+            return;
+        }
+    } catch (std::logic_error&) {
+    }
+    // Bukan bilangan bulat atau di luar jangkauan int (misalnya seed 64-bit atau "0.5"), simpan sebagai string
+    options[key] = value;
+}
+
+// Hasil yang sudah di-flatten supaya bisa disalin langsung ke buffer NumPy lewat ctypes
+struct NativeResult {
+    std::unordered_map<std::string, std::vector<int>> ints;
+    std::unordered_map<std::string, std::vector<double>> doubles;
+    std::string error;
+};
+
+std::vector<int> flattenCube(const std::vector<std::vector<std::vector<int>>>& cube) {
+    std::vector<int> flat;
+    for (const auto& plane : cube)
+        for (const auto& row : plane)
+            flat.insert(flat.end(), row.begin(), row.end());
+    return flat;
+}
+
+NativeResult* packResult(const std::unordered_map<std::string, std::any>& result) {
+    auto* packed = new NativeResult();
+
+    for (const char* key : {"initial_state", "final_state"}) {
+        if (result.find(key) != result.end())
+            packed->ints[key] = flattenCube(std::any_cast<std::vector<std::vector<std::vector<int>>>>(result.at(key)));
+    }
+
+    if (result.find("switches") != result.end()) {
+        auto& flat = packed->ints["switches"];
+        for (const auto& [coord1, coord2] : std::any_cast<std::vector<std::pair<std::tuple<int, int, int>, std::tuple<int, int, int>>>>(result.at("switches"))) {
+            flat.insert(flat.end(), {std::get<0>(coord1), std::get<1>(coord1), std::get<2>(coord1),
+                                     std::get<0>(coord2), std::get<1>(coord2), std::get<2>(coord2)});
+        }
+    }
+
+    for (const char* key : {"h_values", "boltzmanns", "temperatures", "acceptance_rates", "swap_rates", "profile_counters", "profile_times"}) {
+        if (result.find(key) != result.end())
+            packed->doubles[key] = std::any_cast<std::vector<double>>(result.at(key));
+    }
+    if (result.find("iteration_per_restarts") != result.end())
+        packed->ints["iteration_per_restarts"] = std::any_cast<std::vector<int>>(result.at("iteration_per_restarts"));
+
+    for (const char* key : {"final H", "control H", "duration", "cache_hit_rate"}) {
+        if (result.find(key) != result.end())
+            packed->doubles[key] = {std::any_cast<double>(result.at(key))};
+    }
+    for (const char* key : {"restart_counts", "stucks", "stop_reason", "history_stride", "history_offset", "cache_lookups", "cache_hits",
+                            "cache_entries", "cache_evictions", "cache_bytes", "cycles_avoided", "basin_revisits", "evaluations_skipped"}) {
+        if (result.find(key) != result.end())
+            packed->ints[key] = {std::any_cast<int>(result.at(key))};
+    }
+
+    return packed;
+}
+
+extern "C" {
+
+NativeResult* cube_run_progress(const char* algorithm, int count, const char** keys, const char** values, ProgressCallback callback) {
+    std::unordered_map<std::string, std::any> options;
+    for (int i = 0; i < count; ++i)
+        setOption(options, keys[i], values[i]);
+
+    try {
+        return packResult(runAlgorithm(algorithm, options, callback));
+    } catch (std::exception& e) {
+        auto* packed = new NativeResult();
+        packed->error = e.what();
+        return packed;
+    }
+}
+
+NativeResult* cube_run(const char* algorithm, int count, const char** keys, const char** values) {
+    return cube_run_progress(algorithm, count, keys, values, nullptr);
+}
+
+const char* cube_result_error(NativeResult* result) {
+    return result->error.c_str();
+}
+
+// -1 jika field tidak ada, selain itu jumlah elemen
+long cube_result_size(NativeResult* result, const char* key) {
+    if (result->ints.find(key) != result->ints.end())
+        return result->ints[key].size();
+    if (result->doubles.find(key) != result->doubles.end())
+        return result->doubles[key].size();
+    return -1;
+}
+
+int cube_result_is_double(NativeResult* result, const char* key) {
+    return result->doubles.find(key) != result->doubles.end();
+}
+
+void cube_result_copy_ints(NativeResult* result, const char* key, int* out) {
+    const auto& values = result->ints[key];
+    std::copy(values.begin(), values.end(), out);
+}
+
+void cube_result_copy_doubles(NativeResult* result, const char* key, double* out) {
+    const auto& values = result->doubles[key];
+    std::copy(values.begin(), values.end(), out);
+}
+
+void cube_result_free(NativeResult* result) {
+    delete result;
+}
+
+}
+
+#ifndef CUBE_LIBRARY
 int main(int argc, char* argv[]) {
     if (argc < 2) {
         std::cerr << "Usage: " << "cube" << " \"ALGORITHM_NAME\"" << std::endl;
@@ -574,15 +2305,7 @@ int main(int argc, char* argv[]) {
         std::string key = argv[i];
 
         if (key.rfind("--", 0) == 0 && i + 1 < argc) {
-            key = key.substr(2); 
-            std::string value = argv[i + 1];
-
-            try {
-                int intValue = std::stoi(value);
-                options[key] = intValue;
-            } catch (std::invalid_argument&) {
-                options[key] = value;
-            }
+            setOption(options, key.substr(2), argv[i + 1]);
         } else {
             std::cerr << "Invalid argument format: " << argv[i] << std::endl;
             return 1;
@@ -590,9 +2313,14 @@ int main(int argc, char* argv[]) {
     }
 
     std::string algorithm = argv[1];
-    std::unordered_map<std::string, std::any> result = runAlgorithm(algorithm, options);
-
-    printResult(result);
+    try {
+        std::unordered_map<std::string, std::any> result = runAlgorithm(algorithm, options);
+        printResult(result);
+    } catch (std::exception& e) {
+        std::cerr << e.what() << std::endl;
+        return 1;
+    }
 
     return 0;
-}
\ No newline at end of file
+}
+#endif
\ No newline at end of file
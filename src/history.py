@@ -0,0 +1,86 @@
+import numpy as np
+
+DETAIL_LEVELS = ["full", "downsample", "summary"]
+
+class HistoryPolicy:
+  # Detail riwayat pada hasil, sama dengan engine native:
+  # full = semua langkah, downsample = tiap stride langkah (stride berlipat, maksimal 2 * points nilai),
+  # summary = tanpa riwayat, ring = N > 0 menyimpan N langkah terakhir saja
+
+  def __init__(self, detail = "full", points = 1000, ring = 0):
+    if detail not in DETAIL_LEVELS :
+      raise ValueError(f"Unknown detail level: {detail}")
+    self.detail = detail
+    self.points = max(1, points)
+    self.ring = max(0, ring)
+
+  def fromOptions(argv):
+    return HistoryPolicy(argv.get("detail") or "full", argv.get("history_points") or 1000, argv.get("history") or 0)
+
+  def bounded(self):
+    return self.detail != "full" or self.ring > 0
+
+class History:
+  # Deret riwayat per langkah (nilai skalar atau array berbentuk shape) dengan memori sesuai HistoryPolicy.
+  # sampled = False berarti deret ini tidak disimpan pada mode downsample (misalnya kubus per generasi).
+
+  def __init__(self, policy, shape = (), dtype = np.float64, capacity = 0, sampled = True):
+    self.policy = policy
+    self.enabled = policy.detail != "summary" and (sampled or policy.ring > 0 or policy.detail == "full")
+    if not self.enabled :
+      size = 0
+    elif policy.ring :
+      size = policy.ring
+    elif policy.detail == "downsample" :
+      size = 2 * policy.points
+    else :
+      size = capacity
+    self.buffer = np.zeros((size,) + tuple(shape), dtype=dtype)
+    self.count = 0
+    self.total = 0
+    self.stride = 1
+
+  @property
+  def offset(self):
+    # Jumlah langkah terdepan yang sudah dibuang ring buffer
+    return self.total - self.count if self.policy.ring else 0
+
+  def append(self, value):
+    if not self.enabled :
+      pass
+    elif self.policy.ring :
+      self.buffer[self.total % self.policy.ring] = value
+      self.count = min(self.count + 1, self.policy.ring)
+    elif self.policy.detail == "downsample" :
+      if self.total % self.stride == 0 :
+        self.buffer[self.count] = value
+        self.count += 1
+      if self.count == len(self.buffer) :
+        self.buffer[:self.policy.points] = self.buffer[::2]
+        self.count = self.policy.points
+        self.stride *= 2
+    else :
+      if self.count == len(self.buffer) :
+        self.buffer = np.concatenate([self.buffer, np.zeros_like(self.buffer[:max(self.count, 16)])])
+      self.buffer[self.count] = value
+      self.count += 1
+    self.total += 1
+
+  def values(self):
+    # Urut dari langkah terlama ke terbaru
+    if self.policy.ring and self.total > self.policy.ring :
+      return np.roll(self.buffer, -(self.total % self.policy.ring), axis=0)
+    return self.buffer[:self.count]
+
+  def state(self):
+    return {"count": self.count, "total": self.total, "stride": self.stride}
+
+  def restore(self, values, state):
+    # Dari checkpoint: values sudah terurut (hasil values()), ring buffer ditata ulang ke posisi aslinya
+    self.count, self.total, self.stride = state["count"], state["total"], state["stride"]
+    if self.policy.ring and self.total > self.policy.ring :
+      self.buffer[:] = np.roll(values, self.total % self.policy.ring, axis=0)
+    elif self.count > len(self.buffer) :
+      self.buffer = np.array(values, dtype=self.buffer.dtype)
+    else :
+      self.buffer[:self.count] = values
@@ -0,0 +1,116 @@
+import math
+import numpy as np
+from algorithm import Cube
+
+# Registry strategi state awal. Setiap initializer(dimension, rng) mengembalikan permutasi flat 1..n^3
+# dengan indeks (z * n + y) * n + x; rng = numpy Generator. Nama dan strateginya sama dengan opsi initializer
+# di engine native:
+# random = permutasi acak (default), algebraic = konstruksi linear digit Latin (LSD) yang diacak dengan simetri
+# kubus dan permutasi digit, greedy = setiap nilai ditempatkan di sel yang paling menyeimbangkan jumlah garisnya.
+
+INITIALIZERS = {}
+
+def register(name, build):
+  INITIALIZERS[name] = build
+  return build
+
+def get(initializer):
+  if callable(initializer) :
+    return initializer
+  if initializer not in INITIALIZERS :
+    raise ValueError(f"Unknown initializer: {initializer}")
+  return INITIALIZERS[initializer]
+
+def population(initializer, count, dimension, rng):
+  # count state sekaligus (count x n^3); random memakai argsort yang sama dengan GeneticCube sebelumnya
+  if initializer == "random" :
+    return np.argsort(rng.random((count, dimension**3)), axis=1) + 1
+  build = get(initializer)
+  return np.stack([build(dimension, rng) for _ in range(count)])
+
+def randomPermutation(dimension, rng):
+  return rng.permutation(dimension**3) + 1
+
+def _magicCounts(states, dimension):
+  target = dimension * (dimension**3 + 1) // 2
+  return (Cube.batchSums(states) == target).sum(axis=-1)
+
+def linearCube(matrix, offset, dimension):
+  # Digit ke-k sel (x, y, z) = (matrix[k] . (x, y, z) + offset[k]) mod n, nilai = 1 + sum digit_k * n^k.
+  # Matriks invertibel mod n memberi bijeksi; garis berarah v memuat semua digit jika matrix[k] . v unit mod n.
+  n = dimension
+  z, y, x = np.meshgrid(np.arange(n), np.arange(n), np.arange(n), indexing="ij")
+  coordinates = np.stack([x, y, z], axis=-1)
+  digits = (coordinates @ np.transpose(matrix, (0, 2, 1))[:, None, None] + offset[:, None, None, None, :]) % n
+  return digits @ (n ** np.arange(3)) + 1
+
+def algebraic(dimension, rng, tries = 64):
+  # Untuk n genap tidak ada matriks invertibel dengan semua entri unit mod n (baris, kolom dan pilar
+  # tidak bisa semuanya magic), jadi dipakai greedy
+  n = dimension
+  if n % 2 == 0 :
+    return greedy(n, rng)
+  units = np.array([k for k in range(1, n) if math.gcd(k, n) == 1])
+  matrices = rng.choice(units, (tries, 3, 3))
+  determinants = np.round(np.linalg.det(matrices)).astype(np.int64) % n
+  matrices = matrices[[math.gcd(int(value), n) == 1 for value in determinants]]
+  if len(matrices) == 0 :
+    return greedy(n, rng)
+
+  # Offset dipilih supaya sel pusat bernilai tengah; garis yang digitnya konstan (misalnya diagonal ruang
+  # dengan koefisien 0) tetap magic jika melewati pusat
+  middle = (n - 1) // 2
+  offset = (middle - matrices.sum(axis=2) * middle) % n
+  states = linearCube(matrices, offset, n)
+  state = states[np.argmax(_magicCounts(states, n))]
+
+  # Permutasi digit yang mempertahankan digit tengah: garis yang memuat semua digit atau digit tengah konstan tetap magic
+  digits = (state - 1) // (n ** np.arange(3))[:, None, None, None] % n
+  for k in range(3) :
+    others = np.delete(np.arange(n), middle)
+    mapping = np.insert(rng.permutation(others), middle, middle)
+    digits[k] = mapping[digits[k]]
+  state = np.tensordot(n ** np.arange(3), digits, axes=1) + 1
+
+  # Salah satu dari 48 simetri rotasi/refleksi kubus
+  state = state.transpose(rng.permutation(3))
+  for axis in range(3) :
+    if rng.random() < 0.5 :
+      state = np.flip(state, axis)
+  return np.ascontiguousarray(state).reshape(-1)
+
+def greedy(dimension, rng):
+  # Nilai terjauh dari rata-rata ditempatkan lebih dulu (urutan antar nilai setara acak). Setiap nilai masuk ke sel kosong
+  # yang paling mendekatkan simpangan garis-garisnya ke 0, simpangan = sisa target - jumlah sel kosong * rata-rata.
+  n = dimension
+  cells = n**3
+  lineIndex, cellLines = Cube.lineTable(n)
+  lineCount = len(lineIndex)
+  mean = (cells + 1) / 2
+  # Garis per sel, dipadding dengan garis semu lineCount; padding tidak ikut dihitung di biaya
+  width = max(len(lines) for lines in cellLines)
+  incidence = np.full((cells, width), lineCount)
+  for cell, lines in enumerate(cellLines) :
+    incidence[cell, :len(lines)] = sorted(lines)
+  real = incidence < lineCount
+  deviation = np.zeros(lineCount + 1)
+  free = np.ones(cells, dtype=bool)
+  flat = np.zeros(cells, dtype=np.int64)
+
+  values = np.arange(1, cells + 1)
+  for value in values[np.lexsort((rng.random(cells), -np.abs(values - mean)))] :
+    weight = value - mean
+    # Perubahan jumlah kuadrat simpangan jika value ditempatkan di tiap sel
+    cost = ((weight * weight - 2 * weight * deviation[incidence]) * real).sum(axis=1)
+    cost[~free] = np.inf
+    choices = np.flatnonzero(cost == cost.min())
+    cell = choices[rng.integers(len(choices))]
+    flat[cell] = value
+    free[cell] = False
+    deviation[incidence[cell]] -= weight
+    deviation[lineCount] = 0
+  return flat
+
+register("random", randomPermutation)
+register("algebraic", algebraic)
+register("greedy", greedy)
@@ -0,0 +1,191 @@
+import multiprocessing
+import os
+import signal
+import time
+import numpy as np
+from multiprocessing import shared_memory
+import initializer as initializers
+from algorithm import Cube, GeneticCube, spawn_seeds
+from history import History, HistoryPolicy
+from progress import record
+from profiling import NULL_PROFILER, Profiler
+
+# GA model pulau: K subpopulasi berevolusi paralel di proses worker, populasinya berada di shared memory
+# (K x popSize x n^3). Tiap migration_interval generasi individu terbaik tiap pulau menggantikan individu
+# terburuk di pulau tujuan sesuai topologi.
+
+TOPOLOGIES = ["ring", "complete", "random"]
+
+_shared = {}
+
+def _initWorker(populationName, statsName, shape, statsShape) :
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+  _shared["population"] = shared_memory.SharedMemory(name=populationName)
+  _shared["stats"] = shared_memory.SharedMemory(name=statsName)
+  _shared["shape"] = shape
+  _shared["statsShape"] = statsShape
+
+def _runEpoch(task) :
+  # Evolusi satu pulau untuk generasi [start, stop); max/avg fitness per generasi ditulis ke shared stats
+  island, start, stop, iterationCount, rngState, objective, profile = task
+  islands, popSize, cells = _shared["shape"]
+  population = np.ndarray(_shared["shape"], dtype=np.int64, buffer=_shared["population"].buf)
+  stats = np.ndarray(_shared["statsShape"], dtype=np.float64, buffer=_shared["stats"].buf)
+
+  agent = GeneticCube(round(cells ** (1/3)), popSize, objective=objective)
+  agent.rng.bit_generator.state = rngState
+  agent.population[:] = population[island]
+  agent.version += 1
+  if profile :
+    agent.profiler = Profiler()
+
+  for i in range(start, stop) :
+    fitnesses = agent.getFitnesses()
+    stats[island, i, 0] = fitnesses.max()
+    stats[island, i, 1] = fitnesses.mean()
+    if i == iterationCount :
+      break
+    agent.evolve(fitnesses)
+
+  population[island] = agent.population
+  return agent.rng.bit_generator.state, agent.profiler.state()
+
+class IslandGeneticCube:
+
+  def __init__(self, dimension, popSize = 8, islands = 4, topology = "ring", migration_interval = 10, migrants = 1, seed = None, max_workers = None, objective = "control", profile = False, initializer = "random") :
+    if topology not in TOPOLOGIES :
+      raise ValueError(f"Unknown topology: {topology}")
+    if not 0 < migrants < popSize :
+      raise ValueError("migrants must be between 1 and popSize - 1")
+    self.dimension = dimension
+    self.popSize = popSize
+    self.islands = islands
+    self.topology = topology
+    self.migration_interval = max(1, migration_interval)
+    self.migrants = migrants
+    self.initializer = initializer
+    self.max_workers = max_workers or min(islands, os.cpu_count())
+    # Waktu fase worker dijumlahkan antar proses, migrasi diukur di proses utama
+    self.profiler = Profiler() if profile else NULL_PROFILER
+
+    seeds = spawn_seeds(seed, islands + 1)
+    self.rng = np.random.default_rng(seeds[-1])
+    self.rngStates = [np.random.default_rng(islandSeed).bit_generator.state for islandSeed in seeds[:-1]]
+    # Evaluasi fitness seluruh pulau sekaligus saat migrasi dan di akhir run
+    self.evaluator = GeneticCube(dimension, islands * popSize, objective=objective)
+
+  def destinations(self, island) :
+    if self.topology == "ring" :
+      return [(island + 1) % self.islands]
+    if self.topology == "complete" :
+      return [other for other in range(self.islands) if other != island]
+    return [int(self.rng.choice([other for other in range(self.islands) if other != island]))]
+
+  def migrate(self, population) :
+    # Emigran dipilih dari snapshot sebelum penggantian, jadi urutan pulau tidak berpengaruh
+    self.evaluator.population[:] = population.reshape(self.evaluator.population.shape)
+    self.evaluator.version += 1
+    fitnesses = self.evaluator.getFitnesses().reshape((self.islands, self.popSize))
+    ranking = np.argsort(-fitnesses, axis=1, kind="stable")
+    emigrants = [population[island, ranking[island, :self.migrants]].copy() for island in range(self.islands)]
+
+    incoming = [[] for _ in range(self.islands)]
+    for island in range(self.islands) :
+      for destination in self.destinations(island) :
+        incoming[destination].append(emigrants[island])
+
+    for island, groups in enumerate(incoming) :
+      if not groups :
+        continue
+      arrivals = np.concatenate(groups)[:self.popSize - self.migrants]
+      worst = ranking[island, ::-1][:len(arrivals)]
+      population[island, worst] = arrivals
+
+  def geneticAlgorithm(self, iterationCount = 1000, progress = None, stop = None, history = None) :
+    # Hasil berbentuk sama dengan GeneticCube: max_h = maksimum antar pulau, avg_h = rata-rata seluruh individu.
+    # progress dan stop diperiksa tiap migrasi (akhir epoch).
+    start_time = time.time()
+    cells = self.dimension**3
+    shape = (self.islands, self.popSize, cells)
+    statsShape = (self.islands, iterationCount + 1, 2)
+    populationMemory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    statsMemory = shared_memory.SharedMemory(create=True, size=int(np.prod(statsShape)) * 8)
+    population = stats = pool = None
+    try :
+      population = np.ndarray(shape, dtype=np.int64, buffer=populationMemory.buf)
+      stats = np.ndarray(statsShape, dtype=np.float64, buffer=statsMemory.buf)
+      for island in range(self.islands) :
+        rng = np.random.default_rng()
+        rng.bit_generator.state = self.rngStates[island]
+        population[island] = initializers.population(self.initializer, self.popSize, self.dimension, rng)
+        self.rngStates[island] = rng.bit_generator.state
+
+      pool = multiprocessing.Pool(self.max_workers, initializer=_initWorker,
+                                  initargs=(populationMemory.name, statsMemory.name, shape, statsShape))
+      reason = None
+      last = iterationCount
+      for start in range(0, iterationCount + 1, self.migration_interval) :
+        stop_gen = min(start + self.migration_interval, iterationCount + 1)
+        tasks = [(island, start, stop_gen, iterationCount, self.rngStates[island], self.evaluator.objective.name,
+                  self.profiler.enabled) for island in range(self.islands)]
+        self.rngStates = []
+        for rngState, profile in pool.map(_runEpoch, tasks) :
+          self.rngStates.append(rngState)
+          if profile is not None :
+            self.profiler.merge(profile)
+
+        last = stop_gen - 1
+        if stop is not None or progress is not None :
+          now = time.time() - start_time
+          max_h = stats[:, start:stop_gen, 0].max(axis=0)
+          best_h = stats[:, :stop_gen, 0].max()
+          if stop is not None :
+            for offset, value in enumerate(max_h) :
+              reason = reason or stop.check(start + offset, value, now)
+          if progress is not None and progress(record([last, max_h[-1], best_h, float("nan"), float("nan"), 0, now])) :
+            reason = reason or "callback"
+        if reason or stop_gen > iterationCount :
+          break
+        with self.profiler.phase("migration") :
+          self.migrate(population)
+      pool.close()
+
+      # Salin keluar dari shared memory sebelum segmen dilepas
+      finalPopulation = population.copy()
+      finalStats = stats[:, :last + 1].copy()
+    except BaseException :
+      if pool is not None :
+        pool.terminate()
+      raise
+    finally :
+      if pool is not None :
+        pool.join()
+      population = stats = None
+      populationMemory.close()
+      populationMemory.unlink()
+      statsMemory.close()
+      statsMemory.unlink()
+
+    policy = history or HistoryPolicy()
+    histories = {"max_h": History(policy, capacity=last + 1), "avg_h": History(policy, capacity=last + 1)}
+    for max_h, avg_h in zip(finalStats[:, :, 0].max(axis=0), finalStats[:, :, 1].mean(axis=0)) :
+      histories["max_h"].append(max_h)
+      histories["avg_h"].append(avg_h)
+
+    self.evaluator.population[:] = finalPopulation.reshape(self.evaluator.population.shape)
+    self.evaluator.version += 1
+    best_cube = Cube(self.dimension, self.evaluator.population[self.evaluator.pop_max(self.evaluator.getFitnesses())])
+    results = {}
+    results["max_h"] = histories["max_h"].values().tolist()
+    results["avg_h"] = histories["avg_h"].values().tolist()
+    results["history_stride"] = histories["max_h"].stride
+    results["history_offset"] = histories["max_h"].offset
+    results["island_max_h"] = finalStats[:, -1, 0].tolist()
+    results["stop_reason"] = reason
+    results["final_state"] = best_cube.cube
+    results["final H"] = best_cube.score(self.evaluator.objective)
+    results["control H"] = best_cube.controlH()
+    results["duration"] = time.time() - start_time
+    if self.profiler.enabled :
+      results["profile"] = self.profiler.report(results["duration"])
+    return results
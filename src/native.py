@@ -0,0 +1,126 @@
+import ctypes
+import os
+import sys
+import numpy as np
+from progress import STOP_REASONS, record
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+if sys.platform == "win32" :
+  LIBRARY_NAME = "cube.dll"
+  EXECUTABLE_NAME = "Cube.exe"
+elif sys.platform == "darwin" :
+  LIBRARY_NAME = "libcube.dylib"
+  EXECUTABLE_NAME = "Cube"
+else :
+  LIBRARY_NAME = "libcube.so"
+  EXECUTABLE_NAME = "Cube"
+
+LIBRARY_PATH = os.path.join(SOURCE_DIR, LIBRARY_NAME)
+EXECUTABLE_PATH = os.path.join(SOURCE_DIR, EXECUTABLE_NAME)
+
+# Field hasil native beserta bentuk array-nya, n = dimensi kubus
+CUBE_FIELDS = ["initial_state", "final_state"]
+ARRAY_FIELDS = ["switches", "h_values", "boltzmanns", "iteration_per_restarts", "temperatures", "acceptance_rates", "swap_rates",
+                "profile_counters", "profile_times"]
+SCALAR_FIELDS = ["final H", "control H", "duration", "restart_counts", "stucks", "stop_reason", "history_stride", "history_offset",
+                 "cache_lookups", "cache_hits", "cache_hit_rate", "cache_entries", "cache_evictions", "cache_bytes", "cycles_avoided", "basin_revisits",
+                 "evaluations_skipped"]
+
+PROGRESS_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_double), ctypes.c_int)
+
+_library = None
+
+def loadLibrary() :
+  global _library
+  if _library is not None :
+    return _library
+  if not os.path.exists(LIBRARY_PATH) :
+    return None
+
+  library = ctypes.CDLL(LIBRARY_PATH)
+  library.cube_run.restype = ctypes.c_void_p
+  library.cube_run.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.POINTER(ctypes.c_char_p), ctypes.POINTER(ctypes.c_char_p)]
+  library.cube_run_progress.restype = ctypes.c_void_p
+  library.cube_run_progress.argtypes = library.cube_run.argtypes + [PROGRESS_CALLBACK]
+  library.cube_result_error.restype = ctypes.c_char_p
+  library.cube_result_error.argtypes = [ctypes.c_void_p]
+  library.cube_result_size.restype = ctypes.c_long
+  library.cube_result_size.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+  library.cube_result_is_double.restype = ctypes.c_int
+  library.cube_result_is_double.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+  library.cube_result_copy_ints.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_void_p]
+  library.cube_result_copy_doubles.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_void_p]
+  library.cube_result_free.argtypes = [ctypes.c_void_p]
+
+  _library = library
+  return _library
+
+def isAvailable() :
+  return loadLibrary() is not None
+
+def _readField(library, handle, key) :
+  name = key.encode()
+  size = library.cube_result_size(handle, name)
+  if size < 0 :
+    return None
+  if library.cube_result_is_double(handle, name) :
+    buffer = np.empty(size, dtype=np.float64)
+    library.cube_result_copy_doubles(handle, name, buffer.ctypes.data)
+  else :
+    buffer = np.empty(size, dtype=np.int32)
+    library.cube_result_copy_ints(handle, name, buffer.ctypes.data)
+  return buffer
+
+def optionValue(value) :
+  # Opsi dikirim sebagai string, bool menjadi 0/1 supaya terbaca sebagai int di C++
+  return str(int(value)) if isinstance(value, bool) else str(value)
+
+def _progressCallback(progress) :
+  # progress(record) dipanggil dari dalam loop C++; nilai True menghentikan run.
+  # Exception tidak boleh menembus batas ctypes, run dihentikan saja.
+  def callback(values, size) :
+    try :
+      return 1 if progress(record(values[:size])) else 0
+    except Exception :
+      return 1
+  return PROGRESS_CALLBACK(callback)
+
+def run(algorithm, argv=None, progress=None) :
+  # Jalankan algoritma C++ di dalam proses, semua riwayat dikembalikan sebagai array NumPy
+  library = loadLibrary()
+  if library is None :
+    raise RuntimeError(f"Native library not found at {LIBRARY_PATH}")
+
+  argv = argv or {}
+  keys = (ctypes.c_char_p * len(argv))(*[str(key).encode() for key in argv])
+  values = (ctypes.c_char_p * len(argv))(*[optionValue(value).encode() for value in argv.values()])
+
+  if progress is None :
+    handle = library.cube_run(algorithm.encode(), len(argv), keys, values)
+  else :
+    callback = _progressCallback(progress)
+    handle = library.cube_run_progress(algorithm.encode(), len(argv), keys, values, callback)
+  try :
+    error = library.cube_result_error(handle)
+    if error :
+      raise RuntimeError(error.decode())
+
+    result = {}
+    for key in CUBE_FIELDS + ARRAY_FIELDS + SCALAR_FIELDS :
+      value = _readField(library, handle, key)
+      if value is None :
+        continue
+      if key in CUBE_FIELDS :
+        dimension = round(len(value) ** (1/3))
+        value = value.reshape((dimension, dimension, dimension))
+      elif key == "switches" :
+        value = value.reshape((-1, 2, 3))
+      elif key in SCALAR_FIELDS :
+        value = value[0].item()
+        if key == "stop_reason" :
+          value = STOP_REASONS[value]
+      result[key] = value
+    return result
+  finally :
+    library.cube_result_free(handle)
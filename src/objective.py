@@ -0,0 +1,59 @@
+import numpy as np
+
+# Registry fungsi objektif. Setiap objektif dihitung dari agregat jumlah garis
+# (magicCount, sumTotal, sumSquares, absError), sehingga satu rumus dipakai untuk evaluasi penuh,
+# evaluasi batch (array agregat) dan evaluasi delta (agregat setelah swap dari Cube._changedAggregates).
+# Nama dan rumusnya sama dengan opsi objective di engine native.
+
+OBJECTIVES = {}
+
+class Objective:
+
+  def __init__(self, name, formula, description = ""):
+    # formula(magicCount, sumTotal, sumSquares, absError, lineCount, errorScale), bisa menerima array
+    self.name = name
+    self.formula = formula
+    self.description = description
+
+  def evaluate(self, aggregates, lineCount, errorScale):
+    return self.formula(*aggregates, lineCount, errorScale)
+
+  def full(self, sums, target, errorScale):
+    # sums berbentuk (..., L), hasil berbentuk (...)
+    sums = np.asarray(sums)
+    aggregates = ((sums == target).sum(axis=-1), sums.sum(axis=-1), (sums * sums).sum(axis=-1), np.abs(target - sums).sum(axis=-1))
+    return self.evaluate(aggregates, sums.shape[-1], errorScale)
+
+  def delta(self, cube, c1, c2):
+    # Selisih nilai objektif jika c1 dan c2 ditukar, tanpa mengubah kubus
+    aggregates = cube._changedAggregates(cube._lineChanges(c1, c2))
+    return self.evaluate(aggregates, len(cube.sums), type(cube).errorScale(cube.dimension)) - cube.score(self.name)
+
+def register(name, formula, description = ""):
+  OBJECTIVES[name] = Objective(name, formula, description)
+  return OBJECTIVES[name]
+
+def get(objective):
+  if isinstance(objective, Objective) :
+    return objective
+  if objective not in OBJECTIVES :
+    raise ValueError(f"Unknown objective: {objective}")
+  return OBJECTIVES[objective]
+
+def stddev(sumTotal, sumSquares, lineCount):
+  mean = sumTotal / lineCount
+  variance = sumSquares / lineCount - mean * mean
+  if isinstance(variance, np.ndarray) :
+    return np.sqrt(np.maximum(variance, 0))
+  # Skalar (evaluasi delta per pasangan) lebih cepat tanpa numpy
+  return max(variance, 0) ** 0.5
+
+def stdPenalty(factor):
+  return lambda magicCount, sumTotal, sumSquares, absError, lineCount, errorScale : magicCount - stddev(sumTotal, sumSquares, lineCount) * factor
+
+register("std", stdPenalty(1), "magic lines minus the stddev of all line sums (Python default)")
+register("std_half", stdPenalty(0.5), "magic lines minus half the stddev of all line sums (native default)")
+register("control", lambda magicCount, sumTotal, sumSquares, absError, lineCount, errorScale : magicCount + absError / errorScale,
+         "magic lines plus the normalized absolute error (GA default)")
+register("count", lambda magicCount, sumTotal, sumSquares, absError, lineCount, errorScale : magicCount,
+         "magic lines only")
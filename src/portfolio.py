@@ -0,0 +1,308 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import time
+import numpy as np
+import algorithm
+from batch import ALGORITHMS, parseParams, summarizeRun
+
+# Portofolio algoritma dengan racing (successive halving): konfigurasi dijalankan paralel dalam slot worker,
+# budget (detik wall-clock x slot, atau detik CPU) dibagi rata ke beberapa rung. Di akhir tiap rung hanya
+# 1/eta konfigurasi dengan H terbaik yang bertahan; slot yang dibebaskan dipakai run baru (seed baru) milik
+# konfigurasi yang bertahan. Semua run memakai objektif yang sama supaya H antar algoritma bisa dibandingkan.
+
+DEFAULT_PORTFOLIO = [
+  "sideways ascent:max_limit=10",
+  "sideways ascent:max_limit=100",
+  "random restart:max_restart=100",
+  "simulated annealing",
+  "tabu search",
+  "late acceptance",
+  "genetic algorithm:popSize=8",
+  "genetic algorithm:popSize=32",
+]
+
+_shared = {}
+
+def _initWorker(reports, stops) :
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+  _shared["reports"] = reports
+  _shared["stops"] = stops
+
+def _race(task) :
+  # Satu run di slot tertentu; best H dilaporkan tiap progress_interval, flag stop slot menghentikan run
+  run, slot, config, algo, argv, seed = task
+  random.seed(seed)
+
+  def progress(record) :
+    _shared["reports"].put((run, record["best H"]))
+    return bool(_shared["stops"][slot])
+
+  result = algorithm.run_algorithm(algo, dict(argv, seed=seed), progress)
+  summary = summarizeRun(run, algo, result, seed)
+  if "error" not in summary :
+    summary["stop_reason"] = result.get("stop_reason")
+  summary["config"] = config
+  return slot, summary
+
+def parseConfig(spec) :
+  # "sideways ascent:max_limit=50,neighborhood=first" -> (nama, algoritma, parameter)
+  if isinstance(spec, dict) :
+    return spec.get("name") or spec["algorithm"], spec["algorithm"], dict(spec.get("params") or {})
+  algo, _, params = spec.partition(":")
+  algo = algo.strip()
+  return spec, algo, parseParams([param.strip() for param in params.split(",") if param.strip()])
+
+class Configuration :
+
+  def __init__(self, index, name, algo, params) :
+    if algo not in ALGORITHMS :
+      raise ValueError(f"Unknown algorithm: {algo}")
+    if algo == "genetic algorithm" and (params.get("islands") or 1) > 1 :
+      raise ValueError("Island GA starts its own worker pool and cannot run inside a portfolio")
+    self.index = index
+    self.name = name
+    self.algorithm = algo
+    self.params = params
+    self.bestH = -float("inf")
+    self.active = 0
+    self.launched = 0
+    self.completed = 0
+    # Run yang dihentikan scheduler (preempt, tersingkir atau budget habis)
+    self.stopped = 0
+    self.solved = 0
+    self.errors = 0
+    # Detik slot yang dipakai: total dan di rung berjalan
+    self.used = 0.0
+    self.rungUsed = 0.0
+    self.scores = []
+    self.eliminated = None
+
+  def report(self) :
+    hours = self.used / 3600
+    return {
+      "name": self.name,
+      "algorithm": self.algorithm,
+      "params": self.params,
+      "best H": self.bestH if self.launched else None,
+      "mean H": float(np.mean(self.scores)) if self.scores else None,
+      "runs": self.launched,
+      "completed": self.completed,
+      "stopped": self.stopped,
+      "errors": self.errors,
+      "solved": self.solved,
+      "cpu_seconds": self.used,
+      "solutions_per_cpu_hour": self.solved / hours if hours > 0 else 0.0,
+      "eliminated_at_rung": self.eliminated,
+    }
+
+class Portfolio :
+
+  def __init__(self, configs = None, time_budget = None, cpu_budget = None, eta = 2, max_workers = None, seed = None,
+               objective = "std_half", progress_interval = 100) :
+    if (time_budget is None) == (cpu_budget is None) :
+      raise ValueError("Give exactly one of time_budget (wall-clock seconds) or cpu_budget (CPU seconds)")
+    if eta < 2 :
+      raise ValueError("eta must be at least 2")
+    self.configs = [Configuration(index, *parseConfig(spec)) for index, spec in enumerate(configs or DEFAULT_PORTFOLIO)]
+    self.workers = max_workers or os.cpu_count()
+    self.time_budget = time_budget
+    # Budget dalam detik slot: wall-clock dikali jumlah slot
+    self.budget = cpu_budget if cpu_budget is not None else time_budget * self.workers
+    self.eta = eta
+    self.rungs = math.ceil(math.log(len(self.configs)) / math.log(eta)) + 1 if len(self.configs) > 1 else 1
+    self.objective = objective
+    self.progress_interval = progress_interval
+    self.seeds = np.random.SeedSequence(seed)
+    self.seed = seed
+
+  def nextSeed(self) :
+    # Seed run ke-i selalu sama untuk seed portofolio yang sama, berapapun run yang sudah dibuat sebelumnya
+    return int(self.seeds.spawn(1)[0].generate_state(1, np.uint64)[0])
+
+  def runArguments(self, config, remaining) :
+    argv = dict({"detail": "summary", "progress_interval": self.progress_interval}, **config.params)
+    argv["objective"] = self.objective
+    if remaining is not None :
+      argv["time_budget"] = min(float(argv.get("time_budget") or remaining), remaining)
+    return argv
+
+  def run(self, on_result = None, on_rung = None) :
+    start_time = time.time()
+    survivors = list(self.configs)
+    rung = 0
+    rungs = []
+    summaries = []
+    used = 0.0
+    rungStart = 0.0
+    slots = [None] * self.workers
+    finished = queue.Queue()
+    reports = multiprocessing.Queue()
+    stops = multiprocessing.Array("b", self.workers, lock=False)
+    runConfig = {}
+
+    pool = multiprocessing.Pool(self.workers, initializer=_initWorker, initargs=(reports, stops))
+    try :
+      last = time.time()
+      while True :
+        now = time.time()
+        dt = now - last
+        last = now
+        for config in slots :
+          if config is not None :
+            config.used += dt
+            config.rungUsed += dt
+            used += dt
+
+        # Laporan progres dan run yang selesai
+        try :
+          while True :
+            run, bestH = reports.get_nowait()
+            config = runConfig[run]
+            config.bestH = max(config.bestH, bestH)
+        except queue.Empty :
+          pass
+        while not finished.empty() :
+          slot, summary = finished.get()
+          config = slots[slot]
+          slots[slot] = None
+          config.active -= 1
+          if "error" in summary :
+            config.errors += 1
+          else :
+            config.completed += summary["stop_reason"] != "callback"
+            config.stopped += summary["stop_reason"] == "callback"
+            config.solved += summary["solved"]
+            config.scores.append(summary["final H"])
+            config.bestH = max(config.bestH, summary["final H"])
+          summaries.append(summary)
+          if on_result :
+            on_result(summary)
+
+        exhausted = used >= self.budget
+        # Akhir rung: ranking berdasarkan H terbaik, slot konfigurasi yang tersingkir dihentikan
+        if not exhausted and len(survivors) > 1 and used - rungStart >= self.budget / self.rungs :
+          keep = max(1, math.ceil(len(survivors) / self.eta))
+          ranking = sorted(survivors, key=lambda config: config.bestH, reverse=True)
+          for config in ranking[keep:] :
+            config.eliminated = rung
+          survivors = ranking[:keep]
+          rungs.append({"rung": rung, "elapsed": now - start_time, "survivors": [config.name for config in survivors],
+                        "eliminated": [config.name for config in ranking[keep:]]})
+          if on_rung :
+            on_rung(rungs[-1])
+          rung += 1
+          rungStart = used
+          for config in self.configs :
+            config.rungUsed = 0.0
+
+        for slot, config in enumerate(slots) :
+          if config is not None and (exhausted or config not in survivors) :
+            stops[slot] = 1
+
+        if exhausted :
+          if all(config is None for config in slots) :
+            break
+        else :
+          # Slot kosong untuk konfigurasi bertahan yang paling sedikit memakai budget di rung ini
+          remaining = None if self.time_budget is None else max(0.0, self.time_budget - (now - start_time))
+          for slot in range(self.workers) :
+            if slots[slot] is not None :
+              continue
+            config = min(survivors, key=lambda config: (config.rungUsed, config.active, -config.bestH))
+            run = len(runConfig)
+            runConfig[run] = config
+            slots[slot] = config
+            stops[slot] = 0
+            config.active += 1
+            config.launched += 1
+            task = (run, slot, config.name, config.algorithm, self.runArguments(config, remaining), self.nextSeed())
+            pool.apply_async(_race, (task,), callback=finished.put,
+                             error_callback=lambda error, slot=slot, config=config : finished.put((slot, {"config": config.name, "error": str(error)})))
+
+          # Konfigurasi yang belum mendapat jatah di rung ini menunggu slot: run konfigurasi yang sudah melewati jatahnya di-preempt
+          share = self.budget / self.rungs / len(survivors)
+          if any(config.active == 0 and config.rungUsed < share for config in survivors) :
+            over = [slot for slot, config in enumerate(slots) if config is not None and config.rungUsed >= share and not stops[slot]]
+            if over :
+              stops[max(over, key=lambda slot: slots[slot].rungUsed)] = 1
+        time.sleep(0.05)
+      pool.close()
+    except BaseException :
+      pool.terminate()
+      raise
+    finally :
+      pool.join()
+
+    completed = [summary for summary in summaries if "error" not in summary]
+    best = max(completed, key=lambda summary: summary["final H"], default=None)
+    for summary in summaries :
+      if summary is not best :
+        summary.pop("final_state", None)
+    return {
+      "best": best,
+      "configurations": sorted([config.report() for config in self.configs], key=lambda report: -(report["best H"] if report["best H"] is not None else -float("inf"))),
+      "rungs": rungs,
+      "summaries": summaries,
+      "objective": self.objective,
+      "workers": self.workers,
+      "cpu_seconds": used,
+      "wall_time": time.time() - start_time,
+      "seed": self.seed,
+    }
+
+def run_portfolio(configs = None, time_budget = None, cpu_budget = None, eta = 2, max_workers = None, seed = None, objective = "std_half",
+                  progress_interval = 100, on_result = None, on_rung = None) :
+  return Portfolio(configs, time_budget, cpu_budget, eta, max_workers, seed, objective, progress_interval).run(on_result, on_rung)
+
+def printRung(rung) :
+  print(f"rung {rung['rung']} at {rung['elapsed']:.1f}s: kept {', '.join(rung['survivors'])}; dropped {', '.join(rung['eliminated'])}")
+
+def printResult(summary) :
+  if "error" in summary :
+    print(f"[{summary['config']}] error {summary['error']}")
+  else :
+    print(f"[{summary['config']}] H = {summary['final H']:.4f}, magic lines = {summary['magic_lines']}, stop = {summary['stop_reason']}")
+
+def main() :
+  parser = argparse.ArgumentParser(description="Race a portfolio of algorithm configurations under a shared time budget")
+  parser.add_argument("--config", action="append", default=[], metavar="ALGORITHM[:KEY=VALUE,...]",
+                      help="configuration to race, e.g. --config \"sideways ascent:max_limit=50\" (default: built-in portfolio)")
+  budget = parser.add_mutually_exclusive_group(required=True)
+  budget.add_argument("--time-budget", type=float, help="wall-clock seconds")
+  budget.add_argument("--cpu-budget", type=float, help="CPU seconds summed over workers")
+  parser.add_argument("--eta", type=int, default=2, help="keep 1/eta of the configurations at each rung")
+  parser.add_argument("--max-workers", type=int, default=None)
+  parser.add_argument("--seed", type=int, default=None)
+  parser.add_argument("--objective", default="std_half", help="objective used to run and rank every configuration")
+  parser.add_argument("--progress-interval", type=int, default=100)
+  parser.add_argument("--output", help="write the report to this JSON file")
+  args = parser.parse_args()
+
+  try :
+    report = run_portfolio(args.config or None, args.time_budget, args.cpu_budget, args.eta, args.max_workers, args.seed, args.objective,
+                           args.progress_interval, printResult, printRung)
+  except KeyboardInterrupt :
+    print("\nInterrupted")
+    return
+
+  print("\n======================== PORTFOLIO RESULTS ========================")
+  for config in report["configurations"] :
+    best = "-" if config["best H"] is None else f"{config['best H']:.4f}"
+    print(f"{config['name']:<40} best H = {best:>10}, runs = {config['runs']:>4}, solved = {config['solved']:>3}, "
+          f"cpu = {config['cpu_seconds']:.1f}s, eliminated at rung = {config['eliminated_at_rung']}")
+  if report["best"] :
+    print("Best: ", report["best"]["config"], "H = ", report["best"]["final H"], "magic lines = ", report["best"]["magic_lines"])
+  print("Wall Time: ", report["wall_time"])
+
+  if args.output :
+    with open(args.output, "w") as file :
+      json.dump(report, file, indent=2)
+
+if __name__ == "__main__" :
+  main()
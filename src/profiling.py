@@ -0,0 +1,105 @@
+import time
+
+# Instrumentasi run (opsi profile = 1). Urutan counter dan fase native sama dengan enum Profiler di Cube.cpp.
+# Waktu native eksklusif per fase; bookkeeping = riwayat dan monitor, yaitu sisa waktu di luar fase lain.
+PROFILE_COUNTERS = ["evaluations", "accepted", "rejected", "restarts", "proposals"]
+PROFILE_PHASES = ["objective", "neighbors", "apply", "bookkeeping", "checkpoint"]
+# Fase GA (Python) tidak bersarang: fitness, selection, crossover, repair, bookkeeping, checkpoint (+ migration untuk island)
+
+class _Phase:
+  __slots__ = ("times", "name", "start")
+
+  def __init__(self, times, name):
+    self.times = times
+    self.name = name
+
+  def __enter__(self):
+    self.start = time.perf_counter()
+
+  def __exit__(self, *exc):
+    self.times[self.name] = self.times.get(self.name, 0.0) + time.perf_counter() - self.start
+
+class _NullPhase:
+  __slots__ = ()
+
+  def __enter__(self):
+    pass
+
+  def __exit__(self, *exc):
+    pass
+
+class Profiler:
+  enabled = True
+
+  def __init__(self):
+    self.times = {}
+    self.counters = {}
+
+  def phase(self, name):
+    return _Phase(self.times, name)
+
+  def count(self, name, amount = 1):
+    self.counters[name] = self.counters.get(name, 0) + amount
+
+  def merge(self, data):
+    # data = hasil state() dari profiler lain (misalnya worker island GA)
+    for name, value in data["times"].items() :
+      self.times[name] = self.times.get(name, 0.0) + value
+    for name, value in data["counters"].items() :
+      self.count(name, value)
+
+  def state(self):
+    return {"times": dict(self.times), "counters": dict(self.counters)}
+
+  def report(self, duration):
+    return makeReport(self.counters, self.times, duration)
+
+class NullProfiler:
+  # Profiler nonaktif: setiap titik ukur hanya satu pemanggilan method kosong
+  enabled = False
+  _phase = _NullPhase()
+
+  def phase(self, name):
+    return self._phase
+
+  def count(self, name, amount = 1):
+    pass
+
+  def merge(self, data):
+    pass
+
+  def state(self):
+    return None
+
+NULL_PROFILER = NullProfiler()
+
+def makeReport(counters, times, duration):
+  evaluations = counters.get("evaluations", 0)
+  return {
+    "counters": counters,
+    "times": times,
+    "duration": duration,
+    "evaluations_per_second": evaluations / duration if duration > 0 else 0.0,
+  }
+
+def nativeReport(result):
+  # Ubah array profile_counters/profile_times hasil engine native menjadi laporan terstruktur
+  counters = {name: int(value) for name, value in zip(PROFILE_COUNTERS, result.pop("profile_counters"))}
+  times = {name: float(value) for name, value in zip(PROFILE_PHASES, result.pop("profile_times"))}
+  return makeReport(counters, times, result["duration"])
+
+def formatReport(profile):
+  lines = ["Profile:"]
+  total = sum(profile["times"].values()) or 1
+  for name, value in profile["times"].items() :
+    lines.append(f"  {name:<12} {value:>10.4f}s {100 * value / total:>6.1f}%")
+  for name, value in profile["counters"].items() :
+    lines.append(f"  {name:<12} {value:>10}")
+  lines.append(f"  {'evals/s':<12} {profile['evaluations_per_second']:>10.4g}")
+  return "\n".join(lines)
+
+def writeTrace(profile, filename, root = "run"):
+  # Format folded stack (root;fase mikrodetik per baris), dibaca flamegraph.pl, speedscope dan inferno
+  with open(filename, "w") as file :
+    for name, value in profile["times"].items() :
+      file.write(f"{root.replace(' ', '_')};{name} {round(value * 1e6)}\n")
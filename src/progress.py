@@ -0,0 +1,38 @@
+# Urutan field record progres, sama dengan array yang dikirim callback engine native
+PROGRESS_FIELDS = ["iteration", "current H", "best H", "acceptance_rate", "temperature", "restart", "elapsed"]
+# Kode stop_reason pada hasil native (indeks list ini)
+STOP_REASONS = [None, "target", "time", "stall", "callback"]
+STOP_OPTIONS = ["target_h", "time_budget", "stall"]
+
+class StopConditions:
+  # Kondisi berhenti dini sisi Python (GA), arti opsinya sama dengan engine native:
+  # target_h = H terbaik yang cukup, time_budget = detik, stall = iterasi tanpa perbaikan H terbaik
+
+  def __init__(self, target_h = None, time_budget = None, stall = None):
+    self.target_h = target_h
+    self.time_budget = time_budget
+    self.stall = stall
+    self.bestH = -float("inf")
+    self.bestIteration = 0
+
+  def fromOptions(argv):
+    return StopConditions(*[None if argv.get(key) is None else float(argv[key]) for key in STOP_OPTIONS])
+
+  def check(self, iteration, currentH, elapsed):
+    if currentH > self.bestH :
+      self.bestH = currentH
+      self.bestIteration = iteration
+
+    if self.target_h is not None and self.bestH >= self.target_h :
+      return "target"
+    if self.stall and iteration - self.bestIteration >= self.stall :
+      return "stall"
+    if self.time_budget is not None and elapsed >= self.time_budget :
+      return "time"
+    return None
+
+def record(values):
+  progress = dict(zip(PROGRESS_FIELDS, map(float, values)))
+  progress["iteration"] = int(progress["iteration"])
+  progress["restart"] = int(progress["restart"])
+  return progress
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul proyek diimpor langsung dari src (import algorithm, native, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,73 @@
+import os
+import shutil
+import numpy as np
+import pytest
+import algorithm
+import native
+
+requiresNative = pytest.mark.skipif(not native.isAvailable(), reason="native library libcube.so is not built")
+
+HISTORY_FIELDS = ("initial_state", "final_state", "switches", "h_values", "boltzmanns", "iteration_per_restarts", "max_h", "avg_h", "max_cubes")
+
+def snapshotRun(algo, argv, directory, interval, every = 1) :
+  # Jalankan dengan checkpoint dan salin direktori checkpoint setiap snapshot baru muncul (diperiksa tiap every iterasi),
+  # setiap salinan mensimulasikan crash tepat setelah snapshot tersebut
+  live = os.path.join(directory, "live")
+  snapshotFile = algorithm.GeneticCube.CHECKPOINT_FILE if algo == "genetic algorithm" else "state.bin"
+  copies = []
+
+  def progress(record) :
+    snapshot = os.path.join(live, snapshotFile)
+    if os.path.exists(snapshot) :
+      stamp = os.stat(snapshot).st_mtime_ns
+      if not copies or copies[-1][0] != stamp :
+        target = os.path.join(directory, f"crash{len(copies)}")
+        shutil.copytree(live, target)
+        copies.append((stamp, target))
+    return False
+
+  algorithm.run_algorithm(algo, dict(argv, checkpoint=live, checkpoint_interval=interval, progress_interval=every), progress)
+  return [target for _, target in copies]
+
+def assertSameRun(expected, actual) :
+  for key in HISTORY_FIELDS :
+    if key in expected :
+      np.testing.assert_array_equal(np.asarray(actual[key]), np.asarray(expected[key]), err_msg=key)
+  assert actual["final H"] == expected["final H"]
+
+@requiresNative
+@pytest.mark.parametrize("interval", [104, 111])
+def test_random_restart_resume_equals_uninterrupted(tmp_path, interval) :
+  # Climb baru yang lebih panjang dari log climb sebelumnya tidak boleh tersambung ke log lama
+  argv = {"max_restart": 8, "seed": 5}
+  expected = algorithm.run_algorithm("random restart", dict(argv))
+  copies = snapshotRun("random restart", argv, str(tmp_path), interval)
+  assert len(copies) >= 2
+  for copy in copies :
+    assertSameRun(expected, algorithm.resume(copy))
+
+@requiresNative
+@pytest.mark.parametrize("algo, argv, interval, every", [
+  ("steepest ascent", {}, 17, 1),
+  ("sideways ascent", {"max_limit": 20}, 17, 1),
+  ("stochastic", {}, 30011, 1000),
+  ("simulated annealing", {}, 701, 10),
+  ("tabu search", {"max_iteration": 300, "neighborhood": "sample"}, 97, 1),
+  ("late acceptance", {"max_iteration": 3000}, 907, 10),
+])
+def test_native_resume_equals_uninterrupted(tmp_path, algo, argv, interval, every) :
+  argv = dict(argv, seed=2)
+  expected = algorithm.run_algorithm(algo, dict(argv))
+  copies = snapshotRun(algo, argv, str(tmp_path), interval, every)
+  assert copies
+  for copy in copies :
+    assertSameRun(expected, algorithm.resume(copy))
+
+@pytest.mark.parametrize("objective", ["control", "std"])
+def test_genetic_resume_equals_uninterrupted(tmp_path, objective) :
+  argv = {"max_iteration": 60, "popSize": 16, "seed": 2, "objective": objective}
+  expected = algorithm.run_algorithm("genetic algorithm", dict(argv))
+  copies = snapshotRun("genetic algorithm", argv, str(tmp_path), 17)
+  assert copies
+  for copy in copies :
+    assertSameRun(expected, algorithm.resume(copy))
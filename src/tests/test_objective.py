@@ -0,0 +1,62 @@
+import random
+import numpy as np
+import pytest
+import algorithm
+import native
+from algorithm import Cube
+
+requiresNative = pytest.mark.skipif(not native.isAvailable(), reason="native library libcube.so is not built")
+
+OBJECTIVES = ["std", "std_half", "control", "count"]
+
+def randomCube(dimension, seed, objective = "std") :
+  cube = Cube(dimension, rng=random.Random(seed), objective=objective)
+  cube.initialize()
+  return cube
+
+def randomCoordinates(dimension, rng) :
+  c1 = tuple(rng.randrange(dimension) for _ in range(3))
+  c2 = c1
+  while c2 == c1 :
+    c2 = tuple(rng.randrange(dimension) for _ in range(3))
+  return c1, c2
+
+@pytest.mark.parametrize("objective", OBJECTIVES)
+@pytest.mark.parametrize("dimension", [3, 4, 5])
+def test_delta_matches_full_recompute(objective, dimension) :
+  cube = randomCube(dimension, dimension, objective)
+  rng = random.Random(7)
+  for _ in range(50) :
+    c1, c2 = randomCoordinates(dimension, rng)
+    swapped = np.array(cube.cube)
+    swapped[c1], swapped[c2] = swapped[c2], swapped[c1]
+    recomputed = Cube.fromArray(swapped, objective)
+    assert cube.deltaHForSwap(c1, c2) == pytest.approx(recomputed.getH() - cube.getH(), abs=1e-9)
+    assert cube.deltaControlHForSwap(c1, c2) == pytest.approx(recomputed.controlH() - cube.controlH(), abs=1e-9)
+
+    # Swap yang diterapkan memperbarui jumlah garis dan agregat sama dengan hitung ulang penuh
+    cube.swap(c1, c2)
+    np.testing.assert_array_equal(cube.sums, recomputed.sums)
+    assert cube.getH() == pytest.approx(recomputed.getH(), abs=1e-9)
+    assert cube.magicCount == recomputed.magicCount
+
+def test_set_matches_full_recompute() :
+  cube = randomCube(5, 11)
+  rng = random.Random(3)
+  for _ in range(20) :
+    coordinate = tuple(rng.randrange(5) for _ in range(3))
+    cube.set(coordinate, rng.randint(1, 125))
+    recomputed = Cube.fromArray(np.array(cube.cube))
+    np.testing.assert_array_equal(cube.sums, recomputed.sums)
+    assert cube.getH() == pytest.approx(recomputed.getH(), abs=1e-9)
+
+@requiresNative
+@pytest.mark.parametrize("objective", ["std", "std_half", "control"])
+def test_native_objective_matches_python(objective) :
+  # final H, control H dan H state awal dari engine native sama dengan Cube Python untuk state yang sama
+  result = algorithm.run_algorithm("steepest ascent", {"objective": objective, "seed": 4})
+  final = Cube.fromArray(np.asarray(result["final_state"]), objective)
+  assert result["final H"] == pytest.approx(final.getH(), abs=1e-9)
+  assert result["control H"] == pytest.approx(final.controlH(), abs=1e-9)
+  initial = Cube.fromArray(np.asarray(result["initial_state"]), objective)
+  assert result["h_values"][0] == pytest.approx(initial.getH(), abs=1e-9)
@@ -0,0 +1,107 @@
+import numpy as np
+
+FORMAT_VERSION = 1
+
+class Trajectory:
+  # Riwayat pencarian yang ringkas: state awal + pasangan swap (indeks flat) + nilai H.
+  # State ke-i (setelah i swap) direkonstruksi dari keyframe terdekat, tidak pernah disimpan semua.
+
+  def __init__(self, initial_state, swaps, h_values = None, keyframeInterval = 1024, keyframes = None):
+    initial_state = np.asarray(initial_state)
+    self.dimension = initial_state.shape[-1]
+    cells = self.dimension**3
+    self.dtype = np.int16 if cells < 2**15 else np.int32
+
+    self.initial = initial_state.reshape(cells).astype(self.dtype)
+    self.swaps = np.asarray(swaps).reshape((-1, 2)).astype(self.dtype)
+    self.h_values = None if h_values is None else np.asarray(h_values, dtype=np.float32)
+    self.keyframeInterval = keyframeInterval
+    self.keyframes = keyframes if keyframes is not None else self._buildKeyframes()
+
+    self._lastIndex = 0
+    self._lastState = self.initial.copy()
+
+  def fromResult(result, keyframeInterval = 1024):
+    # Hasil engine native: switches berisi pasangan koordinat (x, y, z) untuk cube[z][y][x]
+    initial_state = np.asarray(result["initial_state"])
+    dimension = initial_state.shape[-1]
+    switches = np.asarray(result["switches"], dtype=np.int64).reshape((-1, 2, 3))
+    swaps = (switches[:, :, 2] * dimension + switches[:, :, 1]) * dimension + switches[:, :, 0]
+    return Trajectory(initial_state, swaps, result.get("h_values"), keyframeInterval)
+
+  def _buildKeyframes(self):
+    keyframes = np.empty((len(self.swaps) // self.keyframeInterval + 1, len(self.initial)), dtype=self.dtype)
+    state = self.initial.copy()
+    keyframes[0] = state
+    for i, (a, b) in enumerate(self.swaps.tolist(), 1):
+      state[a], state[b] = state[b], state[a]
+      if i % self.keyframeInterval == 0:
+        keyframes[i // self.keyframeInterval] = state
+    return keyframes
+
+  def __len__(self):
+    return len(self.swaps) + 1
+
+  def _replay(self, state, start, stop):
+    for a, b in self.swaps[start:stop].tolist():
+      state[a], state[b] = state[b], state[a]
+
+  def flatState(self, index):
+    if index < 0:
+      index += len(self)
+    if not 0 <= index < len(self):
+      raise IndexError("trajectory index out of range")
+
+    # Akses berurutan (visualizer, iterasi) cukup menerapkan swap sejak state terakhir
+    if self._lastIndex <= index < self._lastIndex + self.keyframeInterval:
+      self._replay(self._lastState, self._lastIndex, index)
+    else:
+      keyframe = index // self.keyframeInterval
+      self._lastState = self.keyframes[keyframe].copy()
+      self._replay(self._lastState, keyframe * self.keyframeInterval, index)
+    self._lastIndex = index
+    return self._lastState.copy()
+
+  def __getitem__(self, index):
+    return self.flatState(index).reshape((self.dimension,) * 3)
+
+  def __iter__(self):
+    state = self.initial.copy()
+    yield state.reshape((self.dimension,) * 3).copy()
+    for a, b in self.swaps.tolist():
+      state[a], state[b] = state[b], state[a]
+      yield state.reshape((self.dimension,) * 3).copy()
+
+  def final_state(self):
+    return self[len(self) - 1]
+
+  def nbytes(self):
+    total = self.initial.nbytes + self.swaps.nbytes + self.keyframes.nbytes
+    return total + (0 if self.h_values is None else self.h_values.nbytes)
+
+  def save(self, filename):
+    arrays = {
+      "version": np.array(FORMAT_VERSION),
+      "initial": self.initial,
+      "swaps": self.swaps,
+      "keyframeInterval": np.array(self.keyframeInterval),
+      "keyframes": self.keyframes,
+    }
+    if self.h_values is not None:
+      arrays["h_values"] = self.h_values
+    with open(filename, "wb") as file:
+      np.savez(file, **arrays)
+
+  def load(filename):
+    with np.load(filename) as data:
+      if int(data["version"]) != FORMAT_VERSION:
+        raise ValueError(f"Unsupported trajectory format version {int(data['version'])}")
+      cells = len(data["initial"])
+      dimension = round(cells ** (1/3))
+      return Trajectory(
+        data["initial"].reshape((dimension,) * 3),
+        data["swaps"],
+        data["h_values"] if "h_values" in data else None,
+        int(data["keyframeInterval"]),
+        data["keyframes"],
+      )